@@ -0,0 +1,173 @@
+# frota/ao_vivo.py
+
+import asyncio
+import contextvars
+import json
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET
+
+from .cache import pagina_condicional, versao_dados, versao_no_banco
+from .filtros import filtrar_veiculos
+from .models import PainelVeiculo, RemocaoPainel
+
+# Intervalo (segundos) entre comentários de keep-alive no fluxo SSE
+INTERVALO_KEEPALIVE = 15
+# Banco de onde o fluxo SSE lê a versão e as mudanças: o mesmo para os dois,
+# senão um cliente é acordado por uma versão que a réplica ainda não tem e perde as linhas
+BANCO_EVENTOS = DEFAULT_DB_ALIAS
+
+
+def mudancas(desde, params, versao_atual, banco=None):
+    """
+    O que mudou na página inicial depois da versão `desde`, já filtrado como a
+    página (`params` é o request.GET dela). Devolve as linhas alteradas que
+    continuam visíveis, já renderizadas, e os ids das que devem sair da tela.
+    Se mudou coisa demais, pede para a página recarregar. `banco` é o alias
+    lido (o do roteador, por padrão); deve ser o mesmo de onde veio `versao_atual`.
+    """
+    if desde >= versao_atual:
+        return {'versao': versao_atual, 'linhas': [], 'removidos': []}
+    # As remoções dessa época podem já ter sido apagadas (painel.limpar_remocoes)
+    if versao_atual - desde > settings.FROTA_RETENCAO_REMOCOES:
+        return {'versao': versao_atual, 'recarregar': True}
+
+    limite = settings.FROTA_MAX_MUDANCAS
+    painel = PainelVeiculo.objects.using(banco)
+    alterados = list(painel.filter(versao__gt=desde).values_list('pk', flat=True)[:limite + 1])
+    remocoes = RemocaoPainel.objects.using(banco).filter(versao__gt=desde)
+    excluidos = list(remocoes.values_list('veiculo_id', flat=True)[:limite + 1])
+    if len(alterados) + len(excluidos) > limite:
+        return {'versao': versao_atual, 'recarregar': True}
+
+    visiveis = list(filtrar_veiculos(painel.filter(pk__in=alterados), params))
+    removidos = set(alterados) - {veiculo.pk for veiculo in visiveis}
+    removidos.update(excluidos)
+    return {
+        'versao': versao_atual,
+        'linhas': [
+            {'id': veiculo.pk, 'html': render_to_string('frota/linha_painel.html', {'veiculo': veiculo})}
+            for veiculo in visiveis
+        ],
+        'removidos': sorted(removidos),
+    }
+
+
+def versao_desde(valor):
+    try:
+        return max(int(valor), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+@require_GET
+@pagina_condicional
+def mudancas_painel(request):
+    """
+    Polling para quando não há SSE (WSGI/serverless): ?desde=N com os filtros da
+    página. Enquanto a versão não muda a resposta é um 304 pelo ETag.
+    """
+    desde = versao_desde(request.GET.get('desde'))
+    if desde is None:
+        return HttpResponseBadRequest('Informe ?desde= com a versão exibida na página.')
+    return JsonResponse(mudancas(desde, request.GET, versao_dados(request)))
+
+
+# --- Server-Sent Events (ASGI) ---
+
+def _ler_versao():
+    close_old_connections()
+    return versao_no_banco(BANCO_EVENTOS)
+
+
+class ObservadorVersao:
+    """
+    Uma única tarefa por processo lê a versão dos dados a cada poucos segundos e
+    acorda as conexões SSE que estão esperando. Cada cliente parado custa só uma
+    corrotina; o banco recebe a mesma consulta não importa quantos estejam abertos.
+    A tarefa roda num contexto próprio, sem a escolha de réplica do request que
+    a iniciou, e lê sempre BANCO_EVENTOS.
+    """
+
+    def __init__(self):
+        self.versao = None
+        self._loop = None
+        self._mudou = None
+        self._tarefa = None
+        self._ouvintes = 0
+
+    def _preparar(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._mudou, self._tarefa = loop, asyncio.Event(), None
+        if self._tarefa is None or self._tarefa.done():
+            # create_task copiaria as ContextVars do request (pweb.roteador) para a tarefa compartilhada
+            self._tarefa = loop.create_task(self._vigiar(), context=contextvars.Context())
+
+    async def _vigiar(self):
+        while self._ouvintes:
+            versao = await sync_to_async(_ler_versao)()
+            if versao != self.versao:
+                self.versao = versao
+                mudou, self._mudou = self._mudou, asyncio.Event()
+                mudou.set()
+            await asyncio.sleep(settings.FROTA_TEMPO_REAL_INTERVALO)
+
+    @asynccontextmanager
+    async def ouvir(self):
+        self._ouvintes += 1
+        self._preparar()
+        try:
+            yield self
+        finally:
+            self._ouvintes -= 1
+
+    async def aguardar(self, desde, timeout):
+        """Devolve a versão assim que passar de `desde`, ou None depois de `timeout` segundos."""
+        prazo = self._loop.time() + timeout
+        while self.versao is None or self.versao <= desde:
+            restante = prazo - self._loop.time()
+            if restante <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._mudou.wait(), restante)
+            except asyncio.TimeoutError:
+                return None
+        return self.versao
+
+
+observador = ObservadorVersao()
+
+
+async def _fluxo_eventos(desde, params):
+    yield 'retry: 5000\n\n'
+    async with observador.ouvir():
+        while True:
+            versao = await observador.aguardar(desde, INTERVALO_KEEPALIVE)
+            if versao is None:
+                yield ': keep-alive\n\n'
+                continue
+            dados = await sync_to_async(mudancas)(desde, params, versao, BANCO_EVENTOS)
+            desde = dados['versao']
+            yield f'id: {desde}\nevent: mudancas\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n'
+
+
+@require_GET
+async def eventos_painel(request):
+    """
+    Fluxo SSE da página inicial: envia as linhas alteradas sempre que a versão
+    dos dados muda. Ao reconectar o navegador manda Last-Event-ID com a última
+    versão recebida. Feito para rodar sob ASGI (pweb/asgi.py).
+    """
+    desde = versao_desde(request.headers.get('Last-Event-ID') or request.GET.get('desde'))
+    if desde is None:
+        return HttpResponseBadRequest('Informe ?desde= com a versão exibida na página.')
+    response = StreamingHttpResponse(_fluxo_eventos(desde, request.GET.copy()), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: não segurar o fluxo em buffer
+    return response
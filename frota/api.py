@@ -0,0 +1,130 @@
+# frota/api.py
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_GET
+
+from . import compacto
+from .cache import pagina_condicional, versao_dados
+from .filtros import filtrar_veiculos, filtros_invalidos
+from .models import Veiculo
+from .paginacao import ORDEM
+
+# Nome público de cada campo -> caminho no ORM
+CAMPOS_API = {
+    'id': 'id',
+    'prefixo': 'prefixo',
+    'placa': 'placa',
+    'modelo': 'modelo__nome',
+    'tipo_veiculo': 'tipo_veiculo',
+    'segmento': 'segmento',
+    'regional': 'regional__sigla',
+    'departamento': 'departamento__sigla',
+    'status': 'status',
+    'servicos': 'manutencao__servicos',
+    'nome_oficina': 'manutencao__nome_oficina',
+    'cidade_oficina': 'manutencao__cidade_oficina',
+    'data_entrada': 'manutencao__data_entrada',
+    'data_previsao_saida': 'manutencao__data_previsao_saida',
+    'numero_os': 'manutencao__numero_os',
+    'status_os': 'manutencao__status_os',
+    'motivo': 'indisponibilidade__motivo',
+}
+CAMPOS_API_PADRAO = (
+    'id', 'prefixo', 'placa', 'modelo', 'regional', 'departamento', 'status',
+    'data_previsao_saida', 'numero_os', 'status_os',
+)
+TAMANHO_LOTE = 2000
+# Segundos de cache da URL de uma versão da frota, cujo conteúdo nunca muda
+ANO = 365 * 24 * 60 * 60
+
+
+def campos_pedidos(request):
+    """Lê o parâmetro ?fields=a,b,c. Devolve a lista de campos ou None se algum for inválido."""
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(CAMPOS_API_PADRAO)
+    campos = [campo.strip() for campo in fields.split(',') if campo.strip()]
+    if not campos or any(campo not in CAMPOS_API for campo in campos):
+        return None
+    return campos
+
+
+def erro_parametros(request, campos):
+    """Resposta 400 para um ?fields= ou filtro inválido; None se os parâmetros estão certos."""
+    if campos is None:
+        return JsonResponse(
+            {'erro': 'Campo inválido em "fields".', 'campos_disponiveis': list(CAMPOS_API)},
+            status=400,
+        )
+    invalidos = filtros_invalidos(request.GET)
+    if invalidos:
+        return JsonResponse({'erro': 'Filtro com id inválido.', 'filtros': invalidos}, status=400)
+    return None
+
+
+def _gerar_json(cabecalho, linhas):
+    # Escreve o documento aos pedaços: cabeçalho, uma linha por veículo, fechamento.
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    yield encoder.encode(cabecalho)[:-1] + ',"veiculos":['
+    separador = ''
+    for linha in linhas:
+        yield separador + encoder.encode(linha)
+        separador = ','
+    yield ']}'
+
+
+@require_GET
+@pagina_condicional
+def veiculos(request):
+    """
+    Lista os veículos em JSON, com os mesmos filtros da página inicial.
+    Cada veículo é uma lista de valores na ordem de "campos"; ?fields= escolhe os campos.
+    """
+    campos = campos_pedidos(request)
+    erro = erro_parametros(request, campos)
+    if erro:
+        return erro
+
+    consulta = filtrar_veiculos(Veiculo.objects.all(), request.GET).order_by(*ORDEM)
+    linhas = consulta.values_list(*(CAMPOS_API[campo] for campo in campos)).iterator(chunk_size=TAMANHO_LOTE)
+
+    cabecalho = {'versao': versao_dados(request), 'campos': campos}
+    return StreamingHttpResponse(
+        _gerar_json(cabecalho, linhas),
+        content_type='application/json; charset=utf-8',
+    )
+
+
+@require_GET
+def frota_compacta(request, versao=None):
+    """
+    A frota inteira no formato colunar de frota.compacto, para filtrar no navegador.
+    Sem versão (ou com uma que não é a atual) redireciona para a URL da versão
+    atual; essa nunca muda e pode ficar no cache do navegador para sempre.
+    """
+    atual = versao_dados(request)
+    if versao != atual:
+        return redirecionar_versao(atual)
+    return resposta_compacta(*compacto.comprimido(atual, request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+
+def redirecionar_versao(atual):
+    response = redirect('frota_compacta_versao', versao=atual)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def resposta_compacta(codificacao, conteudo, imutavel=True):
+    response = HttpResponse(conteudo, content_type='application/json; charset=utf-8')
+    if codificacao:
+        response['Content-Encoding'] = codificacao
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if imutavel:
+        patch_cache_control(response, public=True, max_age=ANO, immutable=True)
+    else:
+        # Lida enquanto a versão mudava (compacto.comprimido): não pode ficar guardada como desta versão
+        patch_cache_control(response, no_cache=True)
+    return response
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class FrotaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'frota'
+
+    def ready(self):
+        if settings.FROTA_ATRASO_BANCO_MS > 0:
+            from pweb import banco_lento
+            connection_created.connect(banco_lento.instalar)
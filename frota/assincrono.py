@@ -0,0 +1,211 @@
+# frota/assincrono.py
+
+"""
+Versões assíncronas das páginas e endpoints só de leitura, usadas quando o
+projeto roda sob ASGI (pweb/asgi.py liga FROTA_ASGI e frota/urls.py troca as
+views). Com o ORM assíncrono, um request esperando o banco não segura um
+worker: o mesmo processo continua atendendo os outros telões. Sob WSGI
+(gunicorn síncrono, Vercel) ficam as views de frota.views e frota.api, que
+não pagam o custo de um loop de eventos por request.
+
+Os templates são renderizados no loop, então tudo que eles leem do banco
+(usuário, versão dos dados, listas de opções) é carregado antes.
+"""
+
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from . import ao_vivo, api, compacto, opcoes, views
+from .cache import aguardar_pagina, aobter_pagina, carregar_estado, chave_pagina, pagina_condicional
+from .cache import ultima_atualizacao, versao_dados
+from .exportacao import TAMANHO_LOTE as LOTE_EXPORTACAO
+from .exportacao import EscritorCsv, consulta_exportacao, gerar_xlsx
+from .filtros import CAMPOS_FILTRO_INDEX, filtrar_veiculos
+from .forms import DepartamentoForm, ModeloVeiculoForm, RegionalForm
+from .models import Departamento, ModeloVeiculo, Regional, Veiculo
+from .paginacao import CAMPOS_PAGINACAO, ORDEM, apaginar
+
+# Tamanho dos pedaços em que a planilha XLSX é enviada
+BLOCO_ARQUIVO = 64 * 1024
+
+
+async def _em_lotes(consulta, tamanho):
+    """
+    Itera um values_list() em lotes lidos numa thread. Faz o papel de
+    aiterator(), que no Django 5.2 abre o cursor de um values_list() ainda
+    dentro do loop e falha com SynchronousOnlyOperation.
+    """
+    linhas = consulta.iterator(chunk_size=tamanho)
+    while lote := await sync_to_async(list)(islice(linhas, tamanho)):
+        for linha in lote:
+            yield linha
+
+
+# --- Página inicial ---
+
+@pagina_condicional
+async def index(request):
+    """views.index com o ORM assíncrono, inclusive o cache de páginas para anônimos."""
+    usar_cache = not request.user.is_authenticated
+    if usar_cache:
+        chave = chave_pagina('index', request, CAMPOS_FILTRO_INDEX + CAMPOS_PAGINACAO)
+        conteudo = await aobter_pagina(chave)
+        if conteudo is not None:
+            return HttpResponse(conteudo)
+
+    pagina = await apaginar(*views.consulta_index(request))
+    context = views.contexto_index(request, pagina)
+    context['opcoes_carregadas'] = await opcoes.acarregar(('regional_sigla', 'departamento_sigla'), request)
+    response = render(request, 'frota/index.html', context)
+    if usar_cache:
+        await aguardar_pagina(chave, response.content)
+    return response
+
+
+# --- JSON ---
+
+async def _gerar_json(cabecalho, linhas):
+    # Mesmo documento de api.veiculos, com as linhas de um iterador assíncrono
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    yield encoder.encode(cabecalho)[:-1] + ',"veiculos":['
+    separador = ''
+    async for linha in linhas:
+        yield separador + encoder.encode(linha)
+        separador = ','
+    yield ']}'
+
+
+@require_GET
+@pagina_condicional
+async def veiculos(request):
+    """api.veiculos em streaming assíncrono."""
+    campos = api.campos_pedidos(request)
+    erro = api.erro_parametros(request, campos)
+    if erro:
+        return erro
+
+    consulta = filtrar_veiculos(Veiculo.objects.all(), request.GET).order_by(*ORDEM)
+    linhas = _em_lotes(consulta.values_list(*(api.CAMPOS_API[campo] for campo in campos)), api.TAMANHO_LOTE)
+
+    cabecalho = {'versao': versao_dados(request), 'campos': campos}
+    return StreamingHttpResponse(
+        _gerar_json(cabecalho, linhas),
+        content_type='application/json; charset=utf-8',
+    )
+
+
+@require_GET
+async def frota_compacta(request, versao=None):
+    """
+    api.frota_compacta. Gerar e comprimir a frota é trabalho de CPU, feito uma
+    vez por versão: roda numa thread para não parar o loop.
+    """
+    atual = (await carregar_estado(request))[0]
+    if versao != atual:
+        return api.redirecionar_versao(atual)
+    aceitas = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    return api.resposta_compacta(*await sync_to_async(compacto.comprimido)(atual, aceitas))
+
+
+@require_GET
+@pagina_condicional
+async def mudancas_painel(request):
+    """ao_vivo.mudancas_painel; as linhas alteradas são lidas e renderizadas numa thread."""
+    desde = ao_vivo.versao_desde(request.GET.get('desde'))
+    if desde is None:
+        return HttpResponseBadRequest('Informe ?desde= com a versão exibida na página.')
+    mudancas = await sync_to_async(ao_vivo.mudancas)(desde, request.GET, versao_dados(request))
+    return JsonResponse(mudancas)
+
+
+# --- Exportação ---
+
+async def _gerar_csv(params):
+    escritor = EscritorCsv()
+    yield escritor.cabecalho()
+    async for linha in _em_lotes(consulta_exportacao(params), LOTE_EXPORTACAO):
+        yield escritor.linha(linha)
+
+
+async def _ler_arquivo(arquivo):
+    try:
+        while bloco := arquivo.read(BLOCO_ARQUIVO):
+            yield bloco
+    finally:
+        arquivo.close()
+
+
+@login_required
+async def exportar_veiculos(request):
+    """views.exportar_veiculos. O XLSX é escrito num arquivo temporário por uma thread e enviado aos pedaços."""
+    formato = request.GET.get('formato', 'csv')
+    nome_arquivo = f"frota_{timezone.localtime():%Y%m%d_%H%M}"
+
+    if formato == 'xlsx':
+        arquivo = await sync_to_async(gerar_xlsx)(request.GET)
+        response = StreamingHttpResponse(
+            _ler_arquivo(arquivo),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.xlsx"'
+        return response
+
+    response = StreamingHttpResponse(_gerar_csv(request.GET), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.csv"'
+    return response
+
+
+# --- Catálogos ---
+# Só a listagem é assíncrona; o cadastro (POST) continua na view síncrona.
+
+async def _listar_catalogo(request, template, nome, consulta, form):
+    context = {
+        'form': form,
+        nome: [item async for item in consulta],
+        'ultima_atualizacao': ultima_atualizacao(request),
+    }
+    return render(request, template, context)
+
+
+@login_required
+@pagina_condicional
+async def gerenciar_departamentos(request):
+    if request.method == 'POST':
+        return await sync_to_async(views.gerenciar_departamentos)(request)
+    pesquisa = request.GET.get('pesquisa')
+    departamentos = Departamento.objects.all().order_by('nome')
+    if pesquisa:
+        departamentos = departamentos.filter(Q(nome__icontains=pesquisa) | Q(sigla__icontains=pesquisa))
+    return await _listar_catalogo(request, 'frota/departamentos.html', 'departamentos', departamentos, DepartamentoForm())
+
+
+@login_required
+@pagina_condicional
+async def gerenciar_modelos(request):
+    if request.method == 'POST':
+        return await sync_to_async(views.gerenciar_modelos)(request)
+    pesquisa = request.GET.get('pesquisa')
+    modelos = ModeloVeiculo.objects.all().order_by('nome')
+    if pesquisa:
+        modelos = modelos.filter(nome__icontains=pesquisa)
+    return await _listar_catalogo(request, 'frota/modelos.html', 'modelos', modelos, ModeloVeiculoForm())
+
+
+@login_required
+@pagina_condicional
+async def gerenciar_regionais(request):
+    if request.method == 'POST':
+        return await sync_to_async(views.gerenciar_regionais)(request)
+    pesquisa = request.GET.get('pesquisa')
+    regionais = Regional.objects.all().order_by('nome')
+    if pesquisa:
+        regionais = regionais.filter(Q(nome__icontains=pesquisa) | Q(sigla__icontains=pesquisa))
+    return await _listar_catalogo(request, 'frota/regionais.html', 'regionais', regionais, RegionalForm())
@@ -0,0 +1,95 @@
+# frota/busca.py
+
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import EventoStatus, PainelVeiculo
+
+LIMITE = 50
+MAX_TERMOS = 8
+# Calcular a relevância de todos os resultados de um termo comum ("revisão" no
+# histórico inteiro) é o que pesa na busca. Ela é calculada só entre os
+# resultados mais novos, até este número.
+JANELA_RELEVANCIA = 2000
+
+# Mesma ordem das colunas criadas na migração 0016; no SQLite o peso de cada
+# coluna vai para o bm25 (A = 10, B = 4, C = 1), no PostgreSQL está no vetor.
+COLUNAS_PAINEL = {
+    'placa': 10, 'prefixo': 10,
+    'modelo': 4, 'nome_oficina': 4, 'cidade_oficina': 4, 'numero_os': 4,
+    'servicos': 1, 'motivo': 1,
+}
+COLUNAS_EVENTO = {
+    'placa': 10,
+    'nome_oficina': 4, 'cidade_oficina': 4, 'numero_os': 4,
+    'servicos': 1, 'motivo': 1,
+}
+TABELAS_FTS = {PainelVeiculo: 'frota_painel_busca', EventoStatus: 'frota_evento_busca'}
+
+
+def termos(texto):
+    """Palavras da busca, sem pontuação: o que sobra não é interpretado como sintaxe."""
+    return re.findall(r'\w+', (texto or '').lower())[:MAX_TERMOS]
+
+
+def _postgresql(queryset, palavras):
+    # Cada termo vale como prefixo ("ABC12" acha "ABC1234") e todos precisam aparecer
+    consulta = ' & '.join(f'{palavra}:*' for palavra in palavras)
+    # `busca` é a coluna gerada da migração 0016; sem prefixo de tabela porque o
+    # Django renomeia as tabelas dentro de subconsultas.
+    janela = queryset.model.objects.filter(
+        RawSQL("busca @@ to_tsquery('portuguese', %s)", [consulta], output_field=BooleanField())
+    ).order_by('-pk').values('pk')[:JANELA_RELEVANCIA]
+    return queryset.filter(pk__in=janela).annotate(
+        relevancia=RawSQL("ts_rank_cd(busca, to_tsquery('portuguese', %s))", [consulta], output_field=FloatField())
+    )
+
+
+def _sqlite(queryset, palavras, colunas, limite):
+    tabela = TABELAS_FTS[queryset.model]
+    consulta = ' '.join(f'"{palavra}"*' for palavra in palavras)
+    pesos = ', '.join(str(peso) for peso in colunas.values())
+    with connection.cursor() as cursor:
+        # O FTS5 entrega os resultados em ordem de rowid, então a subconsulta para
+        # na janela; bm25 devolve valores menores para os mais relevantes.
+        cursor.execute(
+            f'SELECT rowid FROM (SELECT rowid, bm25({tabela}, {pesos}) AS relevancia FROM {tabela} '
+            f'WHERE {tabela} MATCH %s ORDER BY rowid DESC LIMIT %s) ORDER BY relevancia, rowid DESC LIMIT %s',
+            [consulta, JANELA_RELEVANCIA, limite],
+        )
+        ids = [linha[0] for linha in cursor.fetchall()]
+    encontrados = queryset.in_bulk(ids)
+    return [encontrados[pk] for pk in ids if pk in encontrados]
+
+
+def _sem_indice(queryset, palavras, colunas):
+    filtros = [reduce(or_, (Q(**{f'{coluna}__icontains': palavra}) for coluna in colunas)) for palavra in palavras]
+    return queryset.filter(*filtros)
+
+
+def _buscar(queryset, texto, colunas, ordem, limite):
+    palavras = termos(texto)
+    if not palavras:
+        return []
+    if connection.vendor == 'postgresql':
+        return list(_postgresql(queryset, palavras).order_by('-relevancia', *ordem)[:limite])
+    if connection.vendor == 'sqlite':
+        return _sqlite(queryset, palavras, colunas, limite)
+    return list(_sem_indice(queryset, palavras, colunas).order_by(*ordem)[:limite])
+
+
+def buscar_frota(texto, limite=LIMITE):
+    """Veículos cujo cadastro, manutenção ou indisponibilidade atual batem com a busca, por relevância."""
+    return _buscar(PainelVeiculo.objects.all(), texto, COLUNAS_PAINEL, ['prefixo'], limite)
+
+
+def buscar_historico(texto, limite=LIMITE):
+    """Eventos do histórico de status que batem com a busca, por relevância e depois os mais recentes."""
+    return _buscar(
+        EventoStatus.objects.select_related('usuario'), texto, COLUNAS_EVENTO, ['-data_hora'], limite,
+    )
@@ -0,0 +1,243 @@
+# frota/cache.py
+
+import hashlib
+import time
+from functools import partial, wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, router, transaction
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .filtros import querystring_normalizada
+from .models import PainelVeiculo, RemocaoPainel, UltimaAtualizacao
+
+
+# alias do banco -> (expira_em, (versao, data_hora, versao_catalogo)) lido dele por último neste processo.
+# A réplica tem o seu: atrasada, ela informa a versão dos dados que ainda serve,
+# e as chaves de cache montadas com essa versão não recebem dados velhos de uma
+# versão que só o principal tem.
+_estados_locais = {}
+
+
+def _guardar_estado_local(estado, alias=DEFAULT_DB_ALIAS):
+    _estados_locais[alias] = (time.monotonic() + settings.FROTA_VERSAO_TTL, estado)
+
+
+def _estado_local(alias):
+    expira_em, estado = _estados_locais.get(alias, (0.0, None))
+    return estado if estado is not None and time.monotonic() < expira_em else None
+
+
+def _consulta_estado(alias):
+    return UltimaAtualizacao.objects.using(alias).filter(pk=1).values_list('versao', 'data_hora', 'versao_catalogo')
+
+
+def _alias_leitura():
+    # O mesmo banco de onde o request lê os veículos (pweb.roteador)
+    return router.db_for_read(UltimaAtualizacao)
+
+
+def _estado_dados(request=None):
+    """
+    Lê (versao, data_hora, versao_catalogo) do registro de última atualização,
+    no banco de onde o request lê os dados (principal ou réplica). O valor fica
+    num cache do processo por FROTA_VERSAO_TTL segundos, então a maioria dos
+    requests não consulta o banco; quando recebe o request, guarda também nele
+    para o valor não mudar no meio da resposta.
+    """
+    if request is not None and hasattr(request, '_frota_estado'):
+        return request._frota_estado
+
+    alias = _alias_leitura()
+    estado = _estado_local(alias)
+    if estado is None:
+        estado = _consulta_estado(alias).first() or (0, None, 0)
+        _guardar_estado_local(estado, alias)
+
+    if request is not None:
+        request._frota_estado = estado
+    return estado
+
+
+async def carregar_estado(request):
+    """
+    _estado_dados() com o ORM assíncrono, para as views de frota.assincrono. O
+    estado fica no request, e dali versao_dados(), ultima_atualizacao() e o
+    ETag leem sem consultar o banco dentro do loop de eventos.
+    """
+    if not hasattr(request, '_frota_estado'):
+        alias = _alias_leitura()
+        estado = _estado_local(alias)
+        if estado is None:
+            estado = await _consulta_estado(alias).afirst() or (0, None, 0)
+            _guardar_estado_local(estado, alias)
+        request._frota_estado = estado
+    return request._frota_estado
+
+
+def versao_no_banco(alias=None):
+    """
+    A versão dos dados lida agora do banco `alias` (o de leitura, por padrão),
+    sem o cache do processo. Serve para conferir, depois de ler os dados, que
+    eles ainda são os da versão com que vão ser guardados.
+    """
+    alias = alias or _alias_leitura()
+    estado = _consulta_estado(alias).first() or (0, None, 0)
+    _guardar_estado_local(estado, alias)
+    return estado[0]
+
+
+def _update_versao(agora, catalogo):
+    tabela = connection.ops.quote_name(UltimaAtualizacao._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {tabela} SET versao = versao + 1, versao_catalogo = versao_catalogo + %s, data_hora = %s '
+            f'WHERE id = 1 RETURNING versao, versao_catalogo',
+            [int(catalogo), connection.ops.adapt_datetimefield_value(agora)],
+        )
+        linha = cursor.fetchone()
+    if linha is None:
+        # Banco novo, sem o registro ainda
+        UltimaAtualizacao.objects.create(pk=1, versao=1, versao_catalogo=int(catalogo))
+        return 1, int(catalogo)
+    return linha
+
+
+def _incrementar_versao(painel, catalogo):
+    """
+    Um único UPDATE ... RETURNING no registro de versão (PostgreSQL e SQLite 3.35+).
+    Com `painel`, carimba na mesma transação as linhas do painel que ficaram
+    pendentes, para que nenhum leitor veja a versão nova sem elas.
+    """
+    agora = timezone.now()
+    if painel:
+        with transaction.atomic():
+            versao, versao_catalogo = _update_versao(agora, catalogo)
+            PainelVeiculo.objects.filter(versao__isnull=True).update(versao=versao)
+            RemocaoPainel.objects.filter(versao__isnull=True).update(versao=versao)
+    else:
+        versao, versao_catalogo = _update_versao(agora, catalogo)
+    _guardar_estado_local((versao, agora, versao_catalogo))
+
+
+def registrar_atualizacao(painel=False, catalogo=False):
+    """
+    Incrementa a versão dos dados depois do commit da transação atual (ou na
+    hora, fora de transação). Concorrentes só disputam a linha de versão
+    durante esse UPDATE, não pela transação inteira de quem alterou os dados.
+    Passe painel=True quando a transação alterou linhas do PainelVeiculo e
+    catalogo=True quando criou, alterou ou excluiu modelos, regionais ou
+    departamentos (invalida as listas de opções de frota.opcoes). O painel
+    estático (frota.publicacao) acompanha essa versão pelo comando publicar_painel.
+    """
+    transaction.on_commit(partial(_incrementar_versao, painel, catalogo))
+
+
+def ultima_atualizacao(request=None):
+    """Registro de última atualização para os templates, vindo do cache do processo."""
+    versao, data_hora, _ = _estado_dados(request)
+    return UltimaAtualizacao(pk=1, versao=versao, data_hora=data_hora) if data_hora else None
+
+
+def versao_dados(request=None):
+    """Retorna a versão atual dos dados da frota (0 se nada foi registrado)."""
+    return _estado_dados(request)[0]
+
+
+def versao_catalogo(request=None):
+    """Versão atual dos catálogos (modelos, regionais e departamentos)."""
+    return _estado_dados(request)[2]
+
+
+def chave_pagina(nome, request, campos=None):
+    """Chave de cache de uma página: nome + versão dos dados + filtros normalizados."""
+    filtros = querystring_normalizada(request.GET, campos)
+    resumo = hashlib.md5(filtros.encode()).hexdigest()
+    return f'frota:pagina:{nome}:v{versao_dados(request)}:{resumo}'
+
+
+def obter_pagina(chave):
+    return cache.get(chave)
+
+
+def guardar_pagina(chave, conteudo):
+    cache.set(chave, conteudo, settings.FROTA_CACHE_TIMEOUT)
+
+
+async def aobter_pagina(chave):
+    return await cache.aget(chave)
+
+
+async def aguardar_pagina(chave, conteudo):
+    await cache.aset(chave, conteudo, settings.FROTA_CACHE_TIMEOUT)
+
+
+# --- GET condicional (ETag / Last-Modified) ---
+def _tem_mensagens(request):
+    # Uma página com mensagens pendentes precisa ser renderizada para exibi-las.
+    return len(get_messages(request)) > 0
+
+
+def etag_pagina(request, *args, **kwargs):
+    """
+    ETag forte derivada da versão dos dados, da URL com os filtros normalizados
+    e, para usuários logados, do usuário e do token CSRF embutido nos formulários.
+    """
+    if _tem_mensagens(request):
+        return None
+    partes = [request.path, str(versao_dados(request)), querystring_normalizada(request.GET)]
+    if request.user.is_authenticated:
+        partes += [str(request.user.pk), request.META.get('CSRF_COOKIE', '')]
+    return hashlib.sha256('|'.join(partes).encode()).hexdigest()
+
+
+def ultima_modificacao(request, *args, **kwargs):
+    if _tem_mensagens(request):
+        return None
+    return _estado_dados(request)[1]
+
+
+def pagina_condicional(view):
+    """
+    Responde 304 Not Modified quando o navegador já tem a versão atual da página.
+    A verificação lê apenas o registro de versão, antes de qualquer consulta
+    de veículos ou renderização de template.
+    """
+    view_condicional = condition(etag_func=etag_pagina, last_modified_func=ultima_modificacao)(view)
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def _view_async(request, *args, **kwargs):
+            # O ETag é calculado por funções síncronas: usuário e versão já vão prontos no request
+            request.user = await request.auser()
+            await carregar_estado(request)
+            response = await view_condicional(request, *args, **kwargs)
+            _revalidar(request, response)
+            return response
+        return _view_async
+
+    @wraps(view)
+    def _view(request, *args, **kwargs):
+        response = view_condicional(request, *args, **kwargs)
+        _revalidar(request, response)
+        return response
+    return _view
+
+
+def _revalidar(request, response):
+    # O condition() põe ETag e Last-Modified em qualquer resposta; num erro (400
+    # de um parâmetro inválido) eles fariam o próximo request condicional virar
+    # um 304 para a página de erro.
+    if response.status_code not in (200, 304):
+        del response['ETag']
+        del response['Last-Modified']
+    # Obriga o navegador a revalidar, em vez de reaproveitar a página por heurística.
+    if request.user.is_authenticated:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
@@ -0,0 +1,96 @@
+# frota/compacto.py
+
+"""
+A frota inteira num JSON colunar e compacto, para a página inicial filtrar,
+ordenar e paginar no navegador (templates/frota/painel_cliente.js).
+
+Cada coluna é uma lista com um valor por veículo, na ordem padrão da lista.
+As colunas repetitivas (modelo, regional, departamento, status, tipo,
+segmento) guardam só o índice num dicionário; os dados de manutenção e
+indisponibilidade aparecem apenas para os veículos que os têm.
+"""
+
+import gzip
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router
+
+from .cache import versao_no_banco
+from .models import PainelVeiculo
+from .paginacao import ORDEM
+
+try:
+    import brotli
+except ImportError:  # Opcional: sem ele a resposta vai só em gzip
+    brotli = None
+
+# Colunas guardadas como índice no dicionário de valores
+CODIFICADAS = ('modelo', 'tipo_veiculo', 'segmento', 'status')
+# Regional e departamento: o dicionário guarda [id, sigla], o id é o valor dos filtros
+CATALOGOS = ('regional', 'departamento')
+DETALHES = (
+    'servicos', 'nome_oficina', 'cidade_oficina', 'data_entrada', 'data_previsao_saida',
+    'numero_os', 'status_os', 'motivo',
+)
+
+
+def gerar(versao, alias=None):
+    """O JSON da frota, como texto, lido do banco `alias` (o do roteador, por padrão)."""
+    colunas = {nome: [] for nome in ('id', 'prefixo', 'placa', *CODIFICADAS, *CATALOGOS)}
+    dicionarios = {nome: {} for nome in (*CODIFICADAS, *CATALOGOS)}
+    detalhes = []
+
+    linhas = PainelVeiculo.objects.using(alias).order_by(*ORDEM).values_list(
+        'veiculo_id', 'prefixo', 'placa', 'regional_id', 'regional_sigla', 'departamento_id', 'departamento_sigla',
+        *CODIFICADAS, *DETALHES,
+    )
+    for posicao, (pk, prefixo, placa, regional, regional_sigla, departamento, departamento_sigla, *resto) in enumerate(linhas):
+        colunas['id'].append(pk)
+        colunas['prefixo'].append(prefixo)
+        colunas['placa'].append(placa)
+        valores = dict(zip(CODIFICADAS, resto), regional=(regional, regional_sigla), departamento=(departamento, departamento_sigla))
+        for nome, valor in valores.items():
+            dicionario = dicionarios[nome]
+            colunas[nome].append(dicionario.setdefault(valor, len(dicionario)))
+        extras = resto[len(CODIFICADAS):]
+        if any(extras):
+            detalhes.append([posicao, *extras])
+
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    return encoder.encode({
+        'versao': versao,
+        'colunas': colunas,
+        # dict guarda a ordem de inserção: a posição de cada valor é o índice usado nas colunas
+        'dicionarios': {nome: list(dicionario) for nome, dicionario in dicionarios.items()},
+        'detalhes': {'campos': DETALHES, 'linhas': detalhes},
+    })
+
+
+def comprimido(versao, aceitas):
+    """
+    (codificação, bytes, imutável) da frota para o cabeçalho Accept-Encoding
+    `aceitas`. As três variantes são geradas uma vez por versão e ficam no
+    cache. Se a versão no banco mudou enquanto a frota era lida, o conteúdo
+    pode ser de outra versão: vai para este request só, sem cache e com
+    imutável False.
+    """
+    chave = f'frota:compacto:v{versao}'
+    variantes = cache.get(chave)
+    imutavel = True
+    if variantes is None:
+        alias = router.db_for_read(PainelVeiculo)
+        conteudo = gerar(versao, alias).encode()
+        variantes = {'': conteudo, 'gzip': gzip.compress(conteudo, compresslevel=6)}
+        if brotli is not None:
+            variantes['br'] = brotli.compress(conteudo, quality=5)
+        imutavel = versao_no_banco(alias) == versao
+        if imutavel:
+            cache.set(chave, variantes, settings.FROTA_CACHE_TIMEOUT)
+
+    aceitas = {parte.split(';')[0].strip() for parte in aceitas.split(',')}
+    for codificacao in ('br', 'gzip'):
+        if codificacao in aceitas and codificacao in variantes:
+            return codificacao, variantes[codificacao], imutavel
+    return '', variantes[''], imutavel
@@ -0,0 +1,114 @@
+# frota/exportacao.py
+
+import csv
+import tempfile
+
+from .filtros import filtrar_veiculos
+from .models import Veiculo
+from .paginacao import ORDEM
+
+# (Cabeçalho da planilha, caminho no ORM)
+COLUNAS_EXPORTACAO = [
+    ('Prefixo', 'prefixo'),
+    ('Placa', 'placa'),
+    ('Modelo', 'modelo__nome'),
+    ('Tipo', 'tipo_veiculo'),
+    ('Segmento', 'segmento'),
+    ('Regional', 'regional__sigla'),
+    ('Departamento', 'departamento__sigla'),
+    ('Status', 'status'),
+    ('Serviços', 'manutencao__servicos'),
+    ('Oficina', 'manutencao__nome_oficina'),
+    ('Cidade da Oficina', 'manutencao__cidade_oficina'),
+    ('Data de Entrada', 'manutencao__data_entrada'),
+    ('Previsão de Saída', 'manutencao__data_previsao_saida'),
+    ('Número da OS/Ticket', 'manutencao__numero_os'),
+    ('Status da OS', 'manutencao__status_os'),
+    ('Motivo da Indisponibilidade', 'indisponibilidade__motivo'),
+]
+COLUNAS_DATA = {'manutencao__data_entrada', 'manutencao__data_previsao_saida'}
+TAMANHO_LOTE = 2000
+
+# Um texto que comece assim vira fórmula ao abrir o CSV no Excel ou LibreOffice
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def texto_seguro(valor):
+    """Prefixa com um apóstrofo o texto digitado que a planilha leria como fórmula (ex.: =HYPERLINK(...))."""
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def consulta_exportacao(params):
+    consulta = filtrar_veiculos(Veiculo.objects.all(), params).order_by(*ORDEM)
+    return consulta.values_list(*(caminho for _, caminho in COLUNAS_EXPORTACAO))
+
+
+def linhas_exportacao(params):
+    """Itera as linhas da exportação em lotes, sem carregar a frota inteira na memória."""
+    return consulta_exportacao(params).iterator(chunk_size=TAMANHO_LOTE)
+
+
+class _Eco:
+    """Pseudo-arquivo para o csv.writer: devolve a linha em vez de guardá-la."""
+    def write(self, valor):
+        return valor
+
+
+class EscritorCsv:
+    """Formata o cabeçalho e as linhas do CSV, para gerar_csv() e a exportação assíncrona."""
+
+    def __init__(self):
+        self.writer = csv.writer(_Eco(), delimiter=';')
+        self.indices_data = [i for i, (_, caminho) in enumerate(COLUNAS_EXPORTACAO) if caminho in COLUNAS_DATA]
+
+    def cabecalho(self):
+        # BOM e ponto e vírgula para o Excel em português abrir o arquivo direto
+        return '\ufeff' + self.writer.writerow([cabecalho for cabecalho, _ in COLUNAS_EXPORTACAO])
+
+    def linha(self, linha):
+        linha = list(linha)
+        for i in self.indices_data:
+            if linha[i]:
+                linha[i] = linha[i].strftime('%d/%m/%Y')
+        return self.writer.writerow(['' if valor is None else texto_seguro(valor) for valor in linha])
+
+
+def gerar_csv(params):
+    escritor = EscritorCsv()
+    yield escritor.cabecalho()
+    for linha in linhas_exportacao(params):
+        yield escritor.linha(linha)
+
+
+def gerar_xlsx(params):
+    """
+    Escreve a planilha num arquivo temporário no modo constant_memory do
+    XlsxWriter (cada linha vai para o disco assim que é escrita) e devolve o
+    arquivo posicionado no início.
+    """
+    import xlsxwriter  # Só carregado quando alguém exporta em XLSX
+
+    arquivo = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(arquivo, {'constant_memory': True})
+    planilha = workbook.add_worksheet('Frota')
+    negrito = workbook.add_format({'bold': True})
+    formato_data = workbook.add_format({'num_format': 'dd/mm/yyyy'})
+
+    for coluna, (cabecalho, _) in enumerate(COLUNAS_EXPORTACAO):
+        planilha.write(0, coluna, cabecalho, negrito)
+
+    for numero, linha in enumerate(linhas_exportacao(params), start=1):
+        for coluna, valor in enumerate(linha):
+            if valor is None:
+                continue
+            if COLUNAS_EXPORTACAO[coluna][1] in COLUNAS_DATA:
+                planilha.write_datetime(numero, coluna, valor, formato_data)
+            else:
+                # write() transformaria um texto começado por '=' em fórmula
+                planilha.write_string(numero, coluna, valor)
+
+    workbook.close()
+    arquivo.seek(0)
+    return arquivo
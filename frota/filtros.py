@@ -0,0 +1,67 @@
+# frota/filtros.py
+
+from urllib.parse import urlencode
+
+# Parâmetros de filtro aceitos pela página inicial (views.index)
+CAMPOS_FILTRO_INDEX = ('placa', 'departamento', 'status', 'regional', 'tipo_veiculo', 'segmento')
+
+# Filtros que recebem o id de um cadastro
+CAMPOS_FILTRO_ID = ('departamento', 'regional')
+
+
+def _id_valido(valor):
+    return valor.isascii() and valor.isdigit()
+
+
+def filtros_invalidos(params):
+    """Filtros informados com um id que não é número (ex.: ?regional=abc)."""
+    return [campo for campo in CAMPOS_FILTRO_ID if params.get(campo) and not _id_valido(params.get(campo))]
+
+
+def filtrar_veiculos(veiculos, params):
+    """
+    Aplica ao queryset os mesmos filtros da página inicial.
+    `params` é normalmente o request.GET. Ids inválidos são ignorados; a API
+    os recusa antes com filtros_invalidos().
+    """
+    placa = params.get('placa')
+    depto_id = params.get('departamento')
+    status = params.get('status')
+    regional_id = params.get('regional')
+    tipo_veiculo = params.get('tipo_veiculo')
+    segmento = params.get('segmento')
+
+    if placa:
+        veiculos = veiculos.filter(placa__icontains=placa)
+
+    if depto_id and _id_valido(depto_id):
+        veiculos = veiculos.filter(departamento_id=depto_id)
+
+    if status:
+        veiculos = veiculos.filter(status=status)
+
+    if regional_id and _id_valido(regional_id):
+        veiculos = veiculos.filter(regional_id=regional_id)
+
+    if tipo_veiculo:
+        veiculos = veiculos.filter(tipo_veiculo=tipo_veiculo)
+
+    if segmento:
+        veiculos = veiculos.filter(segmento=segmento)
+
+    return veiculos
+
+
+def querystring_normalizada(params, campos=None):
+    """
+    Monta uma querystring canônica: só os campos informados (ou todos),
+    sem valores vazios e em ordem alfabética. Duas URLs que mostram o mesmo
+    resultado geram a mesma string.
+    """
+    chaves = campos if campos is not None else params.keys()
+    itens = []
+    for chave in sorted(set(chaves)):
+        for valor in params.getlist(chave):
+            if valor:
+                itens.append((chave, valor))
+    return urlencode(itens)
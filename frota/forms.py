@@ -2,6 +2,8 @@
 
 from django import forms
 from .models import Departamento, Veiculo, Manutencao, Indisponibilidade, ModeloVeiculo, Regional
+from .indicadores import DIMENSOES
+from .opcoes import escolhas
 
 class DepartamentoForm(forms.ModelForm):
     class Meta:
@@ -38,6 +40,17 @@ class VeiculoForm(forms.ModelForm):
             'regional': forms.Select(attrs={'class': 'form-select'}), # Adicione o widget
             'departamento': forms.Select(attrs={'class': 'form-select'}),
         }
+
+    # Campo -> lista de frota.opcoes; a validação continua usando o queryset do campo
+    LISTAS_CATALOGO = {'modelo': 'modelo', 'regional': 'regional_sigla', 'departamento': 'departamento'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Renderizar o select não consulta o catálogo: as opções vêm da lista já montada
+        for campo, lista in self.LISTAS_CATALOGO.items():
+            field = self.fields[campo]
+            field.choices = [('', field.empty_label), *escolhas(lista)]
+
     def clean_prefixo(self):
         """
         Garante que, se o campo estiver vazio, seja salvo como None (NULL) no banco,
@@ -69,4 +82,24 @@ class IndisponibilidadeForm(forms.ModelForm):
         fields = ['motivo']
         widgets = {
             'motivo': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
-        }
\ No newline at end of file
+        }
+
+class ImportacaoVeiculosForm(forms.Form):
+    arquivo = forms.FileField(
+        label='Arquivo CSV',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,text/csv'}),
+    )
+
+
+class FiltroIndicadoresForm(forms.Form):
+    DIMENSAO_CHOICES = [(chave, rotulo) for chave, (_, rotulo) in DIMENSOES.items()]
+
+    inicio = forms.DateField(label='De', widget=forms.DateInput(format='%Y-%m-%d', attrs={'class': 'form-control', 'type': 'date'}))
+    fim = forms.DateField(label='Até', widget=forms.DateInput(format='%Y-%m-%d', attrs={'class': 'form-control', 'type': 'date'}))
+    dimensao = forms.ChoiceField(label='Agrupar por', choices=DIMENSAO_CHOICES, widget=forms.Select(attrs={'class': 'form-select'}))
+
+    def clean(self):
+        dados = super().clean()
+        if dados.get('inicio') and dados.get('fim') and dados['inicio'] > dados['fim']:
+            raise forms.ValidationError('A data inicial deve ser anterior à final.')
+        return dados
@@ -0,0 +1,194 @@
+# frota/importacao.py
+
+import csv
+
+from django.db import transaction
+
+from .cache import registrar_atualizacao
+from .models import Departamento, ModeloVeiculo, Regional, Veiculo
+from .painel import sincronizar
+
+COLUNAS_IMPORTACAO = ('prefixo', 'placa', 'modelo', 'tipo_veiculo', 'segmento', 'regional', 'departamento')
+COLUNAS_OBRIGATORIAS = ('placa', 'modelo', 'regional', 'departamento')
+TAMANHO_LOTE = 500
+
+
+class ResultadoImportacao:
+    def __init__(self):
+        self.validos = 0
+        self.criados = 0
+        self.erros = []  # (número da linha no arquivo, mensagem)
+
+    @property
+    def ok(self):
+        return not self.erros
+
+    def erro(self, linha, mensagem):
+        self.erros.append((linha, mensagem))
+
+
+def _normalizar(valor):
+    return (valor or '').strip().casefold()
+
+
+def _mapa_escolhas(choices):
+    """Aceita tanto o código ('LEVE') quanto o nome exibido ('Leve')."""
+    mapa = {}
+    for codigo, nome in choices:
+        mapa[_normalizar(codigo)] = codigo
+        mapa[_normalizar(nome)] = codigo
+    return mapa
+
+
+# Valor no mapa de nomes e siglas de um texto que aponta para mais de um cadastro
+AMBIGUO = object()
+
+
+def _mapa_nome_sigla(queryset):
+    """
+    Regionais e departamentos podem ser informados pela sigla ou pelo nome.
+    O nome não é único (e pode coincidir com a sigla de outro): um texto que
+    aponta para mais de um cadastro fica marcado como AMBIGUO.
+    """
+    mapa = {}
+    for pk, nome, sigla in queryset.values_list('pk', 'nome', 'sigla'):
+        for chave in {_normalizar(nome), _normalizar(sigla)}:
+            mapa[chave] = pk if mapa.get(chave, pk) == pk else AMBIGUO
+    return mapa
+
+
+def _buscar_cadastro(mapa, valor, descricao, genero, erros_linha):
+    """Id do cadastro informado na linha; registra em erros_linha se não existe ou é ambíguo."""
+    pk = mapa.get(_normalizar(valor))
+    if pk is AMBIGUO:
+        erros_linha.append(f'{descricao} "{valor}" é ambígu{genero}: informe a sigla')
+        return None
+    if valor and not pk:
+        erros_linha.append(f'{descricao} "{valor}" não encontrad{genero}')
+    return pk
+
+
+def _ler_csv(linhas):
+    linhas = iter(linhas)
+    primeira = next(linhas, '')
+    delimitador = ';' if primeira.count(';') >= primeira.count(',') else ','
+    leitor = csv.reader([primeira], delimiter=delimitador)
+    cabecalho = [_normalizar(coluna) for coluna in next(leitor, [])]
+    return cabecalho, csv.reader(linhas, delimiter=delimitador)
+
+
+def _linhas_numeradas(leitor, resultado):
+    """
+    (número da linha, valores) de cada linha do CSV. Um arquivo que não é
+    UTF-8 ou CSV válido vira um erro no resultado, em vez de uma exceção.
+    """
+    numero = 1
+    while True:
+        numero += 1
+        try:
+            valores = next(leitor)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            resultado.erro(numero, 'o arquivo precisa estar em UTF-8.')
+            return
+        except csv.Error as exc:
+            resultado.erro(numero, f'CSV malformado ({exc}).')
+            return
+        yield numero, valores
+
+
+def importar_veiculos(linhas, tamanho_lote=TAMANHO_LOTE, simular=False):
+    """
+    Importa veículos de um CSV (iterável de linhas de texto, com cabeçalho).
+
+    Todas as linhas são validadas antes de gravar qualquer coisa; se houver
+    erro em alguma (ou o arquivo não for um CSV em UTF-8), nada é importado. Sem erros, os veículos são inseridos
+    com bulk_create em lotes, numa única transação, e a versão dos dados é
+    atualizada uma vez só.
+    """
+    resultado = ResultadoImportacao()
+    try:
+        cabecalho, leitor = _ler_csv(linhas)
+    except UnicodeDecodeError:
+        resultado.erro(1, 'o arquivo precisa estar em UTF-8.')
+        return resultado
+    except csv.Error as exc:
+        resultado.erro(1, f'CSV malformado ({exc}).')
+        return resultado
+
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in cabecalho]
+    if faltando:
+        resultado.erro(1, f"Colunas obrigatórias ausentes: {', '.join(faltando)}.")
+        return resultado
+
+    # Tabelas de consulta em memória: nenhuma consulta por linha
+    modelos = {_normalizar(nome): pk for pk, nome in ModeloVeiculo.objects.values_list('pk', 'nome')}
+    regionais = _mapa_nome_sigla(Regional.objects.all())
+    departamentos = _mapa_nome_sigla(Departamento.objects.all())
+    tipos = _mapa_escolhas(Veiculo.TIPO_VEICULO_CHOICES)
+    segmentos = _mapa_escolhas(Veiculo.SEGMENTO_CHOICES)
+    placas = {_normalizar(placa) for placa in Veiculo.objects.values_list('placa', flat=True)}
+    prefixos = {_normalizar(prefixo) for prefixo in Veiculo.objects.exclude(prefixo=None).values_list('prefixo', flat=True)}
+
+    tamanho_max = {campo: Veiculo._meta.get_field(campo).max_length for campo in ('prefixo', 'placa')}
+    novos = []
+    for numero, valores in _linhas_numeradas(leitor, resultado):
+        if not any(valor.strip() for valor in valores):
+            continue
+        dados = {coluna: valor.strip() for coluna, valor in zip(cabecalho, valores)}
+        erros_linha = []
+
+        for coluna in COLUNAS_OBRIGATORIAS:
+            if not dados.get(coluna):
+                erros_linha.append(f'"{coluna}" é obrigatório')
+
+        placa = dados.get('placa', '').upper()
+        prefixo = dados.get('prefixo') or None
+        for campo, valor in (('placa', placa), ('prefixo', prefixo)):
+            if valor and len(valor) > tamanho_max[campo]:
+                erros_linha.append(f'{campo} "{valor}" passa de {tamanho_max[campo]} caracteres')
+        if placa and _normalizar(placa) in placas:
+            erros_linha.append(f'placa "{placa}" já cadastrada ou repetida no arquivo')
+        if prefixo and _normalizar(prefixo) in prefixos:
+            erros_linha.append(f'prefixo "{prefixo}" já cadastrado ou repetido no arquivo')
+
+        modelo_id = modelos.get(_normalizar(dados.get('modelo')))
+        if dados.get('modelo') and not modelo_id:
+            erros_linha.append(f'modelo "{dados["modelo"]}" não encontrado')
+        regional_id = _buscar_cadastro(regionais, dados.get('regional'), 'regional', 'a', erros_linha)
+        departamento_id = _buscar_cadastro(departamentos, dados.get('departamento'), 'departamento', 'o', erros_linha)
+
+        tipo = tipos.get(_normalizar(dados.get('tipo_veiculo') or 'LEVE'))
+        segmento = segmentos.get(_normalizar(dados.get('segmento') or 'N/A'))
+        if not tipo:
+            erros_linha.append(f'tipo de veículo "{dados["tipo_veiculo"]}" inválido')
+        if not segmento:
+            erros_linha.append(f'segmento "{dados["segmento"]}" inválido')
+
+        # Registra já, para acusar repetições dentro do próprio arquivo
+        placas.add(_normalizar(placa))
+        if prefixo:
+            prefixos.add(_normalizar(prefixo))
+
+        if erros_linha:
+            resultado.erro(numero, '; '.join(erros_linha) + '.')
+            continue
+        novos.append(Veiculo(
+            prefixo=prefixo, placa=placa, modelo_id=modelo_id, tipo_veiculo=tipo,
+            segmento=segmento, regional_id=regional_id, departamento_id=departamento_id,
+        ))
+
+    resultado.validos = len(novos)
+    if resultado.erros or simular:
+        return resultado
+
+    with transaction.atomic():
+        for inicio in range(0, len(novos), tamanho_lote):
+            lote = novos[inicio:inicio + tamanho_lote]
+            Veiculo.objects.bulk_create(lote)
+            sincronizar(Veiculo.objects.filter(placa__in=[veiculo.placa for veiculo in lote]))
+        if novos:
+            registrar_atualizacao(painel=True)
+    resultado.criados = len(novos)
+    return resultado
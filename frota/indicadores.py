@@ -0,0 +1,184 @@
+# frota/indicadores.py
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import F, Max, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import EventoStatus, IndicadorDiario, IndicadorOficinaDiario, Veiculo
+
+TAMANHO_LOTE = 1000
+
+# Posição de cada status no contador [total, disponíveis, em manutenção, indisponíveis]
+POSICAO_STATUS = {'Disponível': 1, 'Em Manutenção': 2, 'Indisponível': 3}
+
+# Dimensão escolhida na página -> campo agrupado na tabela de indicadores
+DIMENSOES = {
+    'regional': ('regional__sigla', 'Regional'),
+    'departamento': ('departamento__sigla', 'Departamento'),
+    'tipo_veiculo': ('tipo_veiculo', 'Tipo de Veículo'),
+    'segmento': ('segmento', 'Segmento'),
+}
+
+# Acima disso a série histórica é agrupada por mês em vez de por dia
+MAX_DIAS_SERIE_DIARIA = 92
+
+
+def _fim_do_dia(dia):
+    return timezone.make_aware(datetime.combine(dia + timedelta(days=1), time.min))
+
+
+def dias_pendentes(ate=None, desde=None):
+    """
+    Primeiro e último dia ainda não consolidados. O dia corrente nunca entra:
+    o retrato é sempre do fim do dia. Na primeira execução começa em `desde`,
+    ou no dia do evento mais antigo do histórico.
+    """
+    ate = ate or timezone.localdate() - timedelta(days=1)
+    ultimo = IndicadorDiario.objects.aggregate(ultimo=Max('data'))['ultimo']
+    if ultimo:
+        inicio = ultimo + timedelta(days=1)
+    elif desde:
+        inicio = desde
+    else:
+        primeiro = EventoStatus.objects.order_by('data_hora').values_list('data_hora', flat=True).first()
+        inicio = timezone.localdate(primeiro) if primeiro else ate
+    return inicio, ate
+
+
+def _retratos_frota(inicio, ate):
+    """
+    Reconstrói o status da frota no fim de cada dia, do mais recente para o mais
+    antigo: parte do status atual e desfaz os eventos posteriores a cada dia,
+    mantendo os contadores por grupo em vez de recontar a frota dia a dia.
+
+    É uma aproximação: o histórico guarda só o status, então cada veículo entra
+    no grupo (regional, departamento, tipo e segmento) que tem hoje, e veículos
+    já excluídos não aparecem. Veículos cadastrados depois de um dia saem dele
+    pelo criado_em; os sem criado_em (anteriores ao campo) contam em todos.
+    """
+    contadores = defaultdict(lambda: [0, 0, 0, 0])
+    veiculos = {}
+    criacoes = []  # (criado_em, pk) dos veículos cadastrados depois do primeiro dia
+    for pk, regional, departamento, tipo, segmento, status, criado_em in Veiculo.objects.values_list(
+        'pk', 'regional_id', 'departamento_id', 'tipo_veiculo', 'segmento', 'status', 'criado_em'
+    ).iterator(chunk_size=TAMANHO_LOTE):
+        grupo = (regional, departamento, tipo, segmento)
+        veiculos[pk] = [grupo, status]
+        contadores[grupo][0] += 1
+        contadores[grupo][POSICAO_STATUS[status]] += 1
+        if criado_em and criado_em >= _fim_do_dia(inicio):
+            criacoes.append((criado_em, pk))
+    criacoes.sort()  # o mais recente no fim, para sair primeiro
+
+    eventos = EventoStatus.objects.filter(
+        data_hora__gte=_fim_do_dia(inicio), veiculo__isnull=False,
+    ).order_by('-data_hora', '-pk').values_list('veiculo_id', 'status_anterior', 'data_hora').iterator(chunk_size=TAMANHO_LOTE)
+    evento = next(eventos, None)
+
+    dia = ate
+    while dia >= inicio:
+        limite = _fim_do_dia(dia)
+        while evento and evento[2] >= limite:
+            veiculo_id, status_anterior, _ = evento
+            if veiculo_id in veiculos:
+                grupo, status = veiculos[veiculo_id]
+                contadores[grupo][POSICAO_STATUS[status]] -= 1
+                contadores[grupo][POSICAO_STATUS[status_anterior]] += 1
+                veiculos[veiculo_id][1] = status_anterior
+            evento = next(eventos, None)
+
+        # Tira do dia os veículos cadastrados depois dele (seus eventos já foram desfeitos)
+        while criacoes and criacoes[-1][0] >= limite:
+            grupo, status = veiculos.pop(criacoes.pop()[1])
+            contadores[grupo][0] -= 1
+            contadores[grupo][POSICAO_STATUS[status]] -= 1
+
+        for (regional, departamento, tipo, segmento), (total, disponiveis, manutencao, indisponiveis) in contadores.items():
+            if total:
+                yield IndicadorDiario(
+                    data=dia, regional_id=regional, departamento_id=departamento, tipo_veiculo=tipo,
+                    segmento=segmento, total=total, disponiveis=disponiveis,
+                    em_manutencao=manutencao, indisponiveis=indisponiveis,
+                )
+        dia -= timedelta(days=1)
+
+
+def _manutencoes_concluidas(inicio, ate):
+    contadores = defaultdict(lambda: [0, 0, 0, 0])
+    saidas = EventoStatus.objects.filter(
+        tipo=EventoStatus.SAIDA_MANUTENCAO,
+        data_hora__gte=_fim_do_dia(inicio - timedelta(days=1)), data_hora__lt=_fim_do_dia(ate),
+    ).values_list('data_hora', 'nome_oficina', 'cidade_oficina', 'data_entrada', 'data_previsao_saida')
+    for data_hora, oficina, cidade, entrada, previsao in saidas.iterator(chunk_size=TAMANHO_LOTE):
+        saida = timezone.localdate(data_hora)
+        contador = contadores[(saida, oficina, cidade)]
+        contador[0] += 1
+        contador[1] += max((saida - entrada).days, 0) if entrada else 0
+        if previsao:
+            contador[2] += 1
+            contador[3] += saida > previsao
+    return [
+        IndicadorOficinaDiario(
+            data=data, nome_oficina=oficina, cidade_oficina=cidade, concluidas=concluidas,
+            dias_em_manutencao=dias, com_previsao=com_previsao, previsoes_descumpridas=descumpridas,
+        )
+        for (data, oficina, cidade), (concluidas, dias, com_previsao, descumpridas) in contadores.items()
+    ]
+
+
+def consolidar(ate=None, desde=None):
+    """Grava os indicadores dos dias ainda não consolidados. Devolve (início, fim) ou None."""
+    inicio, ate = dias_pendentes(ate, desde)
+    if inicio > ate:
+        return None
+    with transaction.atomic():
+        IndicadorDiario.objects.bulk_create(_retratos_frota(inicio, ate), batch_size=TAMANHO_LOTE)
+        IndicadorOficinaDiario.objects.bulk_create(_manutencoes_concluidas(inicio, ate), batch_size=TAMANHO_LOTE)
+    return inicio, ate
+
+
+# --- Consultas da página de indicadores (só leem as tabelas consolidadas) ---
+
+def _percentual(parte, total):
+    return round(100 * parte / total, 1) if total else None
+
+
+def disponibilidade_por(dimensao, inicio, fim):
+    campo, _ = DIMENSOES[dimensao]
+    linhas = IndicadorDiario.objects.filter(data__range=(inicio, fim)).values(campo).annotate(
+        total=Sum('total'), disponiveis=Sum('disponiveis'),
+        em_manutencao=Sum('em_manutencao'), indisponiveis=Sum('indisponiveis'),
+    ).order_by(campo)
+    for linha in linhas:
+        linha['grupo'] = linha.pop(campo)
+        linha['disponibilidade'] = _percentual(linha['disponiveis'], linha['total'])
+    return list(linhas)
+
+
+def serie_disponibilidade(inicio, fim):
+    consulta = IndicadorDiario.objects.filter(data__range=(inicio, fim))
+    if (fim - inicio).days > MAX_DIAS_SERIE_DIARIA:
+        consulta = consulta.annotate(periodo=TruncMonth('data'))
+    else:
+        consulta = consulta.annotate(periodo=F('data'))
+    linhas = consulta.values('periodo').annotate(total=Sum('total'), disponiveis=Sum('disponiveis')).order_by('periodo')
+    for linha in linhas:
+        linha['disponibilidade'] = _percentual(linha['disponiveis'], linha['total'])
+    return list(linhas)
+
+
+def desempenho_oficinas(inicio, fim):
+    linhas = IndicadorOficinaDiario.objects.filter(data__range=(inicio, fim)).values(
+        'nome_oficina', 'cidade_oficina',
+    ).annotate(
+        concluidas=Sum('concluidas'), dias=Sum('dias_em_manutencao'),
+        com_previsao=Sum('com_previsao'), descumpridas=Sum('previsoes_descumpridas'),
+    ).order_by('-concluidas', 'nome_oficina')
+    for linha in linhas:
+        linha['media_dias'] = round(linha['dias'] / linha['concluidas'], 1)
+        linha['atraso'] = _percentual(linha['descumpridas'], linha['com_previsao'])
+    return list(linhas)
@@ -0,0 +1,29 @@
+# frota/management/commands/atualizar_replica_sqlite.py
+
+import sqlite3
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from pweb.roteador import REPLICA
+
+
+class Command(BaseCommand):
+    help = (
+        'Copia o banco principal para a réplica quando os dois são arquivos SQLite. '
+        'Simula a replicação em desenvolvimento; em produção quem faz isso é o próprio banco.'
+    )
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError('Nenhuma réplica configurada (DATABASE_REPLICA_URL).')
+        origem, destino = settings.DATABASES['default'], settings.DATABASES[REPLICA]
+        if 'sqlite3' not in origem['ENGINE'] or 'sqlite3' not in destino['ENGINE']:
+            raise CommandError('Este comando só funciona com principal e réplica em SQLite.')
+
+        connections[REPLICA].close()
+        with closing(sqlite3.connect(origem['NAME'])) as principal, closing(sqlite3.connect(destino['NAME'])) as replica:
+            principal.backup(replica)
+        self.stdout.write(self.style.SUCCESS(f'Réplica atualizada: {destino["NAME"]}'))
@@ -0,0 +1,238 @@
+# frota/management/commands/benchmark_frota.py
+
+import json
+import time
+from statistics import median
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from frota import transicoes
+from frota.filtros import CAMPOS_FILTRO_INDEX
+from frota.models import PainelVeiculo, Veiculo
+from frota.sintetico import gerar_frota
+from pweb import roteador
+
+TAMANHOS = [1000, 10000]
+
+# Diferenças menores que isso (ms) são ruído, qualquer que seja a proporção
+PISO_REGRESSAO_MS = 1.0
+
+DADOS_MANUTENCAO = {
+    'servicos': 'Benchmark', 'nome_oficina': 'Oficina benchmark', 'cidade_oficina': 'Teresina',
+    'data_previsao_saida': None, 'numero_os': 'BENCH', 'status_os': 'N/A',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a página inicial (com cada filtro), a lista de veículos, as páginas de catálogo e as '
+        'transições de status sobre frotas sintéticas, e grava os resultados em JSON para comparar '
+        'entre execuções. Por padrão cada frota é gerada num banco descartável.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamanhos', type=int, nargs='+', default=TAMANHOS,
+            help='Tamanhos das frotas geradas (padrão: 1000 10000).',
+        )
+        parser.add_argument(
+            '--banco-atual', action='store_true',
+            help='Mede a frota do banco configurado, sem gerar nada. Tudo é desfeito no fim.',
+        )
+        parser.add_argument('--repeticoes', type=int, default=5, help='Execuções medidas de cada caso (padrão: 5).')
+        parser.add_argument('--lote', type=int, default=100, help='Veículos por transição em massa (padrão: 100).')
+        parser.add_argument('--semente', type=int, default=1, help='Semente da frota sintética.')
+        parser.add_argument('--saida', help='Grava os resultados neste arquivo JSON.')
+        parser.add_argument('--comparar', help='JSON de uma execução anterior para apontar regressões.')
+        parser.add_argument(
+            '--tolerancia', type=float, default=0.2,
+            help='Aumento relativo do tempo aceito antes de apontar regressão (padrão: 0.2).',
+        )
+        parser.add_argument('--estrito', action='store_true', help='Termina com erro se houver regressão.')
+
+    # --- medição ---
+
+    def medir(self, executar, preparar=None):
+        """Uma execução de aquecimento, uma que conta as consultas e depois as medidas."""
+        # O aquecimento enche os caches do processo (templates, listas de opções),
+        # para a contagem refletir os requests seguintes e não o primeiro
+        if preparar:
+            preparar()
+        executar()
+        if preparar:
+            preparar()
+        with CaptureQueriesContext(connection) as capturadas:
+            executar()
+        # Cada request novo limpa connection.queries; contar antes de medir
+        consultas = len(capturadas)
+        tempos = []
+        for _ in range(self.repeticoes):
+            if preparar:
+                preparar()
+            inicio = time.perf_counter()
+            executar()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        return {'mediana_ms': round(median(tempos), 2), 'minimo_ms': round(min(tempos), 2), 'consultas': consultas}
+
+    def pagina(self, cliente, url, anonima=False):
+        def executar():
+            response = cliente.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'GET {url} respondeu {response.status_code}.')
+        # Sem limpar o cache a página inicial mediria só o cache de páginas
+        return self.medir(executar, preparar=cache.clear if anonima else None)
+
+    def valores_filtro(self):
+        linha = PainelVeiculo.objects.exclude(prefixo=None).order_by('pk').first()
+        if linha is None:
+            raise CommandError('Não há veículos para medir.')
+        return {
+            'placa': linha.placa[:4],
+            'departamento': linha.departamento_id,
+            'status': 'Em Manutenção',
+            'regional': linha.regional_id,
+            'tipo_veiculo': linha.tipo_veiculo,
+            'segmento': linha.segmento,
+        }
+
+    def transicoes(self, usuario, tamanho_lote):
+        ids = list(Veiculo.objects.filter(status='Disponível').order_by('pk').values_list('pk', flat=True)[:tamanho_lote])
+        if len(ids) < tamanho_lote:
+            raise CommandError(f'Menos de {tamanho_lote} veículos disponíveis para medir as transições.')
+        # O ciclo devolve os veículos ao status inicial, então cada passo pode repetir
+        passos = [
+            ('enviar_para_manutencao', lambda: transicoes.enviar_para_manutencao(
+                ids, dict(DADOS_MANUTENCAO, data_entrada=timezone.localdate()), usuario)),
+            ('concluir_manutencoes', lambda: transicoes.concluir_manutencoes(ids, usuario)),
+            ('marcar_indisponiveis', lambda: transicoes.marcar_indisponiveis(ids, {'motivo': 'Benchmark'}, usuario)),
+            ('tornar_disponiveis', lambda: transicoes.tornar_disponiveis(ids, usuario)),
+        ]
+        consultas, tempos = {}, {nome: [] for nome, _ in passos}
+        for rodada in range(self.repeticoes + 1):
+            for nome, passo in passos:
+                if rodada == 0:
+                    with CaptureQueriesContext(connection) as capturadas:
+                        passo()
+                    consultas[nome] = len(capturadas)
+                    continue
+                inicio = time.perf_counter()
+                passo()
+                tempos[nome].append((time.perf_counter() - inicio) * 1000)
+        return {
+            f'{nome}[{tamanho_lote}]': {
+                'mediana_ms': round(median(tempos[nome]), 2), 'minimo_ms': round(min(tempos[nome]), 2),
+                'consultas': consultas[nome],
+            }
+            for nome, _ in passos
+        }
+
+    def casos(self):
+        usuario, _ = User.objects.get_or_create(username='benchmark-frota')
+        anonimo, logado = Client(HTTP_HOST='127.0.0.1'), Client(HTTP_HOST='127.0.0.1')
+        logado.force_login(usuario)
+        if roteador.REPLICA in settings.DATABASES:
+            # A réplica não enxerga o banco descartável; o cookie mantém as leituras no principal
+            anonimo.cookies[roteador.COOKIE_PRINCIPAL] = '1'
+
+        resultados = {'index': self.pagina(anonimo, reverse('index'), anonima=True)}
+        valores = self.valores_filtro()
+        for campo in CAMPOS_FILTRO_INDEX:
+            valor = valores[campo]
+            resultados[f'index?{campo}'] = self.pagina(anonimo, f'{reverse("index")}?{campo}={valor}', anonima=True)
+        for nome in ('gerenciar_veiculos', 'gerenciar_modelos', 'gerenciar_regionais', 'gerenciar_departamentos'):
+            resultados[nome] = self.pagina(logado, reverse(nome))
+        resultados['gerenciar_veiculos?status'] = self.pagina(logado, reverse('gerenciar_veiculos') + '?status=Em+Manutenção')
+        resultados['buscar'] = self.pagina(logado, reverse('buscar') + '?q=revisao')
+        for tamanho_lote in sorted({1, self.lote}):
+            resultados.update(self.transicoes(usuario, tamanho_lote))
+        return resultados
+
+    def frota(self, nome, casos):
+        self.stdout.write(f'\nFrota {nome}:')
+        for caso, medida in casos.items():
+            self.stdout.write(f'  {caso:<36} {medida["mediana_ms"]:9.2f} ms  {medida["consultas"]:4d} consultas')
+
+    def medir_gerada(self, tamanho):
+        nome_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            inicio = time.perf_counter()
+            gerar_frota(tamanho, semente=self.semente)
+            self.stdout.write(f'Frota de {tamanho} veículos gerada em {time.perf_counter() - inicio:.1f} s')
+            return {'veiculos': tamanho, 'casos': self.casos()}
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+
+    def medir_atual(self):
+        # As transições e o usuário do benchmark não ficam no banco
+        with transaction.atomic():
+            resultado = {'veiculos': Veiculo.objects.count(), 'casos': self.casos()}
+            transaction.set_rollback(True)
+        return resultado
+
+    # --- comparação ---
+
+    def regressoes(self, atual, anterior):
+        encontradas = []
+        for frota, dados in atual['frotas'].items():
+            casos_anteriores = anterior.get('frotas', {}).get(frota, {}).get('casos', {})
+            for caso, medida in dados['casos'].items():
+                antes = casos_anteriores.get(caso)
+                if antes is None:
+                    continue
+                if medida['consultas'] > antes['consultas']:
+                    encontradas.append(f'{frota} {caso}: {antes["consultas"]} -> {medida["consultas"]} consultas')
+                diferenca = medida['mediana_ms'] - antes['mediana_ms']
+                if diferenca > PISO_REGRESSAO_MS and diferenca > antes['mediana_ms'] * self.tolerancia:
+                    encontradas.append(f'{frota} {caso}: {antes["mediana_ms"]} -> {medida["mediana_ms"]} ms')
+        return encontradas
+
+    def handle(self, *args, **options):
+        self.repeticoes, self.lote, self.semente = options['repeticoes'], options['lote'], options['semente']
+        self.tolerancia = options['tolerancia']
+        if settings.DEBUG:
+            self.stderr.write('Aviso: DEBUG=True desliga o cache de templates; os tempos não representam produção.')
+
+        resultado = {
+            'data': timezone.now().isoformat(),
+            'banco': connection.vendor,
+            'debug': settings.DEBUG,
+            'repeticoes': self.repeticoes,
+            'frotas': {},
+        }
+        if options['banco_atual']:
+            resultado['frotas']['atual'] = self.medir_atual()
+        else:
+            for tamanho in options['tamanhos']:
+                resultado['frotas'][str(tamanho)] = self.medir_gerada(tamanho)
+        for nome, dados in resultado['frotas'].items():
+            self.frota(nome, dados['casos'])
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f'\nResultados gravados em {options["saida"]}')
+
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as arquivo:
+                    anterior = json.load(arquivo)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Não foi possível ler {options["comparar"]}: {exc}')
+            encontradas = self.regressoes(resultado, anterior)
+            if not encontradas:
+                self.stdout.write(self.style.SUCCESS('\nNenhuma regressão em relação à execução anterior.'))
+            else:
+                self.stdout.write(self.style.WARNING(f'\n{len(encontradas)} regressão(ões):'))
+                for linha in encontradas:
+                    self.stdout.write(f'  {linha}')
+                if options['estrito']:
+                    raise CommandError('Desempenho pior que na execução anterior.')
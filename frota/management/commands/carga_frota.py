@@ -0,0 +1,327 @@
+# frota/management/commands/carga_frota.py
+
+import json
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from http.cookiejar import CookieJar
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from frota.models import Manutencao, Veiculo
+from frota.paginacao import codificar_cursor
+
+CONCORRENCIAS = [1, 4, 16, 64]
+PERCENTIS = (50, 95, 99)
+
+_CSRF = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class _SemRedirecionar(urllib.request.HTTPRedirectHandler):
+    """Cada request é medido sozinho: o 302 de um POST conta como resposta, sem seguir para a lista."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def percentil(ordenados, p):
+    """Percentil pelo posto mais próximo de uma lista já ordenada."""
+    if not ordenados:
+        return None
+    posto = max(1, round(p / 100 * len(ordenados)))
+    return ordenados[posto - 1]
+
+
+class Frota:
+    """O que os usuários virtuais sorteiam: veículos, status atual e valores dos filtros."""
+
+    def __init__(self, dados):
+        colunas, dicionarios = dados['colunas'], dados['dicionarios']
+        self.ids = colunas['id']
+        self.cursores = [
+            codificar_cursor(SimpleNamespace(prefixo=prefixo, pk=pk))
+            for prefixo, pk in zip(colunas['prefixo'], colunas['id'])
+        ]
+        self.placas = colunas['placa']
+        self.status = {
+            pk: dicionarios['status'][indice] for pk, indice in zip(colunas['id'], colunas['status'])
+        }
+        self.regionais = [pk for pk, _ in dicionarios['regional']]
+        self.departamentos = [pk for pk, _ in dicionarios['departamento']]
+
+
+class Usuario(threading.Thread):
+    """Um navegador: cookies próprios, e as medidas de cada endpoint que visitou."""
+
+    def __init__(self, comando, frota, semente):
+        super().__init__(daemon=True)
+        self.comando, self.frota = comando, frota
+        # Definido na hora da largada; até lá nada é medido
+        self.fim = 0
+        self.aleatorio = random.Random(semente)
+        self.navegador = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _SemRedirecionar,
+        )
+        self.medidas = defaultdict(lambda: {'tempos': [], 'erros': 0})
+
+    def requisitar(self, endpoint, caminho, params=None, dados=None, medir=True):
+        """Devolve (status, corpo, cabeçalhos); status None se a conexão falhou."""
+        url = self.comando.url + caminho
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        corpo_envio = urllib.parse.urlencode(dados).encode() if dados is not None else None
+        # Referer: o CSRF do Django exige sob HTTPS
+        pedido = urllib.request.Request(url, data=corpo_envio, headers={'Referer': url})
+        inicio = time.perf_counter()
+        try:
+            with self.navegador.open(pedido, timeout=self.comando.timeout) as resposta:
+                status, corpo, cabecalhos = resposta.status, resposta.read(), resposta.headers
+        except urllib.error.HTTPError as erro:
+            status, corpo, cabecalhos = erro.code, erro.read(), erro.headers
+        except OSError:
+            status, corpo, cabecalhos = None, b'', {}
+        duracao = time.perf_counter() - inicio
+
+        if medir and time.monotonic() < self.fim:
+            # Um redirecionamento para o login é uma sessão perdida, não sucesso
+            perdeu_sessao = status == 302 and self.comando.url_login in cabecalhos.get('Location', '')
+            medida = self.medidas[endpoint]
+            if status is None or status >= 400 or perdeu_sessao:
+                medida['erros'] += 1
+            else:
+                medida['tempos'].append(duracao)
+        return status, corpo, cabecalhos
+
+    def run(self):
+        while time.monotonic() < self.fim:
+            self.passo()
+            if self.comando.pausa:
+                time.sleep(self.aleatorio.uniform(0, 2 * self.comando.pausa))
+
+
+class Telao(Usuario):
+    """Visitante anônimo da página inicial, com filtros e páginas sorteados."""
+
+    def filtros(self):
+        sorteio = self.aleatorio
+        params = {}
+        if sorteio.random() < 0.3:
+            params['status'] = sorteio.choice(Veiculo.STATUS_CHOICES)[0]
+        if sorteio.random() < 0.2:
+            params['regional'] = sorteio.choice(self.frota.regionais)
+        if sorteio.random() < 0.2:
+            params['departamento'] = sorteio.choice(self.frota.departamentos)
+        if sorteio.random() < 0.1:
+            params['tipo_veiculo'] = sorteio.choice(Veiculo.TIPO_VEICULO_CHOICES)[0]
+        if sorteio.random() < 0.1:
+            params['segmento'] = sorteio.choice(Veiculo.SEGMENTO_CHOICES)[0]
+        if sorteio.random() < 0.1:
+            params['placa'] = sorteio.choice(self.frota.placas)[:sorteio.randint(3, 6)]
+        if sorteio.random() < 0.2:
+            params['apos'] = sorteio.choice(self.frota.cursores)
+        return params
+
+    def passo(self):
+        self.requisitar('index', self.comando.url_index, self.filtros())
+
+
+class Administrador(Usuario):
+    """
+    Usuário logado: abre a lista de veículos e, às vezes, muda o status de um
+    dos seus veículos pelos mesmos formulários (e token CSRF) da página.
+    Cada administrador só mexe na sua parte da frota, para dois não
+    disputarem o mesmo veículo.
+    """
+
+    def __init__(self, comando, frota, semente, veiculos):
+        super().__init__(comando, frota, semente)
+        self.veiculos = veiculos
+        self.token = None
+
+    def entrar(self):
+        _, corpo, _ = self.requisitar('login', self.comando.url_login, medir=False)
+        encontrado = _CSRF.search(corpo.decode())
+        dados = {'username': self.comando.usuario, 'password': self.comando.senha}
+        status, _, _ = self.requisitar(
+            'login', self.comando.url_login, dados=dict(dados, csrfmiddlewaretoken=encontrado[1] if encontrado else ''),
+            medir=False,
+        )
+        if status != 302:
+            raise CommandError(f'Login de {self.comando.usuario} falhou (HTTP {status}).')
+
+    def lista(self):
+        params = {}
+        if self.aleatorio.random() < 0.3:
+            params['status'] = self.aleatorio.choice(Veiculo.STATUS_CHOICES)[0]
+        status, corpo, _ = self.requisitar('gerenciar_veiculos', self.comando.url_veiculos, params)
+        if status == 200:
+            encontrado = _CSRF.search(corpo.decode())
+            if encontrado:
+                self.token = encontrado[1]
+
+    def transicao(self):
+        pk = self.aleatorio.choice(self.veiculos)
+        status = self.frota.status[pk]
+        if status == 'Disponível' and self.aleatorio.random() < 0.7:
+            dados = {
+                'servicos': 'Teste de carga', 'nome_oficina': 'Oficina de carga', 'cidade_oficina': 'Teresina',
+                'data_entrada': timezone.localdate().isoformat(), 'numero_os': f'CARGA-{pk}',
+                'status_os': Manutencao.STATUS_OS_CHOICES[0][0],
+            }
+            endpoint, novo = 'gerenciar_manutencao', 'Em Manutenção'
+        elif status == 'Disponível':
+            endpoint, novo, dados = 'gerenciar_indisponibilidade', 'Indisponível', {'motivo': 'Teste de carga'}
+        else:
+            # Concluir e tornar disponível são links (GET) nos modais
+            endpoint = 'concluir_manutencao' if status == 'Em Manutenção' else 'tornar_disponivel'
+            novo, dados = 'Disponível', None
+
+        if dados is not None:
+            dados['csrfmiddlewaretoken'] = self.token
+        resposta, _, _ = self.requisitar(endpoint, reverse(endpoint, args=[pk]), dados=dados)
+        if resposta == 302:
+            self.frota.status[pk] = novo
+
+    def passo(self):
+        if self.veiculos and self.token and self.aleatorio.random() < self.comando.transicoes:
+            self.transicao()
+        else:
+            self.lista()
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga por HTTP contra um servidor já rodando (runserver, gunicorn, ASGI): telões '
+        'anônimos abrem a página inicial com filtros sorteados e administradores logados abrem a lista '
+        'de veículos e mudam status pelos formulários. Para cada concorrência mede latência (p50/p95/p99), '
+        'vazão e erros por endpoint; a vazão que para de crescer marca a saturação. As transições alteram '
+        'o banco do servidor: use uma frota sintética (gerar_frota).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Servidor (padrão: http://127.0.0.1:8000).')
+        parser.add_argument(
+            '--concorrencias', type=int, nargs='+', default=CONCORRENCIAS,
+            help='Usuários simultâneos em cada etapa (padrão: 1 4 16 64).',
+        )
+        parser.add_argument('--duracao', type=float, default=20, help='Segundos medidos em cada etapa (padrão: 20).')
+        parser.add_argument('--admins', type=float, default=0.25, help='Fração dos usuários que são administradores (padrão: 0.25).')
+        parser.add_argument('--usuario', help='Login dos administradores.')
+        parser.add_argument('--senha', help='Senha dos administradores.')
+        parser.add_argument(
+            '--transicoes', type=float, default=0.3,
+            help='Chance de cada passo de um administrador ser uma mudança de status (padrão: 0.3).',
+        )
+        parser.add_argument('--pausa', type=float, default=0, help='Pausa média (s) entre requests de um usuário (padrão: 0).')
+        parser.add_argument('--timeout', type=float, default=30, help='Timeout de cada request em segundos (padrão: 30).')
+        parser.add_argument('--semente', type=int, default=1, help='Semente dos sorteios.')
+        parser.add_argument('--saida', help='Grava os resultados neste arquivo JSON.')
+
+    def carregar_frota(self):
+        url = self.url + reverse('frota_compacta')
+        try:
+            # urlopen segue o redirecionamento para a versão atual
+            with urllib.request.urlopen(url, timeout=self.timeout) as resposta:
+                return Frota(json.load(resposta))
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Não foi possível ler a frota em {url}: {exc}')
+
+    def etapa(self, frota, concorrencia, indice):
+        admins = round(concorrencia * self.admins)
+        semente = self.semente * 1000 + indice * 100
+        administradores = [Administrador(self, frota, semente + i, frota.ids[i::admins]) for i in range(admins)]
+        usuarios = administradores + [Telao(self, frota, semente + i) for i in range(admins, concorrencia)]
+        # Os logins ficam fora da medição
+        for administrador in administradores:
+            administrador.entrar()
+
+        fim = time.monotonic() + self.duracao
+        for usuario in usuarios:
+            usuario.fim = fim
+            usuario.start()
+        for usuario in usuarios:
+            # O último request pode passar do fim; o que passa não é medido
+            usuario.join(self.duracao + self.timeout + 5)
+
+        juntas = defaultdict(lambda: {'tempos': [], 'erros': 0})
+        for usuario in usuarios:
+            for endpoint, medida in usuario.medidas.items():
+                juntas[endpoint]['tempos'] += medida['tempos']
+                juntas[endpoint]['erros'] += medida['erros']
+        todas = {'tempos': [t for m in juntas.values() for t in m['tempos']], 'erros': sum(m['erros'] for m in juntas.values())}
+        return {
+            'concorrencia': concorrencia,
+            'administradores': admins,
+            'total': self.resumo(todas),
+            'endpoints': {endpoint: self.resumo(medida) for endpoint, medida in sorted(juntas.items())},
+        }
+
+    def resumo(self, medida):
+        tempos = sorted(medida['tempos'])
+        total = len(tempos) + medida['erros']
+        resumo = {
+            'requests': total,
+            'por_segundo': round(len(tempos) / self.duracao, 1),
+            'erros': medida['erros'],
+            'taxa_erros': round(medida['erros'] / total, 4) if total else 0,
+        }
+        for p in PERCENTIS:
+            valor = percentil(tempos, p)
+            resumo[f'p{p}_ms'] = round(valor * 1000, 1) if valor is not None else None
+        return resumo
+
+    def linha(self, nome, resumo):
+        percentis = '  '.join(
+            f'{resumo[f"p{p}_ms"]:8.1f}' if resumo[f'p{p}_ms'] is not None else f'{"-":>8}' for p in PERCENTIS
+        )
+        return (
+            f'  {nome:<28} {resumo["requests"]:7d} {resumo["por_segundo"]:8.1f}/s  {percentis}'
+            f'  {resumo["taxa_erros"]:7.1%}'
+        )
+
+    def handle(self, *args, **options):
+        self.url = options['url'].rstrip('/')
+        self.duracao, self.admins, self.pausa = options['duracao'], options['admins'], options['pausa']
+        self.transicoes, self.timeout, self.semente = options['transicoes'], options['timeout'], options['semente']
+        self.usuario, self.senha = options['usuario'], options['senha']
+        if self.admins > 0 and not (self.usuario and self.senha):
+            raise CommandError('Informe --usuario e --senha dos administradores, ou use --admins 0.')
+        self.url_index, self.url_veiculos = reverse('index'), reverse('gerenciar_veiculos')
+        self.url_login = reverse(settings.LOGIN_URL)
+
+        frota = self.carregar_frota()
+        self.stdout.write(f'{len(frota.ids)} veículos em {self.url}')
+        cabecalho = f'  {"endpoint":<28} {"requests":>7} {"vazão":>10}  ' + '  '.join(f'{f"p{p} ms":>8}' for p in PERCENTIS) + '    erros'
+
+        etapas = []
+        for indice, concorrencia in enumerate(options['concorrencias']):
+            etapa = self.etapa(frota, concorrencia, indice)
+            etapas.append(etapa)
+            self.stdout.write(f'\n{concorrencia} usuário(s), {etapa["administradores"]} administrador(es):')
+            self.stdout.write(cabecalho)
+            for endpoint, resumo in etapa['endpoints'].items():
+                self.stdout.write(self.linha(endpoint, resumo))
+            self.stdout.write(self.linha('total', etapa['total']))
+
+        self.stdout.write('\nCurva de saturação:')
+        self.stdout.write(cabecalho.replace('endpoint', 'usuários'))
+        for etapa in etapas:
+            self.stdout.write(self.linha(str(etapa['concorrencia']), etapa['total']))
+
+        if options['saida']:
+            resultado = {
+                'data': timezone.now().isoformat(), 'url': self.url, 'duracao': self.duracao,
+                'admins': self.admins, 'transicoes': self.transicoes, 'pausa': self.pausa, 'etapas': etapas,
+            }
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f'\nResultados gravados em {options["saida"]}')
@@ -0,0 +1,38 @@
+# frota/management/commands/consolidar_indicadores.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from frota.indicadores import consolidar
+
+
+def _data(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f'Data inválida: "{valor}". Use o formato AAAA-MM-DD.')
+
+
+class Command(BaseCommand):
+    help = (
+        'Consolida os indicadores diários da frota (disponibilidade e manutenções por oficina) '
+        'para os dias que ainda não foram processados, até ontem. Feito para rodar uma vez por dia (cron). '
+        'Dias passados (na primeira execução ou com --desde) são reconstruídos a partir do histórico de status: '
+        'cada veículo conta na regional, departamento, tipo e segmento atuais, veículos excluídos não aparecem '
+        'e os cadastrados antes do campo criado_em contam desde o primeiro dia.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Primeiro dia (AAAA-MM-DD), usado só quando ainda não há nada consolidado.')
+        parser.add_argument('--ate', help='Último dia a consolidar (AAAA-MM-DD). Padrão: ontem.')
+
+    def handle(self, *args, **options):
+        desde = _data(options['desde']) if options['desde'] else None
+        ate = _data(options['ate']) if options['ate'] else None
+        periodo = consolidar(ate=ate, desde=desde)
+        if periodo is None:
+            self.stdout.write('Nenhum dia pendente.')
+        else:
+            inicio, fim = periodo
+            self.stdout.write(self.style.SUCCESS(f'Indicadores consolidados de {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}.'))
@@ -0,0 +1,118 @@
+# frota/management/commands/explicar_filtros.py
+
+import re
+from itertools import combinations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import QueryDict
+
+from frota.filtros import CAMPOS_FILTRO_INDEX, filtrar_veiculos
+from frota.models import PainelVeiculo, Veiculo
+from frota.paginacao import ORDEM
+
+# A página inicial lê a cópia desnormalizada da frota
+TABELA = PainelVeiculo._meta.db_table
+
+# Criado pela migração 0018, só no PostgreSQL
+INDICE_TRIGRAM_PLACA = 'painel_placa_trgm_idx'
+
+
+class Command(BaseCommand):
+    help = (
+        'Roda EXPLAIN na consulta da página inicial para cada combinação de filtros '
+        'e mostra qual índice do painel a atende, ou se nenhum atende. No PostgreSQL o '
+        'planejador prefere varrer tabelas pequenas: rode num banco com a frota real '
+        '(ou gerar_frota) e estatísticas atualizadas (ANALYZE).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--estrito', action='store_true',
+            help='Termina com erro se alguma combinação não for atendida por índice.',
+        )
+        parser.add_argument(
+            '--plano', action='store_true',
+            help='Mostra o plano completo de cada consulta.',
+        )
+
+    def valores_exemplo(self):
+        veiculo = Veiculo.objects.order_by('pk').first()
+        return {
+            'placa': veiculo.placa[:3] if veiculo else 'ABC',
+            'departamento': str(veiculo.departamento_id if veiculo else 1),
+            'status': veiculo.status if veiculo else 'Disponível',
+            'regional': str(veiculo.regional_id if veiculo else 1),
+            'tipo_veiculo': veiculo.tipo_veiculo if veiculo else 'LEVE',
+            'segmento': veiculo.segmento if veiculo else 'N/A',
+        }
+
+    def consulta(self, campos, valores):
+        params = QueryDict(mutable=True)
+        for campo in campos:
+            params[campo] = valores[campo]
+        veiculos = filtrar_veiculos(PainelVeiculo.objects.all(), params)
+        return veiculos.order_by(*ORDEM)[:settings.FROTA_ITENS_POR_PAGINA + 1]
+
+    def indices_esperados(self, campos):
+        """
+        Prefixos dos nomes dos índices do painel que atendem à combinação: os
+        que começam por um dos campos filtrados, os das chaves estrangeiras
+        filtradas (nome gerado pelo Django), o trigram da placa (só PostgreSQL)
+        e, sem filtros, o do prefixo, percorrido na ordem da lista.
+        """
+        esperados = {
+            indice.name for indice in PainelVeiculo._meta.indexes
+            if indice.fields[0] in campos or (not campos and indice.fields == ['prefixo'])
+        }
+        for campo in campos:
+            field = PainelVeiculo._meta.get_field(campo)
+            if field.db_index:
+                esperados.add(f'{TABELA}_{field.column}_')
+        if 'placa' in campos:
+            esperados.add(INDICE_TRIGRAM_PLACA)
+        return tuple(esperados)
+
+    def avaliar(self, plano, campos):
+        """
+        Devolve os nomes dos índices esperados que o plano usa para ler o
+        painel, None se nenhum é usado ou 'desconhecido' em outros bancos.
+        """
+        if connection.vendor == 'postgresql':
+            # "Bitmap Index Scan on x" não cita a tabela; os nomes dos índices do painel bastam
+            usados = re.findall(r'(?:Index Scan|Index Only Scan) using (\w+)|Bitmap Index Scan on (\w+)', plano)
+            usados = {nome for par in usados for nome in par if nome}
+        elif connection.vendor == 'sqlite':
+            usados = set(re.findall(rf'(?:SEARCH|SCAN) {TABELA} USING (?:COVERING )?INDEX (\w+)', plano))
+        else:
+            return 'desconhecido'
+        esperados = self.indices_esperados(campos)
+        return ', '.join(sorted(nome for nome in usados if nome.startswith(esperados))) or None
+
+    def handle(self, *args, **options):
+        valores = self.valores_exemplo()
+        falhas = []
+        for tamanho in range(len(CAMPOS_FILTRO_INDEX) + 1):
+            for campos in combinations(CAMPOS_FILTRO_INDEX, tamanho):
+                plano = self.consulta(campos, valores).explain()
+                indice = self.avaliar(plano, campos)
+                descricao = ', '.join(campos) or '(sem filtros)'
+
+                if indice == 'desconhecido':
+                    falhas.append(descricao)
+                    self.stdout.write(self.style.ERROR(f'[{connection.vendor} não suportado] {descricao}'))
+                elif indice:
+                    self.stdout.write(self.style.SUCCESS(f'[{indice}] {descricao}'))
+                elif campos == ('placa',) and connection.vendor != 'postgresql':
+                    # O LIKE '%...%' só tem índice no PostgreSQL (trigram)
+                    self.stdout.write(self.style.WARNING(f'[sem índice no {connection.vendor}] {descricao}'))
+                else:
+                    falhas.append(descricao)
+                    self.stdout.write(self.style.ERROR(f'[sem índice] {descricao}'))
+
+                if options['plano']:
+                    self.stdout.write(plano + '\n')
+
+        if falhas and options['estrito']:
+            raise CommandError(f'{len(falhas)} combinação(ões) de filtros sem índice.')
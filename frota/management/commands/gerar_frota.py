@@ -0,0 +1,33 @@
+# frota/management/commands/gerar_frota.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from frota.sintetico import PREFIXO_PLACA, gerar_frota
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera uma frota sintética para testes de desempenho: veículos, catálogo proporcional '
+        f'ao tamanho e parte da frota em manutenção ou indisponível. As placas começam com {PREFIXO_PLACA}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('veiculos', type=int, help='Quantidade de veículos (ex.: 1000, 10000, 100000).')
+        parser.add_argument('--manutencao', type=float, default=0.12, help='Fração em manutenção (padrão: 0.12).')
+        parser.add_argument('--indisponiveis', type=float, default=0.04, help='Fração indisponível (padrão: 0.04).')
+        parser.add_argument('--semente', type=int, default=None, help='Semente do sorteio, para repetir a mesma frota.')
+
+    def handle(self, *args, **options):
+        if options['veiculos'] <= 0:
+            raise CommandError('Informe uma quantidade de veículos maior que zero.')
+        if options['manutencao'] + options['indisponiveis'] > 1:
+            raise CommandError('--manutencao e --indisponiveis somam mais que a frota inteira.')
+
+        resultado = gerar_frota(
+            options['veiculos'], taxa_manutencao=options['manutencao'],
+            taxa_indisponivel=options['indisponiveis'], semente=options['semente'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.veiculos} veículo(s) gerados: {resultado.em_manutencao} em manutenção, '
+            f'{resultado.indisponiveis} indisponíveis.'
+        ))
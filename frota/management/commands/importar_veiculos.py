@@ -0,0 +1,35 @@
+# frota/management/commands/importar_veiculos.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from frota.importacao import COLUNAS_IMPORTACAO, TAMANHO_LOTE, importar_veiculos
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa veículos de um arquivo CSV com as colunas: '
+        + ', '.join(COLUNAS_IMPORTACAO)
+        + '. Modelo, regional e departamento podem vir pelo nome ou pela sigla.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo CSV (UTF-8, separado por ";" ou ",").')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Veículos por INSERT.')
+        parser.add_argument('--simular', action='store_true', help='Só valida o arquivo, sem gravar nada.')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                resultado = importar_veiculos(arquivo, tamanho_lote=options['lote'], simular=options['simular'])
+        except OSError as exc:
+            raise CommandError(f'Não foi possível ler o arquivo: {exc}')
+
+        for linha, mensagem in resultado.erros:
+            self.stderr.write(f'Linha {linha}: {mensagem}')
+        if not resultado.ok:
+            raise CommandError(f'{len(resultado.erros)} linha(s) com erro. Nenhum veículo foi importado.')
+
+        if options['simular']:
+            self.stdout.write(self.style.SUCCESS(f'{resultado.validos} veículo(s) válidos. Nada foi gravado (--simular).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{resultado.criados} veículo(s) importados.'))
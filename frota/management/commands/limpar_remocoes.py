@@ -0,0 +1,21 @@
+# frota/management/commands/limpar_remocoes.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from frota.cache import versao_no_banco
+from frota.painel import limpar_remocoes
+
+
+class Command(BaseCommand):
+    help = (
+        'Apaga os registros de veículos excluídos (RemocaoPainel) com mais de FROTA_RETENCAO_REMOCOES '
+        'versões; as páginas abertas há mais tempo que isso recarregam inteiras. Feito para rodar '
+        'uma vez por dia (cron).'
+    )
+
+    def handle(self, *args, **options):
+        apagadas = limpar_remocoes(versao_no_banco())
+        self.stdout.write(self.style.SUCCESS(
+            f'{apagadas} remoção(ões) apagada(s); ficam as das últimas {settings.FROTA_RETENCAO_REMOCOES} versões.'
+        ))
@@ -0,0 +1,102 @@
+# frota/management/commands/perfil_inicializacao.py
+
+import json
+import subprocess
+import sys
+import time
+from collections import Counter
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Roda num processo novo: importa a aplicação WSGI como o deploy faz e atende
+# dois requests, sem nada do manage.py já carregado.
+SCRIPT = '''
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+def pedir(application, caminho):
+    environ = {'PATH_INFO': caminho, 'HTTP_HOST': '127.0.0.1'}
+    setup_testing_defaults(environ)
+    status = []
+    corpo = application(environ, lambda s, h, e=None: status.append(s))
+    next(iter(corpo), b'')
+    if hasattr(corpo, 'close'):
+        corpo.close()
+    return status[0]
+
+inicio = time.perf_counter()
+from pweb.wsgi import application
+importado = time.perf_counter()
+status = pedir(application, sys.argv[1])
+primeiro = time.perf_counter()
+pedir(application, sys.argv[1])
+segundo = time.perf_counter()
+print(json.dumps({
+    'status': status,
+    'importacao': (importado - inicio) * 1000,
+    'primeiro_byte': (primeiro - importado) * 1000,
+    'segundo_request': (segundo - primeiro) * 1000,
+}))
+'''
+
+
+def _tempos_importacao(saida, profundidade):
+    """Soma o tempo próprio (µs) de cada módulo da saída do -X importtime por pacote."""
+    tempos = Counter()
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, _, nome = linha.removeprefix('import time:').split('|')
+        tempos['.'.join(nome.strip().split('.')[:profundidade])] += int(proprio)
+    return tempos
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a partida a frio da aplicação: tempo de import por pacote, tempo até o '
+        'primeiro byte de uma página e o de um segundo request já aquecido.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--caminho', default='/', help='Página pedida depois de importar (padrão: /).')
+        parser.add_argument('--repeticoes', type=int, default=10, help='Processos medidos (padrão: 10).')
+        parser.add_argument('--modulos', type=int, default=15, help='Pacotes listados no perfil de import.')
+        parser.add_argument(
+            '--profundidade', type=int, default=3,
+            help='Nível em que os módulos são agrupados (3 separa django.contrib.admin de django.contrib.auth).',
+        )
+
+    def medir(self, caminho, importtime=False):
+        inicio = time.perf_counter()
+        opcoes = ['-X', 'importtime'] if importtime else []
+        processo = subprocess.run(
+            [sys.executable, *opcoes, '-c', SCRIPT, caminho],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        total = (time.perf_counter() - inicio) * 1000
+        if processo.returncode:
+            raise CommandError(processo.stderr.strip().splitlines()[-1])
+        resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+        resultado['processo'] = total
+        return resultado, processo.stderr
+
+    def handle(self, *args, **options):
+        # -X importtime deixa cada import mais lento, então os tempos vêm de
+        # processos sem ele e o perfil por pacote de um processo à parte.
+        medidas = [self.medir(options['caminho'])[0] for _ in range(options['repeticoes'])]
+
+        self.stdout.write(f'GET {options["caminho"]} -> {medidas[0]["status"]} (mediana de {len(medidas)} processos)')
+        for chave, rotulo in (
+            ('processo', 'Processo completo (interpretador + import + 2 requests)'),
+            ('importacao', 'Import de pweb.wsgi (settings, apps, middlewares)'),
+            ('primeiro_byte', 'Primeiro byte do primeiro request'),
+            ('segundo_request', 'Segundo request (aquecido)'),
+        ):
+            self.stdout.write(f'  {rotulo:<58} {median(m[chave] for m in medidas):8.1f} ms')
+
+        tempos = _tempos_importacao(self.medir(options['caminho'], importtime=True)[1], options['profundidade'])
+        self.stdout.write(f'\nTempo próprio de import por pacote (total {sum(tempos.values()) / 1000:.1f} ms):')
+        for pacote, micros in tempos.most_common(options['modulos']):
+            self.stdout.write(f'  {pacote:<40} {micros / 1000:8.1f} ms')
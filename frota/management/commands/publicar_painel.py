@@ -0,0 +1,41 @@
+# frota/management/commands/publicar_painel.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from frota import publicacao
+
+
+class Command(BaseCommand):
+    help = (
+        'Publica o painel público estático (página inicial e JSON da frota) no armazenamento '
+        'de publicação, se a versão dos dados mudou desde a última publicação. Rode uma vez no '
+        'deploy e mantenha um processo com --acompanhar (ou chame por um agendador) para '
+        'publicar cada alteração.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forcar', action='store_true', help='Publica mesmo que a versão já esteja publicada.')
+        parser.add_argument('--acompanhar', action='store_true',
+                            help='Não termina: confere a versão dos dados a cada --intervalo segundos.')
+        parser.add_argument('--intervalo', type=float, default=settings.FROTA_TEMPO_REAL_INTERVALO,
+                            help='Segundos entre as conferências com --acompanhar (padrão: FROTA_TEMPO_REAL_INTERVALO).')
+
+    def handle(self, *args, **options):
+        destino = publicacao.armazenamento()
+        publicada = publicacao.versao_publicada(destino)
+        forcar = options['forcar']
+        while True:
+            versao = publicacao.publicar(forcar=forcar)
+            if versao != publicada or forcar:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Painel publicado na versão {versao}: {destino.url(publicacao.ARQUIVO_PAGINA)}'
+                ))
+            elif not options['acompanhar']:
+                self.stdout.write(f'O painel já está publicado na versão {versao}.')
+            publicada, forcar = versao, False
+            if not options['acompanhar']:
+                return
+            time.sleep(options['intervalo'])
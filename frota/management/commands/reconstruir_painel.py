@@ -0,0 +1,18 @@
+# frota/management/commands/reconstruir_painel.py
+
+from django.core.management.base import BaseCommand
+
+from frota.cache import registrar_atualizacao
+from frota.painel import reconstruir
+
+
+class Command(BaseCommand):
+    help = (
+        'Refaz do zero a tabela PainelVeiculo (lida pela página inicial) a partir dos veículos, '
+        'manutenções e indisponibilidades. Use depois de alterar dados direto no banco.'
+    )
+
+    def handle(self, *args, **options):
+        total = reconstruir()
+        registrar_atualizacao(painel=True)
+        self.stdout.write(self.style.SUCCESS(f'Painel reconstruído com {total} veículo(s).'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0008_alter_manutencao_numero_os_alter_veiculo_prefixo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ultimaatualizacao',
+            name='versao',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+# O filtro placa__icontains vira UPPER(placa::text) LIKE UPPER('%...%') no PostgreSQL.
+# Um índice GIN trigram sobre essa mesma expressão atende a busca por substring.
+INDICES_TRIGRAM = [
+    ('veiculo_placa_trgm_idx', 'placa'),
+    ('veiculo_prefixo_trgm_idx', 'prefixo'),
+]
+
+
+def criar_indices_trigram(apps, schema_editor):
+    # No SQLite não há equivalente: o LIKE com curinga no início sempre varre a
+    # tabela, o que é aceitável para o tamanho da frota em desenvolvimento.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nome, coluna in INDICES_TRIGRAM:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {nome} ON frota_veiculo '
+            f'USING gin ((UPPER({coluna}::text)) gin_trgm_ops)'
+        )
+
+
+def remover_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, coluna in INDICES_TRIGRAM:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {nome}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0009_ultimaatualizacao_versao'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(fields=['status', 'prefixo'], name='veiculo_status_prefixo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(fields=['regional', 'status', 'prefixo'], name='veiculo_regional_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(fields=['departamento', 'status', 'prefixo'], name='veiculo_depto_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(fields=['tipo_veiculo', 'segmento', 'status'], name='veiculo_tipo_segmento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(fields=['segmento', 'status'], name='veiculo_segmento_status_idx'),
+        ),
+        migrations.RunPython(criar_indices_trigram, remover_indices_trigram),
+    ]
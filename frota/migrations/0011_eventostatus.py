@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0010_veiculo_indices_filtros'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('placa', models.CharField(max_length=10)),
+                ('tipo', models.CharField(choices=[('ENTRADA_MANUTENCAO', 'Entrada em manutenção'), ('ATUALIZACAO_MANUTENCAO', 'Manutenção atualizada'), ('SAIDA_MANUTENCAO', 'Manutenção concluída'), ('ENTRADA_INDISPONIBILIDADE', 'Tornou-se indisponível'), ('ATUALIZACAO_INDISPONIBILIDADE', 'Indisponibilidade atualizada'), ('SAIDA_INDISPONIBILIDADE', 'Tornou-se disponível')], max_length=30)),
+                ('status_anterior', models.CharField(choices=[('Disponível', 'Disponível'), ('Em Manutenção', 'Em Manutenção'), ('Indisponível', 'Indisponível')], max_length=20)),
+                ('status_novo', models.CharField(choices=[('Disponível', 'Disponível'), ('Em Manutenção', 'Em Manutenção'), ('Indisponível', 'Indisponível')], max_length=20)),
+                ('data_hora', models.DateTimeField(default=django.utils.timezone.now)),
+                ('servicos', models.TextField(blank=True)),
+                ('nome_oficina', models.CharField(blank=True, max_length=100)),
+                ('cidade_oficina', models.CharField(blank=True, max_length=100)),
+                ('data_entrada', models.DateField(blank=True, null=True)),
+                ('data_previsao_saida', models.DateField(blank=True, null=True)),
+                ('numero_os', models.CharField(blank=True, max_length=50, null=True)),
+                ('status_os', models.CharField(blank=True, max_length=50)),
+                ('motivo', models.TextField(blank=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('veiculo', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='eventos', to='frota.veiculo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['veiculo', 'data_hora'], name='evento_veiculo_data_idx'), models.Index(fields=['data_hora'], name='evento_data_idx')],
+            },
+        ),
+    ]
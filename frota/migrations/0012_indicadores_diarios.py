@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0011_eventostatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicadorOficinaDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('nome_oficina', models.CharField(blank=True, max_length=100)),
+                ('cidade_oficina', models.CharField(blank=True, max_length=100)),
+                ('concluidas', models.PositiveIntegerField(default=0)),
+                ('dias_em_manutencao', models.PositiveIntegerField(default=0)),
+                ('com_previsao', models.PositiveIntegerField(default=0)),
+                ('previsoes_descumpridas', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['data'], name='indicador_oficina_data_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IndicadorDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('tipo_veiculo', models.CharField(choices=[('LEVE', 'Leve'), ('MEDIO', 'Médio'), ('PESADO', 'Pesado'), ('EQUIPAMENTO', 'Equipamento')], max_length=20)),
+                ('segmento', models.CharField(choices=[('LT', 'Linha de Transmissão'), ('SE', 'Subestação'), ('N/A', 'Não Aplicável')], max_length=5)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('disponiveis', models.PositiveIntegerField(default=0)),
+                ('em_manutencao', models.PositiveIntegerField(default=0)),
+                ('indisponiveis', models.PositiveIntegerField(default=0)),
+                ('departamento', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='frota.departamento')),
+                ('regional', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='frota.regional')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['data'], name='indicador_data_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Mesmos índices trigram da migração 0010, agora na tabela lida pela página inicial
+INDICES_TRIGRAM = [
+    ('painel_placa_trgm_idx', 'placa'),
+    ('painel_prefixo_trgm_idx', 'prefixo'),
+]
+
+
+def criar_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nome, coluna in INDICES_TRIGRAM:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {nome} ON frota_painelveiculo '
+            f'USING gin ((UPPER({coluna}::text)) gin_trgm_ops)'
+        )
+
+
+def remover_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, coluna in INDICES_TRIGRAM:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {nome}')
+
+
+def preencher_painel(apps, schema_editor):
+    # Carga inicial; depois disso quem mantém a tabela é frota.painel
+    Veiculo = apps.get_model('frota', 'Veiculo')
+    PainelVeiculo = apps.get_model('frota', 'PainelVeiculo')
+    campos = {
+        'veiculo_id': 'pk', 'prefixo': 'prefixo', 'placa': 'placa', 'modelo': 'modelo__nome',
+        'tipo_veiculo': 'tipo_veiculo', 'segmento': 'segmento', 'status': 'status',
+        'regional_id': 'regional_id', 'regional_sigla': 'regional__sigla',
+        'departamento_id': 'departamento_id', 'departamento_sigla': 'departamento__sigla',
+        'servicos': 'manutencao__servicos', 'nome_oficina': 'manutencao__nome_oficina',
+        'cidade_oficina': 'manutencao__cidade_oficina', 'data_entrada': 'manutencao__data_entrada',
+        'data_previsao_saida': 'manutencao__data_previsao_saida', 'numero_os': 'manutencao__numero_os',
+        'status_os': 'manutencao__status_os', 'motivo': 'indisponibilidade__motivo',
+    }
+    datas = {'data_entrada', 'data_previsao_saida'}
+    linhas = []
+    for valores in Veiculo.objects.values_list(*campos.values()).iterator(chunk_size=1000):
+        dados = dict(zip(campos, valores))
+        for campo, valor in dados.items():
+            if valor is None and campo not in datas and campo != 'prefixo':
+                dados[campo] = ''
+        linhas.append(PainelVeiculo(**dados))
+    PainelVeiculo.objects.bulk_create(linhas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0012_indicadores_diarios'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PainelVeiculo',
+            fields=[
+                ('veiculo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='painel', serialize=False, to='frota.veiculo')),
+                ('prefixo', models.CharField(blank=True, max_length=6, null=True)),
+                ('placa', models.CharField(max_length=10)),
+                ('modelo', models.CharField(max_length=50)),
+                ('tipo_veiculo', models.CharField(choices=[('LEVE', 'Leve'), ('MEDIO', 'Médio'), ('PESADO', 'Pesado'), ('EQUIPAMENTO', 'Equipamento')], max_length=20)),
+                ('segmento', models.CharField(choices=[('LT', 'Linha de Transmissão'), ('SE', 'Subestação'), ('N/A', 'Não Aplicável')], max_length=5)),
+                ('status', models.CharField(choices=[('Disponível', 'Disponível'), ('Em Manutenção', 'Em Manutenção'), ('Indisponível', 'Indisponível')], max_length=20)),
+                ('regional_sigla', models.CharField(max_length=10)),
+                ('departamento_sigla', models.CharField(max_length=10)),
+                ('servicos', models.TextField(blank=True)),
+                ('nome_oficina', models.CharField(blank=True, max_length=100)),
+                ('cidade_oficina', models.CharField(blank=True, max_length=100)),
+                ('data_entrada', models.DateField(blank=True, null=True)),
+                ('data_previsao_saida', models.DateField(blank=True, null=True)),
+                ('numero_os', models.CharField(blank=True, max_length=50)),
+                ('status_os', models.CharField(blank=True, max_length=50)),
+                ('motivo', models.TextField(blank=True)),
+                ('departamento', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='frota.departamento')),
+                ('regional', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='frota.regional')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['prefixo'], name='painel_prefixo_idx'), models.Index(fields=['status', 'prefixo'], name='painel_status_prefixo_idx'), models.Index(fields=['regional', 'status', 'prefixo'], name='painel_regional_status_idx'), models.Index(fields=['departamento', 'status', 'prefixo'], name='painel_depto_status_idx'), models.Index(fields=['tipo_veiculo', 'segmento', 'status'], name='painel_tipo_segmento_idx'), models.Index(fields=['segmento', 'status'], name='painel_segmento_status_idx')],
+            },
+        ),
+        migrations.RunPython(preencher_painel, migrations.RunPython.noop),
+        migrations.RunPython(criar_indices_trigram, remover_indices_trigram),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:48
+
+from django.db import migrations, models
+
+
+def marcar_versao_atual(apps, schema_editor):
+    # As linhas que já existem passam a valer a partir da versão atual dos dados
+    UltimaAtualizacao = apps.get_model('frota', 'UltimaAtualizacao')
+    PainelVeiculo = apps.get_model('frota', 'PainelVeiculo')
+    versao = UltimaAtualizacao.objects.filter(pk=1).values_list('versao', flat=True).first() or 0
+    PainelVeiculo.objects.update(versao=versao)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0013_painelveiculo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RemocaoPainel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('veiculo_id', models.PositiveBigIntegerField()),
+                ('versao', models.PositiveBigIntegerField(blank=True, db_index=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='painelveiculo',
+            name='versao',
+            field=models.PositiveBigIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(marcar_versao_atual, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def criar_registro(apps, schema_editor):
+    # registrar_atualizacao() só faz UPDATE; o registro único precisa existir
+    UltimaAtualizacao = apps.get_model('frota', 'UltimaAtualizacao')
+    UltimaAtualizacao.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0014_painel_versao'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_registro, migrations.RunPython.noop),
+    ]
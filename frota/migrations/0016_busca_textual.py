@@ -0,0 +1,109 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:20
+
+from django.db import migrations
+
+# Colunas pesquisáveis de cada tabela, com o peso na relevância:
+# A = identificação do veículo, B = modelo/oficina/OS, C = texto livre.
+COLUNAS = {
+    'frota_painelveiculo': {
+        'A': ['placa', 'prefixo'],
+        'B': ['modelo', 'nome_oficina', 'cidade_oficina', 'numero_os'],
+        'C': ['servicos', 'motivo'],
+    },
+    'frota_eventostatus': {
+        'A': ['placa'],
+        'B': ['nome_oficina', 'cidade_oficina', 'numero_os'],
+        'C': ['servicos', 'motivo'],
+    },
+}
+# Tabela FTS5 (SQLite) de cada tabela e a coluna usada como rowid
+FTS = {
+    'frota_painelveiculo': ('frota_painel_busca', 'veiculo_id'),
+    'frota_eventostatus': ('frota_evento_busca', 'id'),
+}
+
+
+def _colunas(tabela):
+    return [coluna for peso in 'ABC' for coluna in COLUNAS[tabela][peso]]
+
+
+def _vetor_postgresql(tabela):
+    partes = []
+    for peso, colunas in COLUNAS[tabela].items():
+        texto = " || ' ' || ".join(f"coalesce({coluna}, '')" for coluna in colunas)
+        partes.append(f"setweight(to_tsvector('portuguese'::regconfig, {texto}), '{peso}')")
+    return ' || '.join(partes)
+
+
+def _criar_postgresql(schema_editor, tabela):
+    # Coluna gerada: o próprio banco recalcula o vetor a cada INSERT/UPDATE
+    schema_editor.execute(
+        f'ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS busca tsvector '
+        f'GENERATED ALWAYS AS ({_vetor_postgresql(tabela)}) STORED'
+    )
+    schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {tabela}_busca_idx ON {tabela} USING gin (busca)')
+
+
+def _criar_sqlite(schema_editor, tabela):
+    # Tabela FTS5 de conteúdo externo: guarda só o índice e lê o texto da tabela
+    # original. Os triggers a mantêm em dia; atualizações que não tocam no texto
+    # (versao, siglas) não mexem no índice.
+    fts, rowid = FTS[tabela]
+    colunas = _colunas(tabela)
+    lista = ', '.join(colunas)
+    novos = ', '.join(f'new.{coluna}' for coluna in colunas)
+    antigos = ', '.join(f'old.{coluna}' for coluna in colunas)
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({lista}, content='{tabela}', content_rowid='{rowid}', "
+        f"tokenize='unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabela} BEGIN '
+        f'INSERT INTO {fts}(rowid, {lista}) VALUES (new.{rowid}, {novos}); END'
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabela} BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.{rowid}, {antigos}); END"
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {lista} ON {tabela} BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.{rowid}, {antigos}); "
+        f'INSERT INTO {fts}(rowid, {lista}) VALUES (new.{rowid}, {novos}); END'
+    )
+    schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def criar_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for tabela in COLUNAS:
+        if vendor == 'postgresql':
+            _criar_postgresql(schema_editor, tabela)
+        elif vendor == 'sqlite':
+            _criar_sqlite(schema_editor, tabela)
+        # Outros bancos ficam sem índice; frota.busca usa icontains nesse caso
+
+
+def remover_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for tabela, (fts, _) in FTS.items():
+        if vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {tabela}_busca_idx')
+            schema_editor.execute(f'ALTER TABLE {tabela} DROP COLUMN IF EXISTS busca')
+        elif vendor == 'sqlite':
+            for sufixo in ('ai', 'ad', 'au'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{sufixo}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+class Migration(migrations.Migration):
+    # No SQLite, uma migração futura que recrie frota_painelveiculo ou
+    # frota_eventostatus (alterar coluna, por exemplo) descarta os triggers;
+    # ela precisa desfazer e refazer esta.
+
+    dependencies = [
+        ('frota', '0015_ultimaatualizacao_registro'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_busca, remover_busca),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0016_busca_textual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ultimaatualizacao',
+            name='versao_catalogo',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
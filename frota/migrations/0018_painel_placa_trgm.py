@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:10
+
+from django.db import migrations
+
+# A página inicial filtra a cópia do painel (frota_painelveiculo), não
+# frota_veiculo: o índice trigram da 0010 não atende a busca por placa dela.
+# Os índices compostos dos demais filtros já vieram na 0013.
+INDICES_TRIGRAM = [
+    ('painel_placa_trgm_idx', 'placa'),
+]
+
+
+def criar_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nome, coluna in INDICES_TRIGRAM:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {nome} ON frota_painelveiculo '
+            f'USING gin ((UPPER({coluna}::text)) gin_trgm_ops)'
+        )
+
+
+def remover_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, coluna in INDICES_TRIGRAM:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {nome}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0017_ultimaatualizacao_versao_catalogo'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices_trigram, remover_indices_trigram),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frota', '0018_painel_placa_trgm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='veiculo',
+            name='criado_em',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 # frota/models.py
 
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -61,6 +62,21 @@ class Veiculo(models.Model):
     regional = models.ForeignKey(Regional, on_delete=models.PROTECT, related_name='veiculos')
     departamento = models.ForeignKey(Departamento, on_delete=models.PROTECT, related_name='veiculos')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Disponível')
+    # Vazio nos veículos cadastrados antes deste campo existir
+    criado_em = models.DateTimeField(auto_now_add=True, null=True)
+
+    class Meta:
+        # Índices para as combinações de filtros da página inicial (views.index),
+        # terminando em prefixo para servir também a ordenação da lista.
+        # A busca por placa/prefixo (icontains) usa índices trigram, criados
+        # apenas no PostgreSQL pela migração 0010.
+        indexes = [
+            models.Index(fields=['status', 'prefixo'], name='veiculo_status_prefixo_idx'),
+            models.Index(fields=['regional', 'status', 'prefixo'], name='veiculo_regional_status_idx'),
+            models.Index(fields=['departamento', 'status', 'prefixo'], name='veiculo_depto_status_idx'),
+            models.Index(fields=['tipo_veiculo', 'segmento', 'status'], name='veiculo_tipo_segmento_idx'),
+            models.Index(fields=['segmento', 'status'], name='veiculo_segmento_status_idx'),
+        ]
 
     def __str__(self):
         identificacao = self.prefixo if self.prefixo else "S/ Prefixo"
@@ -93,8 +109,157 @@ class Indisponibilidade(models.Model):
     def __str__(self):
         return f"Indisponibilidade do veículo {self.veiculo.placa}"
 
+class PainelVeiculo(models.Model):
+    """
+    Cópia desnormalizada de cada veículo com tudo o que a página inicial mostra,
+    inclusive os dados dos modais. A página lê só esta tabela, sem JOINs.
+    Mantida em sincronia por frota.painel em todas as gravações; pode ser
+    refeita do zero com o comando reconstruir_painel.
+    """
+    veiculo = models.OneToOneField(Veiculo, on_delete=models.CASCADE, primary_key=True, related_name='painel')
+    prefixo = models.CharField(max_length=6, null=True, blank=True)
+    placa = models.CharField(max_length=10)
+    modelo = models.CharField(max_length=50)
+    tipo_veiculo = models.CharField(max_length=20, choices=Veiculo.TIPO_VEICULO_CHOICES)
+    segmento = models.CharField(max_length=5, choices=Veiculo.SEGMENTO_CHOICES)
+    status = models.CharField(max_length=20, choices=Veiculo.STATUS_CHOICES)
+    # Só os ids, para os filtros; as siglas vêm copiadas ao lado
+    regional = models.ForeignKey(Regional, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    regional_sigla = models.CharField(max_length=10)
+    departamento = models.ForeignKey(Departamento, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    departamento_sigla = models.CharField(max_length=10)
+
+    # Manutenção ou indisponibilidade em aberto (vazios quando não houver)
+    servicos = models.TextField(blank=True)
+    nome_oficina = models.CharField(max_length=100, blank=True)
+    cidade_oficina = models.CharField(max_length=100, blank=True)
+    data_entrada = models.DateField(null=True, blank=True)
+    data_previsao_saida = models.DateField(null=True, blank=True)
+    numero_os = models.CharField(max_length=50, blank=True)
+    status_os = models.CharField(max_length=50, blank=True)
+    motivo = models.TextField(blank=True)
+
+    # Versão dos dados em que a linha mudou pela última vez (None enquanto a
+    # transação que a alterou não registra a atualização). Base das atualizações
+    # ao vivo da página inicial: "o que mudou desde a versão N".
+    versao = models.PositiveBigIntegerField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        # Os mesmos índices de Veiculo, para as mesmas combinações de filtros
+        indexes = [
+            models.Index(fields=['prefixo'], name='painel_prefixo_idx'),
+            models.Index(fields=['status', 'prefixo'], name='painel_status_prefixo_idx'),
+            models.Index(fields=['regional', 'status', 'prefixo'], name='painel_regional_status_idx'),
+            models.Index(fields=['departamento', 'status', 'prefixo'], name='painel_depto_status_idx'),
+            models.Index(fields=['tipo_veiculo', 'segmento', 'status'], name='painel_tipo_segmento_idx'),
+            models.Index(fields=['segmento', 'status'], name='painel_segmento_status_idx'),
+        ]
+
+    def __str__(self):
+        return self.placa
+
+
+class RemocaoPainel(models.Model):
+    """Veículos excluídos, para avisar as páginas abertas que a linha deve sumir."""
+    veiculo_id = models.PositiveBigIntegerField()
+    versao = models.PositiveBigIntegerField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"Veículo {self.veiculo_id} removido na versão {self.versao}"
+
+
+class EventoStatus(models.Model):
+    """
+    Histórico das mudanças de status da frota. Só recebe inserções: Manutencao e
+    Indisponibilidade guardam apenas o episódio em aberto de cada veículo, e cada
+    entrada, atualização e saída fica registrada aqui com os dados do momento.
+    """
+    ENTRADA_MANUTENCAO = 'ENTRADA_MANUTENCAO'
+    ATUALIZACAO_MANUTENCAO = 'ATUALIZACAO_MANUTENCAO'
+    SAIDA_MANUTENCAO = 'SAIDA_MANUTENCAO'
+    ENTRADA_INDISPONIBILIDADE = 'ENTRADA_INDISPONIBILIDADE'
+    ATUALIZACAO_INDISPONIBILIDADE = 'ATUALIZACAO_INDISPONIBILIDADE'
+    SAIDA_INDISPONIBILIDADE = 'SAIDA_INDISPONIBILIDADE'
+
+    TIPO_CHOICES = [
+        (ENTRADA_MANUTENCAO, 'Entrada em manutenção'),
+        (ATUALIZACAO_MANUTENCAO, 'Manutenção atualizada'),
+        (SAIDA_MANUTENCAO, 'Manutenção concluída'),
+        (ENTRADA_INDISPONIBILIDADE, 'Tornou-se indisponível'),
+        (ATUALIZACAO_INDISPONIBILIDADE, 'Indisponibilidade atualizada'),
+        (SAIDA_INDISPONIBILIDADE, 'Tornou-se disponível'),
+    ]
+
+    # O histórico sobrevive à exclusão do veículo; a placa fica copiada no evento
+    veiculo = models.ForeignKey(Veiculo, on_delete=models.SET_NULL, null=True, related_name='eventos', db_index=False)
+    placa = models.CharField(max_length=10)
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES)
+    status_anterior = models.CharField(max_length=20, choices=Veiculo.STATUS_CHOICES)
+    status_novo = models.CharField(max_length=20, choices=Veiculo.STATUS_CHOICES)
+    data_hora = models.DateTimeField(default=timezone.now)
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    # Dados da manutenção ou da indisponibilidade no momento do evento
+    servicos = models.TextField(blank=True)
+    nome_oficina = models.CharField(max_length=100, blank=True)
+    cidade_oficina = models.CharField(max_length=100, blank=True)
+    data_entrada = models.DateField(null=True, blank=True)
+    data_previsao_saida = models.DateField(null=True, blank=True)
+    numero_os = models.CharField(max_length=50, null=True, blank=True)
+    status_os = models.CharField(max_length=50, blank=True)
+    motivo = models.TextField(blank=True)
+
+    class Meta:
+        # (veiculo, data_hora) serve o histórico de um veículo; data_hora sozinho,
+        # as consultas por período da frota inteira.
+        indexes = [
+            models.Index(fields=['veiculo', 'data_hora'], name='evento_veiculo_data_idx'),
+            models.Index(fields=['data_hora'], name='evento_data_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - {self.placa} ({self.data_hora:%d/%m/%Y %H:%M})"
+
+class IndicadorDiario(models.Model):
+    """
+    Retrato da frota no fim de cada dia, agregado por regional, departamento,
+    tipo e segmento. Preenchido pelo comando consolidar_indicadores; a página de
+    indicadores lê só esta tabela.
+    """
+    data = models.DateField()
+    regional = models.ForeignKey(Regional, on_delete=models.SET_NULL, null=True, related_name='+')
+    departamento = models.ForeignKey(Departamento, on_delete=models.SET_NULL, null=True, related_name='+')
+    tipo_veiculo = models.CharField(max_length=20, choices=Veiculo.TIPO_VEICULO_CHOICES)
+    segmento = models.CharField(max_length=5, choices=Veiculo.SEGMENTO_CHOICES)
+    total = models.PositiveIntegerField(default=0)
+    disponiveis = models.PositiveIntegerField(default=0)
+    em_manutencao = models.PositiveIntegerField(default=0)
+    indisponiveis = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['data'], name='indicador_data_idx')]
+
+
+class IndicadorOficinaDiario(models.Model):
+    """Manutenções concluídas em cada dia, por oficina."""
+    data = models.DateField()
+    nome_oficina = models.CharField(max_length=100, blank=True)
+    cidade_oficina = models.CharField(max_length=100, blank=True)
+    concluidas = models.PositiveIntegerField(default=0)
+    dias_em_manutencao = models.PositiveIntegerField(default=0)
+    com_previsao = models.PositiveIntegerField(default=0)
+    previsoes_descumpridas = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['data'], name='indicador_oficina_data_idx')]
+
+
 class UltimaAtualizacao(models.Model):
     data_hora = models.DateTimeField(auto_now=True)
+    # Incrementada a cada alteração nos dados da frota; usada nas chaves de cache.
+    versao = models.PositiveBigIntegerField(default=0)
+    # Incrementada só quando modelos, regionais ou departamentos mudam; usada nas listas de opções.
+    versao_catalogo = models.PositiveBigIntegerField(default=0)
 
     def __str__(self):
         return self.data_hora.strftime('%d/%m/%Y %H:%M:%S')
\ No newline at end of file
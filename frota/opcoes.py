@@ -0,0 +1,82 @@
+# frota/opcoes.py
+
+"""
+Listas de <option> dos catálogos (modelos, regionais e departamentos).
+
+Os selects de filtro e os modais de edição repetem essas listas a cada página,
+às vezes uma vez por veículo. Cada lista é consultada e montada em HTML uma
+vez por versão do catálogo (cache.versao_catalogo) e fica guardada no
+processo; marcar a opção selecionada é só uma substituição no texto pronto.
+
+Sob ASGI o template é renderizado no loop, onde não dá para consultar o banco.
+acarregar() devolve as listas que carregou e a view as passa no contexto
+('opcoes_carregadas'): outro request pode trocar a lista guardada no processo
+por outra versão enquanto este espera, e o template usa a que foi carregada.
+"""
+
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .cache import versao_catalogo
+from .models import Departamento, ModeloVeiculo, Regional
+
+# nome -> (modelo, ordem, rótulo de cada item)
+LISTAS = {
+    'modelo': (ModeloVeiculo, 'pk', lambda modelo: modelo.nome),
+    'regional': (Regional, 'pk', lambda regional: f'{regional.sigla} - {regional.nome}'),
+    'regional_sigla': (Regional, 'sigla', lambda regional: regional.sigla),
+    'departamento': (Departamento, 'pk', str),
+    'departamento_sigla': (Departamento, 'sigla', lambda depto: f'{depto.sigla} - {depto.nome}'),
+}
+
+# nome -> (versao_catalogo, [(pk, rótulo)], HTML das opções sem seleção)
+_listas = {}
+
+
+def _guardar(nome, versao, objetos):
+    rotulo = LISTAS[nome][2]
+    itens = [(obj.pk, rotulo(obj)) for obj in objetos]
+    html = ''.join(f'<option value="{pk}">{escape(texto)}</option>' for pk, texto in itens)
+    _listas[nome] = (versao, itens, html)
+    return _listas[nome]
+
+
+def _lista(nome, request=None):
+    versao = versao_catalogo(request)
+    guardada = _listas.get(nome)
+    if guardada is None or guardada[0] != versao:
+        modelo, ordem, _ = LISTAS[nome]
+        guardada = _guardar(nome, versao, modelo.objects.order_by(ordem))
+    return guardada
+
+
+async def acarregar(nomes, request):
+    """
+    Deixa as listas `nomes` prontas com o ORM assíncrono, antes de uma view de
+    frota.assincrono renderizar um template que as usa. O request já deve ter
+    passado por cache.carregar_estado(). Devolve {nome: lista}, para ir no
+    contexto do template como 'opcoes_carregadas'.
+    """
+    versao = versao_catalogo(request)
+    carregadas = {}
+    for nome in nomes:
+        guardada = _listas.get(nome)
+        if guardada is None or guardada[0] != versao:
+            modelo, ordem, _ = LISTAS[nome]
+            guardada = _guardar(nome, versao, [obj async for obj in modelo.objects.order_by(ordem)])
+        carregadas[nome] = guardada
+    return carregadas
+
+
+def escolhas(nome, request=None):
+    """Pares (pk, rótulo) da lista, para os choices de um formulário."""
+    return _lista(nome, request)[1]
+
+
+def html_opcoes(nome, selecionado=None, request=None, carregadas=None):
+    """HTML das opções da lista, com `selecionado` (pk) marcado. `carregadas` vem de acarregar()."""
+    guardada = (carregadas or {}).get(nome) or _lista(nome, request)
+    html = guardada[2]
+    if selecionado not in (None, ''):
+        html = html.replace(f'<option value="{selecionado}">', f'<option value="{selecionado}" selected>', 1)
+    return mark_safe(html)
@@ -0,0 +1,132 @@
+# frota/paginacao.py
+
+import base64
+import binascii
+import json
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+
+# Parâmetros da URL usados pela paginação
+CAMPOS_PAGINACAO = ('apos', 'antes', 'por_pagina')
+
+# Prefixo crescente com os veículos sem prefixo no final, desempate pelo pk.
+ORDEM = (F('prefixo').asc(nulls_last=True), 'pk')
+
+# Faixa de um BIGINT com sinal
+MENOR_PK, MAIOR_PK = -2 ** 63, 2 ** 63 - 1
+
+
+def codificar_cursor(item):
+    dados = json.dumps([item.prefixo, item.pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Devolve (prefixo, pk) ou None se o cursor for inválido."""
+    try:
+        dados = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        prefixo, pk = json.loads(dados)
+    except (binascii.Error, ValueError, TypeError, OverflowError):
+        return None
+    if prefixo is not None and not isinstance(prefixo, str):
+        return None
+    # bool é subclasse de int; fora de 64 bits o banco não aceita o parâmetro
+    if not isinstance(pk, int) or isinstance(pk, bool) or not MENOR_PK <= pk <= MAIOR_PK:
+        return None
+    return prefixo, pk
+
+
+def _itens_por_pagina(params):
+    try:
+        por_pagina = int(params.get('por_pagina') or settings.FROTA_ITENS_POR_PAGINA)
+    except ValueError:
+        por_pagina = settings.FROTA_ITENS_POR_PAGINA
+    return min(max(por_pagina, 1), settings.FROTA_MAX_ITENS_POR_PAGINA)
+
+
+def _depois_de(prefixo, pk):
+    if prefixo is None:
+        return Q(prefixo__isnull=True, pk__gt=pk)
+    return Q(prefixo__gt=prefixo) | Q(prefixo=prefixo, pk__gt=pk) | Q(prefixo__isnull=True)
+
+
+def _antes_de(prefixo, pk):
+    if prefixo is None:
+        return Q(prefixo__isnull=False) | Q(prefixo__isnull=True, pk__lt=pk)
+    return Q(prefixo__lt=prefixo) | Q(prefixo=prefixo, pk__lt=pk)
+
+
+class Pagina:
+    def __init__(self, itens, total, por_pagina, querystring, tem_anterior, tem_proxima):
+        self.itens = itens
+        self.total = total
+        self.por_pagina = por_pagina
+        self.url_anterior = self._url(querystring, 'antes', itens[0]) if tem_anterior and itens else None
+        self.url_proxima = self._url(querystring, 'apos', itens[-1]) if tem_proxima and itens else None
+        self.url_primeira = '?' + querystring if tem_anterior else None
+
+    @staticmethod
+    def _url(querystring, direcao, item):
+        extra = urlencode([(direcao, codificar_cursor(item))])
+        return '?' + '&'.join(filter(None, [querystring, extra]))
+
+
+def _consulta(veiculos, params):
+    por_pagina = _itens_por_pagina(params)
+    apos = decodificar_cursor(params.get('apos', ''))
+    antes = decodificar_cursor(params.get('antes', '')) if not apos else None
+
+    if antes:
+        consulta = veiculos.filter(_antes_de(*antes)).order_by(F('prefixo').desc(nulls_first=True), '-pk')
+    elif apos:
+        consulta = veiculos.filter(_depois_de(*apos)).order_by(*ORDEM)
+    else:
+        consulta = veiculos.order_by(*ORDEM)
+    # Um item a mais diz se existe outra página naquela direção
+    return consulta[:por_pagina + 1], por_pagina, apos, antes
+
+
+def _montar(itens, total, params, por_pagina, apos, antes):
+    sobrou = len(itens) > por_pagina
+    itens = itens[:por_pagina]
+    if antes:
+        itens.reverse()
+
+    # Mantém os filtros (e o tamanho da página) nos links de navegação
+    querystring = urlencode([
+        (chave, valor) for chave, valor in params.items()
+        if chave not in ('apos', 'antes') and valor
+    ])
+    return Pagina(
+        itens, total, por_pagina, querystring,
+        tem_anterior=bool(apos) or (bool(antes) and sobrou),
+        tem_proxima=bool(antes) or sobrou,
+    )
+
+
+def paginar(veiculos, params, chave_total):
+    """
+    Pagina o queryset por cursores (keyset) sobre (prefixo, pk), sem OFFSET:
+    cada página custa o mesmo, não importa quão longe esteja do início.
+
+    `chave_total` identifica a contagem no cache; deve incluir a versão dos
+    dados e os filtros, para que o total só seja recalculado quando mudarem.
+    """
+    consulta, por_pagina, apos, antes = _consulta(veiculos, params)
+    itens = list(consulta)
+    total = cache.get_or_set(chave_total, veiculos.count, settings.FROTA_CACHE_TIMEOUT)
+    return _montar(itens, total, params, por_pagina, apos, antes)
+
+
+async def apaginar(veiculos, params, chave_total):
+    """paginar() com o ORM assíncrono, para as views de frota.assincrono."""
+    consulta, por_pagina, apos, antes = _consulta(veiculos, params)
+    itens = [item async for item in consulta]
+    total = await cache.aget(chave_total)
+    if total is None:
+        total = await veiculos.acount()
+        await cache.aset(chave_total, total, settings.FROTA_CACHE_TIMEOUT)
+    return _montar(itens, total, params, por_pagina, apos, antes)
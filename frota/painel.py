@@ -0,0 +1,99 @@
+# frota/painel.py
+
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Departamento, ModeloVeiculo, PainelVeiculo, Regional, RemocaoPainel, Veiculo
+
+TAMANHO_LOTE = 1000
+
+# Campo do PainelVeiculo -> caminho no ORM a partir de Veiculo
+CAMPOS_PAINEL = {
+    'veiculo_id': 'pk',
+    'prefixo': 'prefixo',
+    'placa': 'placa',
+    'modelo': 'modelo__nome',
+    'tipo_veiculo': 'tipo_veiculo',
+    'segmento': 'segmento',
+    'status': 'status',
+    'regional_id': 'regional_id',
+    'regional_sigla': 'regional__sigla',
+    'departamento_id': 'departamento_id',
+    'departamento_sigla': 'departamento__sigla',
+    'servicos': 'manutencao__servicos',
+    'nome_oficina': 'manutencao__nome_oficina',
+    'cidade_oficina': 'manutencao__cidade_oficina',
+    'data_entrada': 'manutencao__data_entrada',
+    'data_previsao_saida': 'manutencao__data_previsao_saida',
+    'numero_os': 'manutencao__numero_os',
+    'status_os': 'manutencao__status_os',
+    'motivo': 'indisponibilidade__motivo',
+}
+CAMPOS_TEXTO = {'servicos', 'nome_oficina', 'cidade_oficina', 'numero_os', 'status_os', 'motivo'}
+CAMPOS_ATUALIZADOS = [campo.removesuffix('_id') for campo in CAMPOS_PAINEL if campo != 'veiculo_id'] + ['versao']
+
+
+def _linhas(veiculos):
+    campos = list(CAMPOS_PAINEL)
+    for valores in veiculos.values_list(*CAMPOS_PAINEL.values()).iterator(chunk_size=TAMANHO_LOTE):
+        dados = dict(zip(campos, valores))
+        # Sem manutenção/indisponibilidade o LEFT JOIN traz NULL; no painel fica vazio
+        for campo in CAMPOS_TEXTO:
+            if dados[campo] is None:
+                dados[campo] = ''
+        # versao fica pendente até registrar_atualizacao(painel=True) carimbar
+        yield PainelVeiculo(versao=None, **dados)
+
+
+def _lotes(linhas):
+    # bulk_create monta a lista inteira antes de gravar; em lotes a memória fica limitada
+    while lote := list(islice(linhas, TAMANHO_LOTE)):
+        yield lote
+
+
+def sincronizar(veiculos):
+    """Regrava a linha do painel de cada veículo do queryset (INSERT ou UPDATE)."""
+    for lote in _lotes(_linhas(veiculos)):
+        PainelVeiculo.objects.bulk_create(
+            lote, update_conflicts=True, unique_fields=['veiculo'], update_fields=CAMPOS_ATUALIZADOS,
+        )
+
+
+def sincronizar_veiculos(ids):
+    sincronizar(Veiculo.objects.filter(pk__in=ids))
+
+
+def sincronizar_catalogo(objeto):
+    """Propaga a troca de nome/sigla de um modelo, regional ou departamento."""
+    if isinstance(objeto, Regional):
+        PainelVeiculo.objects.filter(regional_id=objeto.pk).update(regional_sigla=objeto.sigla, versao=None)
+    elif isinstance(objeto, Departamento):
+        PainelVeiculo.objects.filter(departamento_id=objeto.pk).update(departamento_sigla=objeto.sigla, versao=None)
+    elif isinstance(objeto, ModeloVeiculo):
+        PainelVeiculo.objects.filter(veiculo__modelo_id=objeto.pk).update(modelo=objeto.nome, versao=None)
+
+
+def registrar_remocao(veiculo):
+    """Chamar antes de excluir o veículo, na mesma transação."""
+    RemocaoPainel.objects.create(veiculo_id=veiculo.pk)
+
+
+def limpar_remocoes(versao_atual):
+    """
+    Apaga as remoções de mais de FROTA_RETENCAO_REMOCOES versões atrás. Páginas
+    abertas desde antes disso recarregam inteiras (ao_vivo.mudancas), então não
+    precisam delas. Devolve quantas foram apagadas.
+    """
+    limite = versao_atual - settings.FROTA_RETENCAO_REMOCOES
+    return RemocaoPainel.objects.filter(versao__lte=limite).delete()[0]
+
+
+@transaction.atomic
+def reconstruir():
+    """Apaga e refaz o painel inteiro a partir das tabelas de origem."""
+    PainelVeiculo.objects.all().delete()
+    for lote in _lotes(_linhas(Veiculo.objects.order_by('pk'))):
+        PainelVeiculo.objects.bulk_create(lote)
+    return PainelVeiculo.objects.count()
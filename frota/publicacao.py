@@ -0,0 +1,240 @@
+# frota/publicacao.py
+
+"""
+Painel público estático (opcional, FROTA_PUBLICACAO).
+
+publicar() renderiza a página inicial sem filtros como index.html, grava a
+frota inteira num JSON por versão (veiculos.<versao>.json, no formato de
+frota.compacto) e aponta o versao.json para ele. Visitantes anônimos da página
+inicial vão para essa página, que filtra, ordena, pagina e acompanha o
+versao.json no navegador, sem chegar ao banco.
+
+Publicar não acontece no request de quem alterou os dados: o comando
+publicar_painel --acompanhar (um processo só, fora do servidor web) compara a
+versão dos dados com a do versao.json publicado e publica quando ela muda.
+A versão no banco já é a marca de "falta publicar", então nada se perde se o
+comando ficar parado por um tempo.
+
+Os arquivos vão para STORAGES['publicacao'], que em produção deve ser um
+armazenamento compartilhado (S3, R2, GCS via django-storages): o disco da
+Vercel é somente leitura e separado por instância. Sem ele, ficam em
+FROTA_PUBLICACAO_DIR, bom para um servidor só. Com FROTA_PUBLICACAO_URL
+relativa (o padrão, /publico/) o próprio Django entrega os arquivos com
+cabeçalhos para o CDN guardá-los (ver servir()).
+"""
+
+import json
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.http import FileResponse, Http404, HttpRequest
+from django.shortcuts import redirect
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_GET
+
+from . import compacto
+from .api import ANO
+from .cache import versao_no_banco
+from .models import PainelVeiculo
+from .views import contexto_index
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ARQUIVO_PAGINA = 'index.html'
+ARQUIVO_VERSAO = 'versao.json'
+# Um arquivo por versão, que o CDN pode guardar para sempre
+ARQUIVO_DADOS = 'veiculos.{versao}.json'
+_PADRAO_DADOS = re.compile(r'^veiculos\.(\d+)\.json$')
+# Versões antigas mantidas para quem ainda está baixando uma delas
+MANTER_VERSOES = 3
+# Trava entre processos que publicam: no PostgreSQL, a chave da trava consultiva
+# (pg_advisory_lock); nos outros bancos, um arquivo na máquina
+CHAVE_TRAVA = 0x66726f7461  # "frota"
+ARQUIVO_TRAVA = os.path.join(tempfile.gettempdir(), 'frota-publicacao.lock')
+
+
+def armazenamento():
+    """
+    STORAGES['publicacao'] ou FROTA_PUBLICACAO_BACKEND, se estiverem
+    configurados; senão, FROTA_PUBLICACAO_DIR no disco.
+    """
+    if 'publicacao' in settings.STORAGES:
+        return storages['publicacao']
+    if settings.FROTA_PUBLICACAO_BACKEND:
+        return import_string(settings.FROTA_PUBLICACAO_BACKEND)(**settings.FROTA_PUBLICACAO_OPCOES)
+    return FileSystemStorage(
+        location=settings.FROTA_PUBLICACAO_DIR, base_url=settings.FROTA_PUBLICACAO_URL, allow_overwrite=True,
+    )
+
+
+def _gravar(destino, nome, conteudo):
+    if isinstance(destino, FileSystemStorage):
+        # Arquivo temporário na mesma pasta e os.replace: quem lê nunca vê um arquivo pela metade
+        os.makedirs(destino.location, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=destino.location, prefix=f'.{nome}.', delete=False) as temporario:
+            temporario.write(conteudo.encode())
+        os.chmod(temporario.name, destino.file_permissions_mode or 0o644)
+        os.replace(temporario.name, destino.path(nome))
+        return
+    # Armazenamentos de objetos já trocam o arquivo inteiro de uma vez
+    if destino.save(nome, ContentFile(conteudo.encode())) != nome:
+        raise ImproperlyConfigured('O armazenamento da publicação precisa sobrescrever arquivos existentes.')
+
+
+@contextmanager
+def _trava_arquivo():
+    with open(ARQUIVO_TRAVA, 'a+') as trava:
+        if fcntl:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+        else:
+            trava.seek(0)
+            msvcrt.locking(trava.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(trava, fcntl.LOCK_UN)
+            else:
+                trava.seek(0)
+                msvcrt.locking(trava.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _travar():
+    """
+    Uma publicação por vez. Com o PostgreSQL a trava é do banco principal e
+    vale para todas as máquinas que publicam nele; com outros bancos (SQLite,
+    que já é de uma máquina só) é um arquivo e vale só entre os processos da
+    mesma máquina.
+    """
+    conexao = connections[DEFAULT_DB_ALIAS]
+    if conexao.vendor != 'postgresql':
+        with _trava_arquivo():
+            yield
+        return
+    with conexao.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_lock(%s)', [CHAVE_TRAVA])
+    try:
+        yield
+    finally:
+        with conexao.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [CHAVE_TRAVA])
+
+
+def versao_publicada(destino=None):
+    """Versão apontada pelo versao.json publicado, ou None se nada foi publicado ainda."""
+    destino = destino or armazenamento()
+    if not destino.exists(ARQUIVO_VERSAO):
+        return None
+    with destino.open(ARQUIVO_VERSAO) as arquivo:
+        return json.load(arquivo)['versao']
+
+
+def gerar_pagina(urls):
+    # Request mínimo de um visitante anônimo, sem filtros
+    request = HttpRequest()
+    request.method = 'GET'
+    request.user = AnonymousUser()
+    context = contexto_index(request)
+    context.update(tempo_real='estatico', publicacao=urls)
+    return render_to_string('frota/index.html', context, request)
+
+
+def _limpar(destino):
+    _, arquivos = destino.listdir('')
+    versoes = sorted(int(encontrado[1]) for encontrado in map(_PADRAO_DADOS.match, arquivos) if encontrado)
+    for versao in versoes[:-MANTER_VERSOES]:
+        destino.delete(ARQUIVO_DADOS.format(versao=versao))
+
+
+def publicar(forcar=False):
+    """
+    Grava o JSON da versão atual, a página e o versao.json, nessa ordem, e
+    apaga os JSON antigos. Não faz nada se o versao.json já aponta para esta
+    versão ou uma mais nova, a menos que `forcar`. Com _travar(), dois
+    publicadores não intercalam as gravações nem trocam a página por uma
+    versão mais velha. Devolve a versão publicada.
+    """
+    destino = armazenamento()
+    alias = router.db_for_read(PainelVeiculo)
+    with _travar():
+        while True:
+            versao = versao_no_banco(alias)
+            publicada = versao_publicada(destino)
+            if publicada is not None and publicada >= versao and not forcar:
+                return publicada
+            nome_dados = ARQUIVO_DADOS.format(versao=versao)
+            urls = {'dados': destino.url(nome_dados), 'versao': destino.url(ARQUIVO_VERSAO)}
+            dados = compacto.gerar(versao, alias)
+            pagina = gerar_pagina(urls)
+            # O JSON e a página valem para esta versão só se ela não mudou enquanto eram gerados
+            if versao_no_banco(alias) == versao:
+                break
+
+        _gravar(destino, nome_dados, dados)
+        _gravar(destino, ARQUIVO_PAGINA, pagina)
+        _gravar(destino, ARQUIVO_VERSAO, json.dumps({'versao': versao, 'dados': urls['dados']}))
+        _limpar(destino)
+    return versao
+
+
+@require_GET
+def servir(request, nome):
+    """
+    Entrega um arquivo publicado quando FROTA_PUBLICACAO_URL aponta para o
+    próprio site. O JSON de cada versão nunca muda; a página e o versao.json
+    ficam no CDN (s-maxage) pelo intervalo com que o navegador os consulta.
+    """
+    if nome not in (ARQUIVO_PAGINA, ARQUIVO_VERSAO) and not _PADRAO_DADOS.match(nome):
+        raise Http404
+    destino = armazenamento()
+    if not destino.exists(nome):
+        raise Http404
+    response = FileResponse(destino.open(nome, 'rb'))
+    if nome == ARQUIVO_PAGINA or nome == ARQUIVO_VERSAO:
+        patch_cache_control(response, public=True, max_age=0, s_maxage=settings.FROTA_POLLING_INTERVALO)
+    else:
+        patch_cache_control(response, public=True, max_age=ANO, immutable=True)
+    return response
+
+
+def _pagina_publicada(request):
+    destino = redirect(armazenamento().url(ARQUIVO_PAGINA))
+    if request.META.get('QUERY_STRING'):
+        # A página publicada lê os filtros da URL
+        destino['Location'] += '?' + request.META['QUERY_STRING']
+    return destino
+
+
+def anonimos_na_publicacao(view):
+    """Manda visitantes anônimos da página inicial para a página publicada (pweb/urls.py)."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def _view_async(request, *args, **kwargs):
+            if not (await request.auser()).is_authenticated:
+                return _pagina_publicada(request)
+            return await view(request, *args, **kwargs)
+        return _view_async
+
+    @wraps(view)
+    def _view(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return _pagina_publicada(request)
+        return view(request, *args, **kwargs)
+    return _view
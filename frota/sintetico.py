@@ -0,0 +1,138 @@
+# frota/sintetico.py
+
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import registrar_atualizacao
+from .models import Departamento, EventoStatus, Indisponibilidade, Manutencao, ModeloVeiculo, Regional, Veiculo
+from .painel import sincronizar
+
+TAMANHO_LOTE = 1000
+
+# Quantos veículos para cada item do catálogo, com um mínimo por tipo
+VEICULOS_POR_REGIONAL = 2000
+VEICULOS_POR_DEPARTAMENTO = 100
+VEICULOS_POR_MODELO = 250
+VEICULOS_POR_OFICINA = 400
+
+PESOS_TIPO = {'LEVE': 60, 'MEDIO': 20, 'PESADO': 12, 'EQUIPAMENTO': 8}
+PESOS_SEGMENTO = {'LT': 45, 'SE': 40, 'N/A': 15}
+CIDADES = ['Teresina', 'Parnaíba', 'Picos', 'Floriano', 'Fortaleza', 'São Luís', 'Recife', 'Natal']
+SERVICOS = ['Revisão preventiva', 'Troca de pneus', 'Freios', 'Suspensão', 'Elétrica', 'Funilaria']
+STATUS_OS = [valor for valor, _ in Manutencao.STATUS_OS_CHOICES]
+MOTIVOS = ['Sem motorista', 'Documentação vencida', 'Aguardando sinistro', 'Reservado para obra']
+
+# Placas sintéticas começam com este prefixo, para rodar de novo sem colidir
+PREFIXO_PLACA = 'SIN'
+
+
+class ResultadoGeracao:
+    def __init__(self, veiculos, em_manutencao, indisponiveis):
+        self.veiculos = veiculos
+        self.em_manutencao = em_manutencao
+        self.indisponiveis = indisponiveis
+
+
+def _base36(numero, digitos):
+    texto = ''
+    while numero:
+        numero, resto = divmod(numero, 36)
+        texto = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'[resto] + texto
+    return texto.rjust(digitos, '0')
+
+
+def _catalogo(modelo, quantidade, criar):
+    """Cria os itens que faltam (a geração pode rodar mais de uma vez) e devolve todos."""
+    objetos = [criar(i) for i in range(1, quantidade + 1)]
+    modelo.objects.bulk_create(objetos, ignore_conflicts=True)
+    campo = 'nome' if modelo is ModeloVeiculo else 'sigla'
+    return list(modelo.objects.filter(**{f'{campo}__in': [getattr(o, campo) for o in objetos]}))
+
+
+def _sortear(rng, pesos):
+    return rng.choices(list(pesos), weights=list(pesos.values()))[0]
+
+
+@transaction.atomic
+def gerar_frota(quantidade, taxa_manutencao=0.12, taxa_indisponivel=0.04, semente=None):
+    """
+    Cria `quantidade` veículos sintéticos com catálogo proporcional ao tamanho da
+    frota, parte deles em manutenção ou indisponível (com o evento de entrada no
+    histórico), e atualiza o painel. Com a mesma semente gera a mesma frota.
+    """
+    rng = random.Random(semente)
+    regionais = _catalogo(Regional, max(3, quantidade // VEICULOS_POR_REGIONAL),
+                          lambda i: Regional(nome=f'Regional sintética {i}', sigla=f'SR{i:03d}'))
+    departamentos = _catalogo(Departamento, max(5, quantidade // VEICULOS_POR_DEPARTAMENTO),
+                              lambda i: Departamento(nome=f'Departamento sintético {i}', sigla=f'SD{i:05d}'))
+    modelos = _catalogo(ModeloVeiculo, max(10, quantidade // VEICULOS_POR_MODELO),
+                        lambda i: ModeloVeiculo(nome=f'Modelo sintético {i:04d}'))
+    oficinas = [(f'Oficina {i:03d}', rng.choice(CIDADES)) for i in range(1, max(5, quantidade // VEICULOS_POR_OFICINA) + 1)]
+
+    inicio = Veiculo.objects.filter(placa__startswith=PREFIXO_PLACA).count()
+    hoje = timezone.localdate()
+    agora = timezone.now()
+    novos = em_manutencao = indisponiveis = 0
+
+    for lote_inicio in range(inicio, inicio + quantidade, TAMANHO_LOTE):
+        numeros = range(lote_inicio, min(lote_inicio + TAMANHO_LOTE, inicio + quantidade))
+        veiculos = []
+        for numero in numeros:
+            sorteio = rng.random()
+            if sorteio < taxa_manutencao:
+                status = 'Em Manutenção'
+            elif sorteio < taxa_manutencao + taxa_indisponivel:
+                status = 'Indisponível'
+            else:
+                status = 'Disponível'
+            veiculos.append(Veiculo(
+                prefixo=f'S{_base36(numero, 5)}', placa=f'{PREFIXO_PLACA}{numero:07d}',
+                modelo=rng.choice(modelos), regional=rng.choice(regionais), departamento=rng.choice(departamentos),
+                tipo_veiculo=_sortear(rng, PESOS_TIPO), segmento=_sortear(rng, PESOS_SEGMENTO), status=status,
+            ))
+        Veiculo.objects.bulk_create(veiculos)
+        # Os eventos sintéticos voltam até 60 dias; o cadastro fica antes deles para os indicadores
+        Veiculo.objects.filter(pk__in=[v.pk for v in veiculos]).update(criado_em=agora - timedelta(days=61))
+
+        manutencoes, indisponibilidades, eventos = [], [], []
+        for veiculo in veiculos:
+            if veiculo.status == 'Em Manutenção':
+                nome_oficina, cidade_oficina = rng.choice(oficinas)
+                entrada = hoje - timedelta(days=rng.randint(0, 60))
+                manutencao = Manutencao(
+                    veiculo=veiculo, servicos=rng.choice(SERVICOS), nome_oficina=nome_oficina,
+                    cidade_oficina=cidade_oficina, data_entrada=entrada,
+                    data_previsao_saida=entrada + timedelta(days=rng.randint(3, 30)) if rng.random() < 0.7 else None,
+                    numero_os=f'OS-{veiculo.placa}', status_os=rng.choice(STATUS_OS),
+                )
+                manutencoes.append(manutencao)
+                eventos.append(EventoStatus(
+                    veiculo=veiculo, placa=veiculo.placa, tipo=EventoStatus.ENTRADA_MANUTENCAO,
+                    status_anterior='Disponível', status_novo=veiculo.status,
+                    data_hora=agora - timedelta(days=(hoje - entrada).days),
+                    servicos=manutencao.servicos, nome_oficina=nome_oficina, cidade_oficina=cidade_oficina,
+                    data_entrada=entrada, data_previsao_saida=manutencao.data_previsao_saida,
+                    numero_os=manutencao.numero_os, status_os=manutencao.status_os,
+                ))
+            elif veiculo.status == 'Indisponível':
+                motivo = rng.choice(MOTIVOS)
+                indisponibilidades.append(Indisponibilidade(veiculo=veiculo, motivo=motivo))
+                eventos.append(EventoStatus(
+                    veiculo=veiculo, placa=veiculo.placa, tipo=EventoStatus.ENTRADA_INDISPONIBILIDADE,
+                    status_anterior='Disponível', status_novo=veiculo.status,
+                    data_hora=agora - timedelta(days=rng.randint(0, 30)), motivo=motivo,
+                ))
+        Manutencao.objects.bulk_create(manutencoes)
+        Indisponibilidade.objects.bulk_create(indisponibilidades)
+        EventoStatus.objects.bulk_create(eventos)
+
+        novos += len(veiculos)
+        em_manutencao += len(manutencoes)
+        indisponiveis += len(indisponibilidades)
+        sincronizar(Veiculo.objects.filter(pk__in=[v.pk for v in veiculos]))
+
+    registrar_atualizacao(painel=True, catalogo=True)
+    return ResultadoGeracao(novos, em_manutencao, indisponiveis)
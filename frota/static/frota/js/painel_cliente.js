@@ -0,0 +1,262 @@
+// Filtros, ordenação e paginação da página inicial no navegador, sobre a frota
+// inteira no formato colunar de frota/compacto.py. A página publicada
+// (frota/publicacao.py) funciona assim desde o início; a servida pelo Django
+// continua com as linhas do servidor e assume a lista no primeiro filtro,
+// ordenação ou link com ?ordem=, sem voltar ao servidor depois disso.
+document.addEventListener('DOMContentLoaded', function () {
+    const corpo = document.getElementById('linhas-veiculos');
+    if (!corpo || !corpo.dataset.urlFrota) {
+        return;
+    }
+    const estatico = corpo.dataset.modo === 'estatico';
+    const form = document.getElementById('filtros-veiculos');
+    const total = document.getElementById('total-veiculos');
+    const cabecalhos = document.querySelectorAll('th[data-ordem]');
+    const porPagina = parseInt(corpo.dataset.porPagina, 10);
+    const BADGES = {'Disponível': 'badge-disponivel', 'Em Manutenção': 'badge-manutencao', 'Indisponível': 'badge-indisponivel'};
+    // Filtros que comparam igualdade (frota/filtros.py); regional e departamento pelo id
+    const IGUAIS = ['departamento', 'status', 'regional', 'tipo_veiculo', 'segmento'];
+    const COLADOR = new Intl.Collator('pt-BR', { numeric: true, sensitivity: 'base' });
+    const inicial = new URLSearchParams(window.location.search);
+
+    let frota = null;
+    let ativo = false;
+    let inicio = 0;
+    let ordem = inicial.get('ordem') || '';
+    let carregando = null;
+
+    // --- Leitura da frota colunar ---
+
+    function preparar(dados) {
+        const detalhes = new Map();
+        dados.detalhes.linhas.forEach(function (linha) { detalhes.set(linha[0], linha.slice(1)); });
+        const campos = {};
+        dados.detalhes.campos.forEach(function (nome, posicao) { campos[nome] = posicao; });
+        return {
+            versao: dados.versao,
+            total: dados.colunas.id.length,
+            colunas: dados.colunas,
+            dicionarios: dados.dicionarios,
+            detalhe: function (i, nome) {
+                const linha = detalhes.get(i);
+                return linha ? linha[campos[nome]] : null;
+            },
+        };
+    }
+
+    function valor(i, nome) {
+        const bruto = frota.colunas[nome][i];
+        const dicionario = frota.dicionarios[nome];
+        return dicionario ? dicionario[bruto] : bruto;
+    }
+
+    // Regional e departamento: o dicionário guarda [id, sigla]
+    function sigla(i, nome) { return valor(i, nome)[1]; }
+    function data(texto) { return texto ? texto.split('-').reverse().join('/') : ''; }
+
+    function carregar(url) {
+        carregando = fetch(url)
+            .then(function (resposta) { return resposta.ok ? resposta.json() : null; })
+            .then(function (dados) {
+                if (!dados) return;
+                frota = preparar(dados);
+                if (ativo) mostrar();
+            })
+            .catch(function () {});
+        return carregando;
+    }
+
+    // Espera a frota chegar antes de `acao`
+    function comFrota(acao) {
+        (frota ? Promise.resolve() : carregando).then(function () { if (frota) acao(); });
+    }
+
+    // --- Filtro e ordenação ---
+
+    function filtrados() {
+        const filtros = new FormData(form);
+        const placa = (filtros.get('placa') || '').toLowerCase();
+        const iguais = IGUAIS.filter(function (nome) { return filtros.get(nome); });
+        const posicoes = [];
+        for (let i = 0; i < frota.total; i++) {
+            if (placa && !frota.colunas.placa[i].toLowerCase().includes(placa)) continue;
+            const passa = iguais.every(function (nome) {
+                const atual = valor(i, nome);
+                return String(Array.isArray(atual) ? atual[0] : atual) === filtros.get(nome);
+            });
+            if (passa) posicoes.push(i);
+        }
+        return posicoes;
+    }
+
+    function chave(i, nome) {
+        if (nome === 'regional' || nome === 'departamento') return sigla(i, nome);
+        if (nome === 'data_previsao_saida') return frota.detalhe(i, nome);
+        return valor(i, nome);
+    }
+
+    // Vazios sempre no final; empates na ordem padrão, que é a posição no JSON
+    function ordenados(posicoes) {
+        if (!ordem) return posicoes;
+        const nome = ordem.replace(/^-/, '');
+        const sentido = ordem.startsWith('-') ? -1 : 1;
+        const chaves = new Map(posicoes.map(function (i) { return [i, chave(i, nome)]; }));
+        return posicoes.sort(function (a, b) {
+            const ka = chaves.get(a), kb = chaves.get(b);
+            if (!ka && !kb) return a - b;
+            if (!ka) return 1;
+            if (!kb) return -1;
+            return sentido * COLADOR.compare(ka, kb) || a - b;
+        });
+    }
+
+    // --- Renderização, com as mesmas colunas de frota/linha_painel.html ---
+
+    function elemento(tag, classe, texto) {
+        const novo = document.createElement(tag);
+        if (classe) novo.className = classe;
+        if (texto !== undefined) novo.textContent = texto;
+        return novo;
+    }
+
+    function linha(i) {
+        const status = valor(i, 'status');
+        const prefixo = frota.colunas.prefixo[i];
+        const emManutencao = status === 'Em Manutenção';
+        const tr = elemento('tr');
+        tr.dataset.id = frota.colunas.id[i];
+        tr.dataset.prefixo = prefixo || '';
+        [prefixo || 'S/PREFIXO', valor(i, 'modelo'), frota.colunas.placa[i],
+         sigla(i, 'departamento'), sigla(i, 'regional')].forEach(function (texto) {
+            tr.appendChild(elemento('td', '', texto));
+        });
+        const celulaStatus = tr.appendChild(elemento('td'));
+        if (BADGES[status]) celulaStatus.appendChild(elemento('span', 'badge ' + BADGES[status], status));
+        tr.appendChild(elemento('td', '', data(frota.detalhe(i, 'data_previsao_saida')) || 'N/A'));
+        tr.appendChild(elemento('td', '', emManutencao ? frota.detalhe(i, 'numero_os') : '-'));
+        tr.appendChild(elemento('td', '', emManutencao ? frota.detalhe(i, 'status_os') : '-'));
+        const acoes = tr.appendChild(elemento('td'));
+        if (emManutencao || status === 'Indisponível') {
+            const botao = acoes.appendChild(elemento('button', emManutencao ? 'btn btn-info btn-sm' : 'btn btn-danger btn-sm'));
+            Object.assign(botao.dataset, {
+                bsToggle: 'modal', bsTarget: emManutencao ? '#detalhesManutencaoModal' : '#detalhesIndisponivelModal',
+                placa: frota.colunas.placa[i], prefixo: prefixo || '', modelo: valor(i, 'modelo'),
+            });
+            if (emManutencao) {
+                Object.assign(botao.dataset, {
+                    servicos: frota.detalhe(i, 'servicos'), oficina: frota.detalhe(i, 'nome_oficina') || 'N/A',
+                    cidade: frota.detalhe(i, 'cidade_oficina') || 'N/A', entrada: data(frota.detalhe(i, 'data_entrada')),
+                    previsao: data(frota.detalhe(i, 'data_previsao_saida')) || 'N/A',
+                    os: frota.detalhe(i, 'numero_os'), statusos: frota.detalhe(i, 'status_os'),
+                });
+            } else {
+                botao.dataset.motivo = frota.detalhe(i, 'motivo');
+            }
+            botao.appendChild(elemento('i', emManutencao ? 'fas fa-wrench' : 'fas fa-info-circle'));
+            botao.appendChild(document.createTextNode(' Detalhes'));
+        }
+        return tr;
+    }
+
+    function habilitar(nome, ativa) {
+        document.querySelector('[data-pagina="' + nome + '"]').parentElement.classList.toggle('disabled', !ativa);
+    }
+
+    function marcarOrdem() {
+        cabecalhos.forEach(function (th) {
+            const icone = th.querySelector('i');
+            const sentido = ordem === th.dataset.ordem ? 'up' : ordem === '-' + th.dataset.ordem ? 'down' : '';
+            icone.className = sentido ? 'fas fa-sort-' + sentido : 'fas fa-sort text-muted';
+        });
+    }
+
+    function mostrar() {
+        const posicoes = ordenados(filtrados());
+        if (inicio >= posicoes.length) inicio = 0;
+        corpo.replaceChildren.apply(corpo, posicoes.slice(inicio, inicio + porPagina).map(linha));
+        if (!posicoes.length) {
+            const vazia = corpo.appendChild(elemento('tr', 'sem-veiculos'));
+            vazia.appendChild(elemento('td', 'text-center', 'Nenhum veículo encontrado.')).colSpan = 8;
+        }
+        total.textContent = posicoes.length + (posicoes.length === 1 ? ' veículo encontrado' : ' veículos encontrados');
+        habilitar('primeira', inicio > 0);
+        habilitar('anterior', inicio > 0);
+        habilitar('proxima', inicio + porPagina < posicoes.length);
+        marcarOrdem();
+    }
+
+    // Mesma querystring que o servidor entende, mais ?ordem=; a paginação fica de fora
+    function sincronizarUrl() {
+        const params = new URLSearchParams();
+        new FormData(form).forEach(function (texto, nome) { if (texto) params.append(nome, texto); });
+        if (ordem) params.set('ordem', ordem);
+        if (inicial.get('por_pagina')) params.set('por_pagina', inicial.get('por_pagina'));
+        history.replaceState(null, '', params.toString() ? '?' + params : window.location.pathname);
+    }
+
+    // A partir daqui a lista é do navegador; a atualização ao vivo só avisa a versão nova
+    function assumir() {
+        if (!ativo) {
+            ativo = true;
+            corpo.dataset.cliente = '1';
+            if (!estatico && frota.versao < parseInt(corpo.dataset.versao, 10)) {
+                carregar(corpo.dataset.urlFrotaAtual);
+            }
+        }
+        inicio = 0;
+        sincronizarUrl();
+        mostrar();
+    }
+
+    form.addEventListener('submit', function (evento) {
+        // Sem a frota (falhou ao baixar) a página do Django filtra como sempre
+        if (!frota && !estatico) return;
+        evento.preventDefault();
+        comFrota(assumir);
+    });
+
+    cabecalhos.forEach(function (th) {
+        th.addEventListener('click', function () {
+            ordem = ordem === th.dataset.ordem ? '-' + th.dataset.ordem : th.dataset.ordem;
+            comFrota(assumir);
+        });
+    });
+
+    document.querySelectorAll('[data-pagina]').forEach(function (link) {
+        link.addEventListener('click', function (evento) {
+            if (!ativo) return;
+            evento.preventDefault();
+            if (link.parentElement.classList.contains('disabled')) return;
+            inicio = {primeira: 0, anterior: Math.max(inicio - porPagina, 0), proxima: inicio + porPagina}[link.dataset.pagina];
+            mostrar();
+        });
+    });
+
+    corpo.addEventListener('frota:versao', function (evento) {
+        if (frota && evento.detail > frota.versao) carregar(corpo.dataset.urlFrotaAtual);
+    });
+
+    // Filtros de um link compartilhado já estão no formulário (o servidor marcou os
+    // campos); na página publicada vêm só na URL
+    if (estatico) {
+        inicial.forEach(function (texto, nome) {
+            if (form.elements[nome]) form.elements[nome].value = texto;
+        });
+    }
+    carregar(corpo.dataset.urlFrota);
+    if (estatico || ordem) {
+        comFrota(assumir);
+    }
+
+    // Página publicada: acompanha o versao.json, que aponta para o JSON da versão atual
+    if (estatico) {
+        const intervalo = parseInt(corpo.dataset.intervalo, 10) * 1000;
+        setInterval(function () {
+            if (document.hidden) return;
+            fetch(corpo.dataset.urlVersao, { cache: 'no-cache' })
+                .then(function (resposta) { return resposta.ok ? resposta.json() : null; })
+                .then(function (dados) { if (dados && frota && dados.versao !== frota.versao) carregar(dados.dados); })
+                .catch(function () {});
+        }, intervalo);
+    }
+});
@@ -1,18 +1,48 @@
 # frota/templatetags/frota_tags.py
 
+import hashlib
+from functools import lru_cache
+
 from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
 from ..forms import ManutencaoForm, IndisponibilidadeForm
+from ..opcoes import html_opcoes
 
 register = template.Library()
 
+# Os filtros esperam o veículo carregado com select_related('manutencao', 'indisponibilidade').
+# Assim o getattr usa o objeto já em memória (ou o None guardado pelo JOIN) sem nova consulta.
 @register.filter
 def get_manutencao_form(veiculo):
-    if hasattr(veiculo, 'manutencao'):
-        return ManutencaoForm(instance=veiculo.manutencao)
-    return ManutencaoForm()
+    return ManutencaoForm(instance=getattr(veiculo, 'manutencao', None))
 
 @register.filter
 def get_indisponibilidade_form(veiculo):
-    if hasattr(veiculo, 'indisponibilidade'):
-        return IndisponibilidadeForm(instance=veiculo.indisponibilidade)
-    return IndisponibilidadeForm()
\ No newline at end of file
+    return IndisponibilidadeForm(instance=getattr(veiculo, 'indisponibilidade', None))
+
+# Opções de modelos, regionais ou departamentos já montadas (ver frota.opcoes):
+# {% opcoes_catalogo 'regional' veiculo.regional_id %}
+# Sob ASGI usa as listas que a view carregou antes (opcoes_carregadas no contexto).
+@register.simple_tag(takes_context=True)
+def opcoes_catalogo(context, nome, selecionado=None):
+    return html_opcoes(nome, selecionado, context.get('request'), context.get('opcoes_carregadas'))
+
+# URL de um arquivo estático com o hash do conteúdo (?v=...), para o navegador guardar o
+# arquivo até ele mudar: {% static_versionado 'frota/js/painel_cliente.js' %}
+# O WhiteNoise serve frota/js/ como imutável (WHITENOISE_IMMUTABLE_FILE_TEST), então
+# esses arquivos só devem ser referenciados por esta tag.
+@register.simple_tag
+def static_versionado(caminho):
+    return _url_versionada(caminho)
+
+# O hash é calculado uma vez por processo: os arquivos estáticos só mudam no deploy
+@lru_cache(maxsize=None)
+def _url_versionada(caminho):
+    url = static(caminho)
+    arquivo = finders.find(caminho)
+    if arquivo is None:
+        return url
+    with open(arquivo, 'rb') as f:
+        conteudo = hashlib.md5(f.read(), usedforsecurity=False).hexdigest()[:12]
+    return f'{url}?v={conteudo}'
@@ -1,3 +1,1342 @@
-from django.test import TestCase
+import base64
+from datetime import timedelta
+import gzip
+import hashlib
+import importlib.util
+import json
+import time
+from contextvars import copy_context
+from io import BytesIO, StringIO
+from pathlib import Path
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from unittest import mock, skipUnless
+import zipfile
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.conf import settings
+from django.db import connection, connections
+from django.http import HttpResponse, QueryDict
+from django.test import AsyncClient, LiveServerTestCase, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve, reverse
+from django.template import engines
+from django.template.base import Template
+from django.utils import timezone
+
+from .models import Departamento, EventoStatus, IndicadorDiario, IndicadorOficinaDiario, PainelVeiculo, RemocaoPainel, Indisponibilidade, Manutencao, ModeloVeiculo, Regional, Veiculo
+from . import ao_vivo, assincrono, busca, compacto, importacao, opcoes, painel, publicacao, transicoes, views
+from . import urls as frota_urls
+from .sintetico import gerar_frota
+from .templatetags.frota_tags import static_versionado
+from pweb import perfil, roteador
+
+from . import cache as frota_cache
+from .cache import chave_pagina, registrar_atualizacao, versao_dados
+from .filtros import CAMPOS_FILTRO_INDEX
+from .paginacao import CAMPOS_PAGINACAO, ORDEM, codificar_cursor, paginar
+
+
+class CatalogoTestCase(TestCase):
+    """Usuário admin e o modelo, a regional e o departamento dos veículos criados nos testes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('admin', password='senha')
+        cls.modelo = ModeloVeiculo.objects.create(nome='Strada')
+        cls.regional = Regional.objects.create(nome='Teresina', sigla='THE')
+        cls.departamento = Departamento.objects.create(nome='Manutenção', sigla='DM')
+
+    @classmethod
+    def criar_veiculo(cls, placa, **campos):
+        campos = {'modelo': cls.modelo, 'regional': cls.regional, 'departamento': cls.departamento, **campos}
+        return Veiculo.objects.create(placa=placa, **campos)
+
+
+@override_settings(FROTA_VERSAO_TTL=0)
+class GerenciarVeiculosConsultasTests(CatalogoTestCase):
+    """A lista de veículos do painel deve fazer o mesmo número de consultas para qualquer tamanho de frota."""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+
+    def criar_veiculos(self, quantidade):
+        inicio = Veiculo.objects.count()
+        for i in range(inicio, inicio + quantidade):
+            veiculo = Veiculo.objects.create(
+                prefixo=f'V{i:04d}', placa=f'ABC{i:04d}', modelo=self.modelo,
+                regional=self.regional, departamento=self.departamento,
+            )
+            # Alterna entre veículos em manutenção, indisponíveis e disponíveis
+            if i % 3 == 0:
+                Manutencao.objects.create(veiculo=veiculo, servicos='Revisão', status_os='N/A')
+                veiculo.status = 'Em Manutenção'
+                veiculo.save()
+            elif i % 3 == 1:
+                Indisponibilidade.objects.create(veiculo=veiculo, motivo='Sem motorista')
+                veiculo.status = 'Indisponível'
+                veiculo.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_atualizacao()
+
+    def contar_consultas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('gerenciar_veiculos'))
+        self.assertEqual(response.status_code, 200)
+        return len(consultas)
+
+    def assertConsultasConstantes(self):
+        self.criar_veiculos(3)
+        poucos = self.contar_consultas()
+        self.criar_veiculos(12)
+        muitos = self.contar_consultas()
+        self.assertEqual(poucos, muitos)
+
+    @override_settings(FROTA_MODAIS_SOB_DEMANDA=False)
+    def test_modais_inline(self):
+        self.assertConsultasConstantes()
+
+    @override_settings(FROTA_MODAIS_SOB_DEMANDA=True)
+    def test_modais_sob_demanda(self):
+        self.assertConsultasConstantes()
+
+
+@override_settings(FROTA_VERSAO_TTL=60)
+class CachePaginaInicialTests(CatalogoTestCase):
+    """Para visitantes anônimos a página inicial renderizada fica em cache até a próxima gravação."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.veiculo = cls.criar_veiculo('ABC1234')
+
+    def setUp(self):
+        cache.clear()
+        # Renova a versão guardada no processo, que outro teste pode ter deixado para trás
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconstruir_painel', stdout=StringIO())
+            registrar_atualizacao()
+        self.client.cookies[roteador.COOKIE_PRINCIPAL] = '1'
+
+    def test_segunda_visita_anonima_vem_do_cache(self):
+        primeira = self.client.get(reverse('index'), {'status': 'Disponível'})
+        self.assertContains(primeira, 'ABC1234')
+        with self.assertNumQueries(0):
+            segunda = self.client.get(reverse('index'), {'status': 'Disponível'})
+        self.assertEqual(segunda.content, primeira.content)
+
+    def test_gravacao_invalida_o_cache(self):
+        self.assertContains(self.client.get(reverse('index')), 'ABC1234')
+
+        admin = self.client_class()
+        admin.force_login(self.usuario)
+        with self.captureOnCommitCallbacks(execute=True):
+            admin.post(reverse('excluir_veiculo', args=[self.veiculo.pk]))
+        self.assertNotContains(self.client.get(reverse('index')), 'ABC1234')
+
+    def test_usuario_logado_nao_usa_o_cache(self):
+        anonima = self.client.get(reverse('index'))
+        self.assertNotContains(anonima, 'Painel Admin')
+
+        self.client.force_login(self.usuario)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('index'))
+        self.assertContains(response, 'Painel Admin')
+        self.assertTrue(any(PainelVeiculo._meta.db_table in q['sql'] for q in consultas.captured_queries))
+
+
+@override_settings(FROTA_VERSAO_TTL=0)
+class GetCondicionalTests(CatalogoTestCase):
+    """ETag e Last-Modified derivados da versão dos dados."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.outro = User.objects.create_user('outro', password='senha')
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_atualizacao()
+        self.client.cookies[roteador.COOKIE_PRINCIPAL] = '1'
+
+    def test_repeticao_responde_304(self):
+        response = self.client.get(reverse('index'))
+        self.assertEqual(response.status_code, 200)
+
+        repetida = self.client.get(reverse('index'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(repetida.status_code, 304)
+        repetida = self.client.get(reverse('index'), headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(repetida.status_code, 304)
+
+    def test_etag_muda_com_gravacao_usuario_e_filtros(self):
+        anonima = self.client.get(reverse('index'))['ETag']
+        self.assertNotEqual(self.client.get(reverse('index'), {'status': 'Disponível'})['ETag'], anonima)
+
+        self.client.force_login(self.usuario)
+        primeiro = self.client.get(reverse('gerenciar_regionais'))['ETag']
+        outro = self.client_class()
+        outro.force_login(self.outro)
+        self.assertNotEqual(outro.get(reverse('gerenciar_regionais'))['ETag'], primeiro)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('editar_regional', args=[self.regional.pk]), {'nome': 'Teresina', 'sigla': 'TSA'})
+        self.client.get(reverse('gerenciar_regionais'))  # exibe a mensagem de sucesso
+        response = self.client.get(reverse('gerenciar_regionais'), headers={'If-None-Match': primeiro})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], primeiro)
+
+    def test_mensagens_pendentes_desligam_o_304(self):
+        self.client.force_login(self.usuario)
+        etag = self.client.get(reverse('gerenciar_regionais'))['ETag']
+
+        # Excluir uma regional com veículos não altera dados, mas deixa uma mensagem para a próxima página
+        self.criar_veiculo('ABC1234')
+        self.client.post(reverse('excluir_regional', args=[self.regional.pk]))
+        response = self.client.get(reverse('gerenciar_regionais'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class FormularioVeiculoTests(CatalogoTestCase):
+    """Modais de manutenção e indisponibilidade carregados sob demanda pela lista de veículos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.veiculo = cls.criar_veiculo('ABC1234')
+        Manutencao.objects.create(veiculo=cls.veiculo, servicos='Troca de óleo', nome_oficina='Oficina Central', status_os='N/A')
+
+    def url(self, tipo, id=None):
+        return reverse('formulario_veiculo', args=[tipo, id or self.veiculo.pk])
+
+    def test_renderiza_o_formulario_do_veiculo(self):
+        self.client.force_login(self.usuario)
+        response = self.client.get(self.url('manutencao'))
+        self.assertContains(response, reverse('gerenciar_manutencao', args=[self.veiculo.pk]))
+        for campo in ('servicos', 'nome_oficina', 'cidade_oficina', 'data_entrada', 'numero_os', 'status_os'):
+            self.assertContains(response, f'name="{campo}"')
+        self.assertContains(response, 'Oficina Central')
+
+        response = self.client.get(self.url('indisponibilidade'))
+        self.assertContains(response, reverse('gerenciar_indisponibilidade', args=[self.veiculo.pk]))
+        self.assertContains(response, 'name="motivo"')
+
+    def test_exige_login(self):
+        response = self.client.get(self.url('manutencao'))
+        self.assertRedirects(response, f"{reverse('login')}?next={self.url('manutencao')}", fetch_redirect_response=False)
+
+    def test_404_para_veiculo_ou_tipo_inexistente(self):
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(self.url('manutencao', self.veiculo.pk + 1)).status_code, 404)
+        self.assertEqual(self.client.get(self.url('pneus')).status_code, 404)
+
+
+class PaginacaoCursorTests(CatalogoTestCase):
+    """Cursores (prefixo, pk) com prefixos repetidos e veículos sem prefixo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(8):
+            cls.criar_veiculo(f'ABC{i:04d}')
+        call_command('reconstruir_painel', stdout=StringIO())
+        # O prefixo é único no cadastro, mas a cópia do painel (lida pela página inicial) não garante isso
+        for linha, prefixo in zip(PainelVeiculo.objects.order_by('pk'), ['B', None, 'A', 'A', None, 'C', 'A', None]):
+            linha.prefixo = prefixo
+            linha.save(update_fields=['prefixo'])
+        cls.ordem = list(PainelVeiculo.objects.order_by(*ORDEM).values_list('pk', flat=True))
+
+    def setUp(self):
+        cache.clear()
+
+    def pagina(self, url='?'):
+        params = QueryDict(url[1:], mutable=True)
+        params['por_pagina'] = '3'
+        return paginar(PainelVeiculo.objects.all(), params, 'teste:total')
+
+    def test_avanca_e_volta_pela_frota_inteira(self):
+        paginas, pagina = [], self.pagina()
+        while True:
+            paginas.append([v.pk for v in pagina.itens])
+            if not pagina.url_proxima:
+                break
+            pagina = self.pagina(pagina.url_proxima)
+        self.assertEqual(sum(paginas, []), self.ordem)
+        self.assertEqual([len(p) for p in paginas], [3, 3, 2])
+
+        # Volta da última página até a primeira pelos links "anterior"
+        voltando = [[v.pk for v in pagina.itens]]
+        while pagina.url_anterior:
+            pagina = self.pagina(pagina.url_anterior)
+            voltando.insert(0, [v.pk for v in pagina.itens])
+        self.assertEqual(voltando, paginas)
+        self.assertIsNone(pagina.url_primeira)
+
+    def test_cursor_adulterado_volta_ao_inicio(self):
+        def cursor_json(texto):
+            return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+        primeira = [v.pk for v in self.pagina().itens]
+        for cursor in ('!!!', 'bm9wZQ', codificar_cursor(PainelVeiculo(pk='x')),
+                       'W3siYSI6MX0sMV0',  # [{"a":1},1]
+                       cursor_json('["A",1e400]'), cursor_json('["A",1.5]'), cursor_json('["A",true]'),
+                       cursor_json(f'["A",{2 ** 63}]')):
+            with self.subTest(cursor=cursor):
+                self.assertEqual([v.pk for v in self.pagina(f'?apos={cursor}').itens], primeira)
+                self.assertEqual([v.pk for v in self.pagina(f'?antes={cursor}').itens], primeira)
+
+
+class IndicesFiltrosTests(TestCase):
+    def test_combinacoes_de_filtros_usam_indice(self):
+        # Falha com CommandError se alguma combinação varrer a tabela de veículos
+        call_command('explicar_filtros', '--estrito', stdout=StringIO())
+
+
+class ImportacaoTests(CatalogoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Regional.objects.create(nome='Centro', sigla='CEN')
+        Regional.objects.create(nome='Centro', sigla='CTR')
+
+    def importar(self, *linhas, **opcoes):
+        return importacao.importar_veiculos(['prefixo;placa;modelo;tipo_veiculo;regional;departamento', *linhas], **opcoes)
+
+    def test_importa_em_lotes_numa_transacao(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as consultas:
+                resultado = self.importar('V1;abc0001;strada;Leve;THE;Manutenção', ';ABC0002;Strada;;Teresina;DM',
+                                          'V3;ABC0003;Strada;PESADO;the;dm', tamanho_lote=2)
+        self.assertTrue(resultado.ok)
+        self.assertEqual(resultado.criados, 3)
+        insercoes = [q for q in consultas.captured_queries if q['sql'].startswith(f'INSERT INTO "{Veiculo._meta.db_table}"')]
+        self.assertEqual(len(insercoes), 2)
+        self.assertEqual(list(PainelVeiculo.objects.order_by('placa').values_list('placa', 'tipo_veiculo')),
+                         [('ABC0001', 'LEVE'), ('ABC0002', 'LEVE'), ('ABC0003', 'PESADO')])
+
+    def test_erros_por_linha_e_nada_importado(self):
+        Veiculo.objects.create(placa='ABC0001', modelo=ModeloVeiculo.objects.get(), regional=Regional.objects.get(sigla='THE'),
+                               departamento=Departamento.objects.get())
+        resultado = self.importar(
+            'V1;ABC0001;Strada;Leve;THE;DM',   # placa já cadastrada
+            'V2;ABC0002;Strada;Leve;THE;DM',   # válida
+            'V3;ABC0002;Uno;Moto;THE;DM',      # placa repetida, modelo e tipo inválidos
+            'V4;;Strada;Leve;Centro;XX',       # sem placa, regional ambígua, departamento inexistente
+            'V5;ABC0005;Strada;Leve;CEN;DM',   # a sigla desfaz a ambiguidade
+        )
+        self.assertEqual([linha for linha, _ in resultado.erros], [2, 4, 5])
+        erros = dict(resultado.erros)
+        self.assertIn('placa "ABC0001" já cadastrada', erros[2])
+        self.assertIn('placa "ABC0002" já cadastrada ou repetida', erros[4])
+        self.assertIn('modelo "Uno" não encontrado', erros[4])
+        self.assertIn('tipo de veículo "Moto" inválido', erros[4])
+        self.assertIn('"placa" é obrigatório', erros[5])
+        self.assertIn('regional "Centro" é ambígua', erros[5])
+        self.assertIn('departamento "XX" não encontrado', erros[5])
+        self.assertEqual(resultado.validos, 2)
+        self.assertEqual(resultado.criados, 0)
+        self.assertEqual(Veiculo.objects.count(), 1)
+
+    def test_arquivo_invalido_vira_mensagem(self):
+        self.client.force_login(self.usuario)
+        arquivos = {
+            'latin1.csv': ('placa;modelo;regional;departamento\nABC0001;Strada;Teresina;Manutenção\n'.encode('latin-1'),
+                           'Linha 1: o arquivo precisa estar em UTF-8.'),
+            'grande.csv': (b'placa;modelo;regional;departamento\n' + b'X' * (200 * 1024) + b'\n',
+                           'Linha 2: CSV malformado (field larger than field limit (131072)).'),
+        }
+        for nome, (conteudo, erro) in arquivos.items():
+            with self.subTest(arquivo=nome):
+                response = self.client.post(reverse('importar_veiculos'),
+                                            {'arquivo': SimpleUploadedFile(nome, conteudo, 'text/csv')}, follow=True)
+                self.assertEqual(response.status_code, 200)
+                mensagens = [str(m) for m in response.context['messages']]
+                self.assertEqual(mensagens, ['1 linha(s) com erro. Nenhum veículo foi importado.', erro])
+        self.assertFalse(Veiculo.objects.exists())
+
+
+class ExportacaoTests(CatalogoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(3):
+            cls.criar_veiculo(f'ABC{i:04d}', prefixo=f'V{i}')
+        veiculo = Veiculo.objects.get(placa='ABC0000')
+        Indisponibilidade.objects.create(veiculo=veiculo, motivo='=HYPERLINK("http://x","y")')
+        Veiculo.objects.filter(pk=veiculo.pk).update(status='Indisponível')
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def exportar(self, **params):
+        response = self.client.get(reverse('exportar_veiculos'), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_com_cabecalho_filtros_e_texto_seguro(self):
+        linhas = self.exportar().decode('utf-8-sig').splitlines()
+        self.assertEqual(linhas[0].split(';')[:3], ['Prefixo', 'Placa', 'Modelo'])
+        self.assertEqual(len(linhas), 4)
+        self.assertTrue(linhas[1].startswith('V0;ABC0000;'))
+        self.assertTrue(linhas[1].endswith(';"\'=HYPERLINK(""http://x"",""y"")"'))
+
+        linhas = self.exportar(status='Disponível').decode('utf-8-sig').splitlines()
+        self.assertEqual([linha.split(';')[1] for linha in linhas[1:]], ['ABC0001', 'ABC0002'])
+
+    def test_xlsx_sem_formulas(self):
+        with zipfile.ZipFile(BytesIO(self.exportar(formato='xlsx'))) as xlsx:
+            planilha = xlsx.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(planilha.count('<row '), 4)
+        self.assertNotIn('<f>', planilha)
+        self.assertIn('=HYPERLINK', planilha)
+
+        with zipfile.ZipFile(BytesIO(self.exportar(formato='xlsx', status='Indisponível'))) as xlsx:
+            self.assertEqual(xlsx.read('xl/worksheets/sheet1.xml').decode().count('<row '), 2)
+
+
+@override_settings(FROTA_VERSAO_TTL=0)
+class ApiVeiculosTests(CatalogoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        outra = Regional.objects.create(nome='Parnaíba', sigla='PHB')
+        for i, regional in enumerate([cls.regional, cls.regional, outra]):
+            cls.criar_veiculo(f'ABC{i:04d}', prefixo=f'V{i}', regional=regional)
+        veiculo = Veiculo.objects.get(placa='ABC0000')
+        Manutencao.objects.create(veiculo=veiculo, servicos='Revisão', numero_os='OS-1', status_os='N/A')
+        Veiculo.objects.filter(pk=veiculo.pk).update(status='Em Manutenção')
+        call_command('reconstruir_painel', stdout=StringIO())
+
+    def setUp(self):
+        self.client.cookies[roteador.COOKIE_PRINCIPAL] = '1'
+
+    def dados(self, **params):
+        response = self.client.get(reverse('api_veiculos'), params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b''.join(response.streaming_content)), response
+
+    def test_campos_padrao_e_escolhidos(self):
+        dados, _ = self.dados()
+        self.assertEqual(dados['campos'][:3], ['id', 'prefixo', 'placa'])
+        linha = dict(zip(dados['campos'], dados['veiculos'][0]))
+        self.assertEqual((linha['placa'], linha['regional'], linha['numero_os']), ('ABC0000', 'THE', 'OS-1'))
+
+        dados, _ = self.dados(fields='placa,status')
+        self.assertEqual(dados['campos'], ['placa', 'status'])
+        self.assertEqual(dados['veiculos'][0], ['ABC0000', 'Em Manutenção'])
+
+    def test_filtros_da_pagina_inicial(self):
+        dados, _ = self.dados(fields='placa', regional=self.regional.pk)
+        self.assertEqual(dados['veiculos'], [['ABC0000'], ['ABC0001']])
+        dados, _ = self.dados(fields='placa', regional=self.regional.pk, status='Disponível')
+        self.assertEqual(dados['veiculos'], [['ABC0001']])
+
+    def test_parametros_invalidos_respondem_400(self):
+        for params in ({'fields': 'placa,senha'}, {'fields': ','}, {'regional': 'abc'}, {'departamento': '1 OR 1=1'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('api_veiculos'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('erro', response.json())
+        # A página inicial, que monta os filtros por formulário, só ignora o id inválido
+        self.assertContains(self.client.get(reverse('index'), {'regional': 'abc'}), 'ABC0002')
+
+    def test_cabecalhos_de_cache(self):
+        dados, response = self.dados()
+        self.assertEqual(dados['versao'], versao_dados())
+        self.assertIn('no-cache', response['Cache-Control'])
+        repetida = self.client.get(reverse('api_veiculos'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(repetida.status_code, 304)
+
+        # Outros campos são outra representação, com outro ETag
+        self.assertNotEqual(self.dados(fields='placa')[1]['ETag'], response['ETag'])
+
+
+class HistoricoStatusTests(CatalogoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.veiculo = cls.criar_veiculo('ABC1234')
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_manutencao_concluida_fica_no_historico(self):
+        dados = {'servicos': 'Troca de óleo', 'nome_oficina': 'Oficina Central', 'data_entrada': '2026-10-01',
+                 'numero_os': 'OS-1', 'status_os': 'Aprovado'}
+        self.client.post(reverse('gerenciar_manutencao', args=[self.veiculo.pk]), dados)
+        self.client.post(reverse('concluir_manutencao', args=[self.veiculo.pk]))
+
+        self.assertFalse(Manutencao.objects.exists())
+        eventos = list(self.veiculo.eventos.order_by('data_hora', 'pk'))
+        self.assertEqual([e.tipo for e in eventos], [EventoStatus.ENTRADA_MANUTENCAO, EventoStatus.SAIDA_MANUTENCAO])
+        self.assertEqual([e.status_novo for e in eventos], ['Em Manutenção', 'Disponível'])
+        self.assertEqual(eventos[1].numero_os, 'OS-1')
+        self.assertEqual(eventos[1].nome_oficina, 'Oficina Central')
+        self.assertEqual(eventos[1].usuario, self.usuario)
+
+    def test_historico_sobrevive_a_exclusao_do_veiculo(self):
+        self.client.post(reverse('gerenciar_indisponibilidade', args=[self.veiculo.pk]), {'motivo': 'Sem motorista'})
+        self.client.post(reverse('excluir_veiculo', args=[self.veiculo.pk]))
+
+        evento = EventoStatus.objects.get()
+        self.assertIsNone(evento.veiculo)
+        self.assertEqual((evento.placa, evento.motivo), ('ABC1234', 'Sem motorista'))
+
+
+class TransicoesTests(CatalogoTestCase):
+    """Mudanças de status em massa e individuais, com as regras de qual status permite qual ação."""
+
+    MANUTENCAO = {'servicos': 'Revisão', 'nome_oficina': 'Oficina A', 'data_entrada': '2026-10-01',
+                  'numero_os': 'OS-1', 'status_os': 'N/A'}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.a, cls.b, cls.c, cls.d = [cls.criar_veiculo(f'ABC000{i}') for i in range(4)]
+        call_command('reconstruir_painel', stdout=StringIO())
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def mensagens(self, url, dados=None):
+        response = self.client.post(url, dados or {}, follow=True)
+        return [str(m) for m in response.context['messages']]
+
+    def em_massa(self, acao, veiculos, **dados):
+        return self.mensagens(reverse('acao_em_massa'), {'acao': acao, 'ids': [v.pk for v in veiculos], **dados})
+
+    def status(self):
+        return dict(Veiculo.objects.values_list('placa', 'status'))
+
+    def test_acoes_em_massa_respeitam_o_status(self):
+        self.assertEqual(self.em_massa('manutencao', [self.a, self.b], **self.MANUTENCAO),
+                         ['2 veículo(s) atualizados com sucesso!'])
+        self.assertEqual(self.em_massa('indisponivel', [self.a, self.c], motivo='Sem motorista'),
+                         ['1 veículo(s) atualizados com sucesso!', 'Status não permite a ação para: ABC0000.'])
+
+        # Quem já está em manutenção tem o registro atualizado, sem abrir outro
+        self.em_massa('manutencao', [self.a, self.c], **{**self.MANUTENCAO, 'numero_os': 'OS-2'})
+        self.assertEqual(Manutencao.objects.count(), 2)
+        self.assertEqual(Manutencao.objects.get(veiculo=self.a).numero_os, 'OS-2')
+        self.assertEqual(self.a.eventos.latest('pk').tipo, EventoStatus.ATUALIZACAO_MANUTENCAO)
+
+        self.assertEqual(self.em_massa('concluir_manutencao', [self.a, self.b, self.d]),
+                         ['2 veículo(s) atualizados com sucesso!', 'Status não permite a ação para: ABC0003.'])
+        self.assertEqual(self.em_massa('tornar_disponivel', [self.c, self.d]),
+                         ['1 veículo(s) atualizados com sucesso!', 'Status não permite a ação para: ABC0003.'])
+        self.assertEqual(set(self.status().values()), {'Disponível'})
+        self.assertFalse(Manutencao.objects.exists() or Indisponibilidade.objects.exists())
+        self.assertEqual(PainelVeiculo.objects.filter(status='Disponível').count(), 4)
+
+    def test_acao_individual_repetida_mostra_erro(self):
+        self.mensagens(reverse('gerenciar_manutencao', args=[self.a.pk]), self.MANUTENCAO)
+        self.assertEqual(self.mensagens(reverse('concluir_manutencao', args=[self.a.pk])),
+                         ['Manutenção do veículo ABC0000 concluída.'])
+        self.assertEqual(self.mensagens(reverse('concluir_manutencao', args=[self.a.pk])),
+                         ['O veículo ABC0000 não está em manutenção.'])
+        self.assertEqual(self.mensagens(reverse('tornar_disponivel', args=[self.a.pk])),
+                         ['O veículo ABC0000 não está indisponível.'])
+        self.assertEqual(self.a.eventos.count(), 2)
+
+    def test_status_alterado_por_outro_usuario_e_ignorado(self):
+        # O formulário foi aberto com o veículo disponível, mas outro usuário o mandou para manutenção
+        desatualizado = Veiculo.objects.get(pk=self.a.pk)
+        transicoes.enviar_para_manutencao([self.a.pk], {**self.MANUTENCAO, 'data_entrada': timezone.localdate()})
+        with mock.patch('frota.views.get_object_or_404', return_value=desatualizado):
+            mensagens = self.mensagens(reverse('gerenciar_indisponibilidade', args=[self.a.pk]), {'motivo': 'Sem motorista'})
+        self.assertEqual(mensagens, ['O veículo está em manutenção. Finalize a manutenção primeiro.'])
+        self.assertEqual(self.status()['ABC0000'], 'Em Manutenção')
+        self.assertFalse(Indisponibilidade.objects.exists())
+
+
+class ConsolidarIndicadoresTests(CatalogoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.veiculos = [cls.criar_veiculo(f'ABC{i:04d}') for i in range(4)]
+        Veiculo.objects.update(criado_em=timezone.now() - timedelta(days=30))
+
+    def retroagir(self, tipo, dias):
+        EventoStatus.objects.filter(tipo=tipo).update(data_hora=timezone.now() - timedelta(days=dias))
+
+    def test_reconstroi_dias_passados_e_so_processa_dias_novos(self):
+        hoje = timezone.localdate()
+        ids = [v.pk for v in self.veiculos[:2]]
+        transicoes.enviar_para_manutencao(ids, {
+            'servicos': 'Revisão', 'nome_oficina': 'Oficina A', 'cidade_oficina': 'Teresina', 'numero_os': '1',
+            'status_os': 'N/A', 'data_entrada': hoje - timedelta(days=3), 'data_previsao_saida': hoje - timedelta(days=2),
+        })
+        self.retroagir(EventoStatus.ENTRADA_MANUTENCAO, 3)
+        transicoes.concluir_manutencoes(ids[:1])
+        self.retroagir(EventoStatus.SAIDA_MANUTENCAO, 1)
+
+        call_command('consolidar_indicadores', desde=str(hoje - timedelta(days=4)), stdout=StringIO())
+        em_manutencao = dict(IndicadorDiario.objects.values_list('data', 'em_manutencao'))
+        self.assertEqual(em_manutencao, {
+            hoje - timedelta(days=4): 0, hoje - timedelta(days=3): 2,
+            hoje - timedelta(days=2): 2, hoje - timedelta(days=1): 1,
+        })
+        oficina = IndicadorOficinaDiario.objects.get()
+        self.assertEqual((oficina.concluidas, oficina.dias_em_manutencao, oficina.previsoes_descumpridas), (1, 2, 1))
+
+        # Uma segunda execução no mesmo dia não tem nada a fazer
+        call_command('consolidar_indicadores', stdout=StringIO())
+        self.assertEqual(IndicadorDiario.objects.count(), 4)
+
+    def test_veiculo_so_conta_a_partir_do_cadastro(self):
+        hoje = timezone.localdate()
+        Veiculo.objects.filter(pk=self.veiculos[0].pk).update(criado_em=timezone.now() - timedelta(days=2))
+        Veiculo.objects.filter(pk=self.veiculos[1].pk).update(criado_em=None)  # cadastrado antes do campo existir
+
+        call_command('consolidar_indicadores', desde=str(hoje - timedelta(days=3)), stdout=StringIO())
+        total = dict(IndicadorDiario.objects.values_list('data', 'total'))
+        self.assertEqual(total, {hoje - timedelta(days=3): 3, hoje - timedelta(days=2): 4, hoje - timedelta(days=1): 4})
+
+
+class PainelVeiculoTests(CatalogoTestCase):
+    """A cópia da frota lida pela página inicial acompanha cada gravação do painel."""
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+        self.client.post(reverse('gerenciar_veiculos'), {
+            'placa': 'ABC1234', 'modelo': self.modelo.pk, 'tipo_veiculo': 'LEVE', 'segmento': 'LT',
+            'regional': self.regional.pk, 'departamento': self.departamento.pk,
+        })
+        self.veiculo = Veiculo.objects.get(placa='ABC1234')
+
+    def test_acompanha_status_e_catalogo(self):
+        self.assertEqual(PainelVeiculo.objects.get().status, 'Disponível')
+
+        self.client.post(reverse('gerenciar_indisponibilidade', args=[self.veiculo.pk]), {'motivo': 'Sem motorista'})
+        self.client.post(reverse('editar_regional', args=[self.regional.pk]), {'nome': 'Teresina', 'sigla': 'TSA'})
+        linha = PainelVeiculo.objects.get()
+        self.assertEqual((linha.status, linha.motivo, linha.regional_sigla), ('Indisponível', 'Sem motorista', 'TSA'))
+
+        self.client.post(reverse('tornar_disponivel', args=[self.veiculo.pk]))
+        linha = PainelVeiculo.objects.get()
+        self.assertEqual((linha.status, linha.motivo), ('Disponível', ''))
+
+        self.client.post(reverse('excluir_veiculo', args=[self.veiculo.pk]))
+        self.assertFalse(PainelVeiculo.objects.exists())
+
+    def test_reconstruir_painel(self):
+        PainelVeiculo.objects.all().delete()
+        call_command('reconstruir_painel', stdout=StringIO())
+        self.assertEqual(PainelVeiculo.objects.get().placa, 'ABC1234')
+
+
+@override_settings(FROTA_VERSAO_TTL=0)
+class MudancasPainelTests(CatalogoTestCase):
+    """Atualização ao vivo da página inicial pelo polling "mudanças desde a versão N"."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.veiculos = [cls.criar_veiculo(f'ABC{i:04d}') for i in range(3)]
+        with cls.captureOnCommitCallbacks(execute=True):
+            call_command('reconstruir_painel', stdout=StringIO())
+
+    def setUp(self):
+        # Com réplica configurada, a conexão dela não enxerga a transação do TestCase
+        self.client.cookies[roteador.COOKIE_PRINCIPAL] = '1'
+
+    def mudancas(self, **params):
+        response = self.client.get(reverse('mudancas_painel'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_so_as_linhas_alteradas(self):
+        versao = self.mudancas(desde=0)['versao']
+        self.assertEqual(self.mudancas(desde=versao)['linhas'], [])
+
+        alterado, excluido = self.veiculos[0], self.veiculos[1]
+        self.client.force_login(self.usuario)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('gerenciar_indisponibilidade', args=[alterado.pk]), {'motivo': 'Sem motorista'})
+            self.client.post(reverse('excluir_veiculo', args=[excluido.pk]))
+
+        dados = self.mudancas(desde=versao, status='Indisponível')
+        self.assertEqual([linha['id'] for linha in dados['linhas']], [alterado.pk])
+        self.assertIn('Sem motorista', dados['linhas'][0]['html'])
+        self.assertEqual(dados['removidos'], [excluido.pk])
+
+        # Quem filtra por disponíveis deve tirar o veículo da tela
+        dados = self.mudancas(desde=versao, status='Disponível')
+        self.assertEqual(dados['linhas'], [])
+        self.assertEqual(dados['removidos'], [alterado.pk, excluido.pk])
+
+    @override_settings(FROTA_RETENCAO_REMOCOES=1)
+    def test_remocoes_antigas_apagadas_e_paginas_velhas_recarregam(self):
+        versao = self.mudancas(desde=0)['versao']
+        self.client.force_login(self.usuario)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('excluir_veiculo', args=[self.veiculos[1].pk]))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('gerenciar_indisponibilidade', args=[self.veiculos[0].pk]), {'motivo': 'Pneu'})
+
+        call_command('limpar_remocoes', stdout=StringIO())
+        self.assertFalse(RemocaoPainel.objects.exists())
+        # Quem ainda não viu a exclusão não teria como saber dela
+        self.assertTrue(self.mudancas(desde=versao)['recarregar'])
+        self.assertEqual([linha['id'] for linha in self.mudancas(desde=versao + 1)['linhas']], [self.veiculos[0].pk])
+
+    def test_desde_invalido_nao_leva_etag(self):
+        response = self.client.get(reverse('mudancas_painel'), {'desde': 'x'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    @override_settings(FROTA_MAX_MUDANCAS=1)
+    def test_muitas_mudancas_pede_recarga(self):
+        versao = self.mudancas(desde=0)['versao']
+        with self.captureOnCommitCallbacks(execute=True):
+            transicoes.marcar_indisponiveis([v.pk for v in self.veiculos], {'motivo': 'Enchente'})
+        self.assertTrue(self.mudancas(desde=versao)['recarregar'])
+
+
+class ObservadorVersaoTests(SimpleTestCase):
+    async def test_le_um_banco_fixo_fora_do_contexto_de_quem_comecou(self):
+        lidas = []
+
+        def ler(banco):
+            lidas.append((banco, roteador._usar_replica.get()))
+            return 7
+
+        # O primeiro ouvinte veio de um request roteado para a réplica
+        token = roteador._usar_replica.set(True)
+        try:
+            observador = ao_vivo.ObservadorVersao()
+            with mock.patch('frota.ao_vivo.versao_no_banco', ler):
+                async with observador.ouvir():
+                    self.assertEqual(await observador.aguardar(0, 5), 7)
+        finally:
+            roteador._usar_replica.reset(token)
+        self.assertEqual(lidas[0], (ao_vivo.BANCO_EVENTOS, False))
+
+
+class VersaoDadosTests(TestCase):
+    @override_settings(FROTA_VERSAO_TTL=60)
+    def test_leitura_em_cache_e_escrita_depois_do_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_atualizacao()
+        versao = versao_dados()
+
+        # Dentro do TTL a versão vem do processo, sem consulta
+        with self.assertNumQueries(0):
+            self.assertEqual(versao_dados(), versao)
+
+        # O incremento espera o commit e então é um único UPDATE ... RETURNING
+        with self.captureOnCommitCallbacks() as callbacks:
+            registrar_atualizacao()
+        self.assertEqual(versao_dados(), versao)
+        with self.assertNumQueries(1):
+            callbacks[0]()
+        with self.assertNumQueries(0):
+            self.assertEqual(versao_dados(), versao + 1)
+
+
+class RoteadorReplicaTests(SimpleTestCase):
+    def test_so_anonimos_sem_cookie_e_em_leitura_vao_para_a_replica(self):
+        fabrica = RequestFactory()
+        self.assertTrue(roteador.deve_usar_replica(fabrica.get('/frota/')))
+        self.assertFalse(roteador.deve_usar_replica(fabrica.post('/frota/login/')))
+
+        com_sessao = fabrica.get('/frota/')
+        com_sessao.COOKIES[settings.SESSION_COOKIE_NAME] = 'abc'
+        self.assertFalse(roteador.deve_usar_replica(com_sessao))
+
+        fixado = fabrica.get('/frota/')
+        fixado.COOKIES[roteador.COOKIE_PRINCIPAL] = '1'
+        self.assertFalse(roteador.deve_usar_replica(fixado))
+
+    def test_escritas_sempre_no_principal(self):
+        def rotas():
+            roteador._usar_replica.set(True)
+            return rota.db_for_read(Veiculo), rota.db_for_write(Veiculo)
+
+        rota = roteador.RoteadorReplica()
+        self.assertEqual(rota.db_for_read(Veiculo), 'default')
+        self.assertEqual(copy_context().run(rotas), (roteador.REPLICA, 'default'))
+        self.assertFalse(rota.allow_migrate(roteador.REPLICA, 'frota'))
+
+
+@override_settings(FROTA_VERSAO_TTL=60)
+class ReplicaAtrasadaTests(CatalogoTestCase):
+    """Leituras da réplica montam as chaves de cache com a versão da réplica, não com a do principal."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.veiculo = cls.criar_veiculo('ABC1234')
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconstruir_painel', stdout=StringIO())
+            registrar_atualizacao()
+
+    def na_replica(self, url):
+        # A réplica do teste é o próprio banco: o que a torna atrasada é a versão que ela informa
+        versao_replica = lambda alias=None: frota_cache._estado_local(roteador.REPLICA)[0]
+        with (
+            mock.patch('frota.cache._alias_leitura', return_value=roteador.REPLICA),
+            mock.patch('frota.compacto.versao_no_banco', versao_replica),
+        ):
+            return self.client.get(url)
+
+    def chave_index(self, versao):
+        request = RequestFactory().get(reverse('index'))
+        request._frota_estado = (versao, None, 0)
+        return chave_pagina('index', request, CAMPOS_FILTRO_INDEX + CAMPOS_PAGINACAO)
+
+    def test_escrita_no_principal_nao_vaza_dados_velhos_para_a_versao_nova(self):
+        antiga = versao_dados()
+        frota_cache._guardar_estado_local(frota_cache._estado_dados(), roteador.REPLICA)
+        self.assertContains(self.na_replica(reverse('index')), 'ABC1234')
+
+        admin = self.client_class()
+        admin.force_login(self.usuario)
+        with self.captureOnCommitCallbacks(execute=True):
+            admin.post(reverse('excluir_veiculo', args=[self.veiculo.pk]))
+        nova = versao_dados()
+        self.assertEqual(nova, antiga + 1)
+
+        # A réplica ainda não recebeu a escrita: continua servindo (e guardando) a versão antiga
+        self.assertContains(self.na_replica(reverse('index')), 'ABC1234')
+        response = self.na_replica(reverse('frota_compacta'))
+        self.assertEqual(response['Location'], reverse('frota_compacta_versao', args=[antiga]))
+        self.na_replica(response['Location'])
+        self.assertIsNotNone(cache.get(f'frota:compacto:v{antiga}'))
+
+        self.assertIsNone(cache.get(self.chave_index(nova)))
+        self.assertIsNone(cache.get(f'frota:compacto:v{nova}'))
+
+        # Quem lê do principal já vê a versão nova
+        self.assertNotContains(self.client.get(reverse('index'), headers={'Cookie': f'{roteador.COOKIE_PRINCIPAL}=1'}), 'ABC1234')
+
+
+@skipUnless(roteador.REPLICA in settings.DATABASES, 'Defina DATABASE_REPLICA_URL para testar com réplica.')
+class ReplicaIntegracaoTests(TransactionTestCase):
+    # A réplica de teste espelha o banco principal, mas é outra conexão: só enxerga
+    # o que foi confirmado, por isso aqui não dá para usar a transação do TestCase.
+    databases = '__all__'
+
+    def setUp(self):
+        User.objects.create_user('admin', password='senha')
+
+    def consultas(self, alias, metodo, url, **dados):
+        with CaptureQueriesContext(connections[alias]) as consultas:
+            response = getattr(self.client, metodo)(url, dados)
+        self.assertLess(response.status_code, 400)
+        return len(consultas)
+
+    def test_fixa_no_principal_depois_de_um_post(self):
+        self.assertGreater(self.consultas(roteador.REPLICA, 'get', reverse('index')), 0)
+
+        self.client.post(reverse('login'), {'username': 'admin', 'password': 'errada'})
+        self.assertIn(roteador.COOKIE_PRINCIPAL, self.client.cookies)
+        self.assertEqual(self.consultas(roteador.REPLICA, 'get', reverse('index'), placa='X'), 0)
+
+
+class PerfilMiddlewareTests(CatalogoTestCase):
+    @override_settings(FROTA_PERFIL_AMOSTRAGEM=1)
+    def test_mede_consultas_e_renderizacao(self):
+        self.client.force_login(self.usuario)
+        with self.assertLogs('pweb.perfil', 'INFO') as logs:
+            response = self.client.get(reverse('gerenciar_veiculos'))
+
+        resumo = json.loads(logs.records[0].getMessage())
+        self.assertEqual(resumo['view'], 'gerenciar_veiculos')
+        self.assertGreater(resumo['consultas'], 0)
+        self.assertGreater(resumo['render_ms'], 0)
+        self.assertEqual(resumo['bytes'], len(response.content))
+        self.assertIn(f'desc="{resumo["consultas"]} consultas"', response['Server-Timing'])
+
+    @override_settings(FROTA_PERFIL_AMOSTRAGEM=1, FROTA_PERFIL_REPETICOES=3)
+    def test_aponta_consultas_repetidas(self):
+        def view(request):
+            for _ in range(3):
+                list(Regional.objects.filter(pk=self.regional.pk))
+            return HttpResponse('ok')
+
+        middleware = perfil.PerfilMiddleware(view)
+        with self.assertLogs('pweb.perfil', 'WARNING') as logs:
+            middleware(RequestFactory().get('/'))
+
+        resumo = logs.records[0].perfil
+        self.assertEqual(resumo['duplicadas'], 2)
+        self.assertEqual(resumo['repetidas'][0]['vezes'], 3)
+
+    @override_settings(FROTA_PERFIL_AMOSTRAGEM=1)
+    def test_renderizacao_medida_sem_o_resto_da_view(self):
+        def view(request):
+            html = engines['django'].from_string('{% for i in itens %}{{ i }}{% endfor %}').render({'itens': range(10)})
+            time.sleep(0.05)
+            return HttpResponse(html)
+
+        render_antes = Template._render
+        middleware = perfil.PerfilMiddleware(view)
+        with self.assertLogs('pweb.perfil', 'INFO') as logs:
+            middleware(RequestFactory().get('/'))
+
+        resumo = logs.records[0].perfil
+        self.assertGreater(resumo['render_ms'], 0)
+        self.assertLess(resumo['render_ms'], 50)
+        self.assertGreaterEqual(resumo['total_ms'], 50)
+        # Nada do Django é trocado no processo
+        self.assertIs(Template._render, render_antes)
+
+    @override_settings(FROTA_PERFIL_AMOSTRAGEM=1)
+    async def test_conta_consultas_das_threads_sob_asgi(self):
+        def contar():
+            # Tabela sem escrita no teste: a conexão da outra thread não espera a transação dele
+            try:
+                return IndicadorDiario.objects.count()
+            finally:
+                connection.close()
+
+        async def view(request):
+            # Thread nova, com conexão própria, como as do sync_to_async sob ASGI
+            await sync_to_async(contar, thread_sensitive=False)()
+            return HttpResponse('ok')
+
+        middleware = perfil.PerfilMiddleware(view)
+        with self.assertLogs('pweb.perfil', 'INFO') as logs:
+            response = await middleware(RequestFactory().get('/'))
+
+        self.assertEqual(logs.records[0].perfil['consultas'], 1)
+        self.assertIn('desc="1 consultas"', response['Server-Timing'])
+
+    def test_desligado_nao_entra_na_pilha(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            perfil.PerfilMiddleware(lambda request: HttpResponse())
+        self.assertNotIn('Server-Timing', self.client.get(reverse('login')))
+
+
+class FrotaSinteticaTests(TestCase):
+    def test_gera_frota_proporcional_com_painel_e_historico(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resultado = gerar_frota(300, taxa_manutencao=0.2, taxa_indisponivel=0.1, semente=7)
+
+        self.assertEqual(Veiculo.objects.count(), 300)
+        self.assertEqual(PainelVeiculo.objects.filter(versao__isnull=False).count(), 300)
+        self.assertEqual(Manutencao.objects.count(), resultado.em_manutencao)
+        self.assertEqual(Veiculo.objects.filter(status='Indisponível').count(), resultado.indisponiveis)
+        self.assertEqual(EventoStatus.objects.count(), resultado.em_manutencao + resultado.indisponiveis)
+        self.assertGreater(resultado.em_manutencao, resultado.indisponiveis)
+        self.assertEqual(Regional.objects.count(), 3)
+
+        # Rodar de novo acrescenta veículos e reaproveita o catálogo
+        gerar_frota(50, semente=7)
+        self.assertEqual(Veiculo.objects.count(), 350)
+        self.assertEqual(Regional.objects.count(), 3)
+
+    def test_benchmark_grava_json_e_compara(self):
+        gerar_frota(100, semente=1)
+        with NamedTemporaryFile(suffix='.json') as arquivo:
+            call_command('benchmark_frota', '--banco-atual', '--repeticoes', '1', '--lote', '2',
+                         '--saida', arquivo.name, stdout=StringIO(), stderr=StringIO())
+            resultado = json.load(arquivo)
+            casos = resultado['frotas']['atual']['casos']
+            self.assertGreater(casos['index?status']['consultas'], 0)
+            self.assertIn('tornar_disponiveis[2]', casos)
+
+            # Uma consulta a mais em qualquer caso é regressão
+            casos['index']['consultas'] -= 1
+            arquivo.seek(0)
+            arquivo.truncate()
+            arquivo.write(json.dumps(resultado).encode())
+            arquivo.flush()
+            with self.assertRaisesMessage(CommandError, 'Desempenho pior'):
+                call_command('benchmark_frota', '--banco-atual', '--repeticoes', '1', '--lote', '2',
+                             '--comparar', arquivo.name, '--estrito', stdout=StringIO(), stderr=StringIO())
+        # O benchmark desfaz tudo o que gravou
+        self.assertFalse(User.objects.filter(username='benchmark-frota').exists())
+        self.assertFalse(EventoStatus.objects.filter(servicos='Benchmark').exists())
+
+
+class BuscaTextualTests(CatalogoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        modelo = ModeloVeiculo.objects.create(nome='Hilux')
+        cls.veiculos = [cls.criar_veiculo(f'PIA{i:04d}', prefixo=f'H{i:03d}', modelo=modelo) for i in range(3)]
+        ids = [v.pk for v in cls.veiculos]
+        painel.sincronizar_veiculos(ids)
+        transicoes.enviar_para_manutencao(ids[:1], {
+            'servicos': 'Troca das pastilhas de freio e revisão', 'nome_oficina': 'Auto Center Teresina',
+            'cidade_oficina': 'Teresina', 'data_entrada': timezone.localdate(),
+            'data_previsao_saida': None, 'numero_os': 'OS-991', 'status_os': 'N/A',
+        })
+        transicoes.marcar_indisponiveis(ids[1:2], {'motivo': 'Aguardando motorista em Teresina'})
+
+    def placas(self, resultados):
+        return [resultado.placa for resultado in resultados]
+
+    def test_busca_texto_livre_sem_acento_e_por_prefixo(self):
+        self.assertEqual(self.placas(busca.buscar_frota('pastilha freio')), ['PIA0000'])
+        self.assertEqual(self.placas(busca.buscar_frota('revisao')), ['PIA0000'])
+        self.assertEqual(self.placas(busca.buscar_frota('aguardando MOTORISTA')), ['PIA0001'])
+        self.assertEqual(sorted(self.placas(busca.buscar_frota('pia000'))), ['PIA0000', 'PIA0001', 'PIA0002'])
+        self.assertEqual(self.placas(busca.buscar_frota('os 991')), ['PIA0000'])
+        self.assertEqual(busca.buscar_frota('"); DROP TABLE --'), [])
+
+    def test_relevancia_prefere_oficina_a_texto_livre(self):
+        # Teresina é a cidade da oficina de um e só aparece no motivo do outro
+        self.assertEqual(self.placas(busca.buscar_frota('teresina')), ['PIA0000', 'PIA0001'])
+
+    def test_indice_acompanha_as_transicoes_e_guarda_o_historico(self):
+        transicoes.concluir_manutencoes([self.veiculos[0].pk])
+        self.assertEqual(busca.buscar_frota('freio'), [])
+        historico = busca.buscar_historico('freio')
+        self.assertEqual([e.tipo for e in historico].count(EventoStatus.SAIDA_MANUTENCAO), 1)
+        self.assertEqual(len(historico), 2)
+
+    def test_pagina_de_busca(self):
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('buscar'), {'q': 'freio'})
+        self.assertContains(response, 'PIA0000')
+        self.assertContains(response, 'Entrada em manutenção')
+
+
+@override_settings(FROTA_VERSAO_TTL=0, FROTA_MODAIS_SOB_DEMANDA=False)
+class OpcoesCatalogoTests(CatalogoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.outra_regional = Regional.objects.create(nome='Picos', sigla='PIC')
+        cls.veiculo = cls.criar_veiculo('OPC0001')
+
+    def setUp(self):
+        # As listas ficam no processo; cada teste começa do catálogo do seu banco
+        opcoes._listas.clear()
+        self.client.force_login(self.usuario)
+
+    def consultas_catalogo(self, url):
+        with CaptureQueriesContext(connection) as capturadas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        catalogo = ('FROM "frota_modeloveiculo"', 'FROM "frota_regional"', 'FROM "frota_departamento"')
+        return response, [c['sql'] for c in capturadas if any(tabela in c['sql'] for tabela in catalogo)]
+
+    def test_listas_montadas_uma_vez_por_versao_do_catalogo(self):
+        self.consultas_catalogo(reverse('gerenciar_veiculos'))
+        response, consultas = self.consultas_catalogo(reverse('gerenciar_veiculos'))
+        self.assertEqual(consultas, [])
+        self.assertContains(response, f'<option value="{self.regional.pk}" selected>THE - Teresina</option>')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('editar_regional', args=[self.regional.pk]), {'nome': 'Teresina', 'sigla': 'TER'})
+        response, consultas = self.consultas_catalogo(reverse('gerenciar_veiculos'))
+        self.assertTrue(consultas)
+        self.assertContains(response, f'<option value="{self.regional.pk}" selected>TER - Teresina</option>')
+        self.assertNotContains(response, 'THE - Teresina')
+
+    def test_filtro_da_pagina_inicial_marca_a_selecao(self):
+        self.client.logout()
+        response = self.client.get(reverse('index'), {'regional': self.outra_regional.pk})
+        self.assertContains(response, f'<option value="{self.outra_regional.pk}" selected>PIC</option>')
+        self.assertContains(response, f'<option value="{self.regional.pk}">THE</option>')
+
+
+class ScriptsEstaticosTests(SimpleTestCase):
+    def test_url_leva_o_hash_do_conteudo(self):
+        arquivo = finders.find('frota/js/painel_cliente.js')
+        conteudo = hashlib.md5(Path(arquivo).read_bytes(), usedforsecurity=False).hexdigest()[:12]
+        self.assertEqual(static_versionado('frota/js/painel_cliente.js'), f'/static/frota/js/painel_cliente.js?v={conteudo}')
+        self.assertEqual(static_versionado('frota/js/nao_existe.js'), '/static/frota/js/nao_existe.js')
+
+    def test_copia_do_staticfiles_esta_atualizada(self):
+        # A Vercel serve o staticfiles/ do repositório: rode o collectstatic ao mudar o script
+        origem = Path(finders.find('frota/js/painel_cliente.js'))
+        self.assertEqual((Path(settings.STATIC_ROOT) / 'frota/js/painel_cliente.js').read_bytes(), origem.read_bytes())
+
+
+class PublicacaoEstaticaTests(CatalogoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.veiculo = cls.criar_veiculo('PUB0001', prefixo='PUB01')
+        painel.sincronizar_veiculos([cls.veiculo.pk])
+
+    def setUp(self):
+        pasta = TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.pasta = Path(pasta.name)
+        configuracao = override_settings(
+            FROTA_PUBLICACAO=True, FROTA_PUBLICACAO_DIR=pasta.name, FROTA_PUBLICACAO_URL='/publico/', FROTA_VERSAO_TTL=0,
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def alterar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_atualizacao(painel=True)
+        return versao_dados()
+
+    def publicar(self, *args):
+        saida = StringIO()
+        call_command('publicar_painel', *args, stdout=saida)
+        return saida.getvalue()
+
+    def test_comando_publica_pagina_e_dados(self):
+        versao = self.alterar()
+        # A alteração não publica nada no request de quem alterou
+        self.assertFalse((self.pasta / 'versao.json').exists())
+
+        self.assertIn(f'versão {versao}', self.publicar())
+        ponteiro = json.loads((self.pasta / 'versao.json').read_text())
+        self.assertEqual(ponteiro, {'versao': versao, 'dados': f'/publico/veiculos.{versao}.json'})
+
+        dados = json.loads((self.pasta / f'veiculos.{versao}.json').read_text())
+        self.assertEqual(dados['versao'], versao)
+        self.assertEqual(dados['colunas']['placa'], ['PUB0001'])
+
+        pagina = (self.pasta / 'index.html').read_text()
+        self.assertIn('data-modo="estatico"', pagina)
+        self.assertIn(f'data-url-frota="/publico/veiculos.{versao}.json"', pagina)
+        self.assertIn('PUB0001', pagina)
+        # O script do painel vem do arquivo estático versionado, não embutido na página
+        self.assertIn('<script src="/static/frota/js/painel_cliente.js?v=', pagina)
+        self.assertNotIn('IGUAIS', pagina)
+        # Gravados por os.replace, sem temporários sobrando
+        self.assertEqual(list(self.pasta.glob('.*')), [])
+
+        self.assertIn('já está publicado', self.publicar())
+
+    def test_mantem_so_as_ultimas_versoes(self):
+        versoes = []
+        for _ in range(publicacao.MANTER_VERSOES + 2):
+            versoes.append(self.alterar())
+            self.publicar()
+        arquivos = sorted(arquivo.name for arquivo in self.pasta.glob('veiculos.*.json'))
+        self.assertEqual(arquivos, sorted(f'veiculos.{v}.json' for v in versoes[-publicacao.MANTER_VERSOES:]))
+
+    def test_nao_volta_para_uma_versao_mais_velha(self):
+        versao = self.alterar()
+        # Outro publicador já gravou uma versão mais nova
+        (self.pasta / 'versao.json').write_text(json.dumps({'versao': versao + 1, 'dados': 'outro'}))
+        self.assertEqual(publicacao.publicar(), versao + 1)
+        self.assertEqual(json.loads((self.pasta / 'versao.json').read_text())['dados'], 'outro')
+        self.assertFalse((self.pasta / f'veiculos.{versao}.json').exists())
+
+    def test_alteracao_durante_a_renderizacao_gera_tudo_de_novo(self):
+        self.alterar()
+        gerar_pagina = publicacao.gerar_pagina
+        nova = []
+
+        def alterar_no_meio(urls):
+            if not nova:
+                nova.append(self.alterar())
+            return gerar_pagina(urls)
+
+        with mock.patch('frota.publicacao.gerar_pagina', alterar_no_meio):
+            versao = publicacao.publicar()
+        self.assertEqual(versao, nova[0])
+        self.assertEqual(json.loads((self.pasta / 'versao.json').read_text())['versao'], versao)
+        self.assertIn(f'data-url-frota="/publico/veiculos.{versao}.json"', (self.pasta / 'index.html').read_text())
+
+    def test_anonimos_vao_para_a_pagina_publicada_servida_pelo_django(self):
+        versao = self.alterar()
+        self.publicar()
+        with override_settings(ROOT_URLCONF=carregar_urls()):
+            response = self.client.get('/', {'status': 'Disponível'})
+            self.assertRedirects(response, '/publico/index.html?status=Dispon%C3%ADvel', fetch_redirect_response=False)
+
+            response = self.client.get('/publico/index.html')
+            self.assertIn('PUB0001', b''.join(response.streaming_content).decode())
+            self.assertIn('s-maxage', response['Cache-Control'])
+            response = self.client.get(f'/publico/veiculos.{versao}.json')
+            self.assertEqual(json.loads(b''.join(response.streaming_content))['versao'], versao)
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertEqual(self.client.get('/publico/db.sqlite3').status_code, 404)
+
+            # Quem está logado continua na página do Django
+            self.client.force_login(self.usuario)
+            self.assertEqual(self.client.get('/').status_code, 200)
+
+
+def carregar_urls():
+    """pweb/urls.py como fica com os settings atuais: ele os lê quando é importado."""
+    especificacao = importlib.util.find_spec('pweb.urls')
+    urls = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(urls)
+    return urls
+
+
+@override_settings(FROTA_VERSAO_TTL=0)
+class FrotaCompactaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            gerar_frota(40, taxa_manutencao=0.25, taxa_indisponivel=0.25, semente=5)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_colunas_decodificadas_batem_com_o_painel(self):
+        dados = json.loads(compacto.gerar(versao_dados()))
+        colunas, dicionarios = dados['colunas'], dados['dicionarios']
+        detalhes = {linha[0]: dict(zip(dados['detalhes']['campos'], linha[1:])) for linha in dados['detalhes']['linhas']}
+
+        painel_ordenado = list(PainelVeiculo.objects.order_by(*ORDEM))
+        self.assertEqual(colunas['id'], [linha.pk for linha in painel_ordenado])
+        for posicao, linha in enumerate(painel_ordenado):
+            self.assertEqual(dicionarios['status'][colunas['status'][posicao]], linha.status)
+            self.assertEqual(dicionarios['modelo'][colunas['modelo'][posicao]], linha.modelo)
+            self.assertEqual(dicionarios['regional'][colunas['regional'][posicao]], [linha.regional_id, linha.regional_sigla])
+            # Só quem está em manutenção ou indisponível leva os detalhes
+            if linha.status == 'Disponível':
+                self.assertNotIn(posicao, detalhes)
+            else:
+                self.assertEqual(detalhes[posicao]['numero_os'], linha.numero_os)
+                self.assertEqual(detalhes[posicao]['motivo'], linha.motivo)
+        self.assertEqual(len(dicionarios['regional']), Regional.objects.count())
+
+    def test_url_da_versao_atual_comprimida_e_imutavel(self):
+        response = self.client.get(reverse('frota_compacta'))
+        versao = versao_dados()
+        self.assertRedirects(response, reverse('frota_compacta_versao', args=[versao]), fetch_redirect_response=False)
+
+        response = self.client.get(reverse('frota_compacta_versao', args=[versao]), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['versao'], versao)
+
+        # Versão antiga manda para a atual
+        response = self.client.get(reverse('frota_compacta_versao', args=[versao - 1]))
+        self.assertRedirects(response, reverse('frota_compacta_versao', args=[versao]), fetch_redirect_response=False)
+
+    def test_versao_mudou_durante_a_leitura_nao_fica_imutavel(self):
+        versao = versao_dados()
+        # Outra alteração chega ao banco enquanto a frota é lida
+        with mock.patch('frota.compacto.versao_no_banco', return_value=versao + 1):
+            response = self.client.get(reverse('frota_compacta_versao', args=[versao]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIsNone(cache.get(f'frota:compacto:v{versao}'))
+
+        response = self.client.get(reverse('frota_compacta_versao', args=[versao]))
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIsNotNone(cache.get(f'frota:compacto:v{versao}'))
+
+
+class UrlsAsgi:
+    """URLs como ficam sob ASGI (FROTA_ASGI): as leituras de frota.assincrono antes das síncronas."""
+    urlpatterns = [path('frota/', include(frota_urls.rotas_assincronas + frota_urls.urlpatterns))]
+
+
+@override_settings(FROTA_VERSAO_TTL=0)
+class ViewsAssincronasTests(TestCase):
+    """As views de frota.assincrono devem responder o mesmo que as síncronas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('admin', password='senha')
+        with cls.captureOnCommitCallbacks(execute=True):
+            gerar_frota(30, taxa_manutencao=0.3, semente=3)
+
+    def setUp(self):
+        cache.clear()
+        opcoes._listas.clear()
+        self.client.cookies[roteador.COOKIE_PRINCIPAL] = '1'
+        self.async_client = AsyncClient()
+        self.async_client.cookies[roteador.COOKIE_PRINCIPAL] = '1'
+
+    async def get_async(self, nome, params=None, headers=None):
+        with override_settings(ROOT_URLCONF=UrlsAsgi):
+            return await self.async_client.get(reverse(nome), params, headers=headers)
+
+    async def test_index_igual_ao_sincrono(self):
+        params = {'status': 'Em Manutenção', 'por_pagina': 5}
+        sincrona = await sync_to_async(self.client.get)(reverse('index'), params)
+        await cache.aclear()
+        opcoes._listas.clear()
+
+        response = await self.get_async('index', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, sincrona.content)
+        self.assertEqual(response['ETag'], sincrona['ETag'])
+
+        response = await self.get_async('index', params, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_index_usa_as_opcoes_que_carregou(self):
+        acarregar = opcoes.acarregar
+
+        async def outro_request_troca_a_versao(nomes, request):
+            carregadas = await acarregar(nomes, request)
+            for nome in nomes:
+                opcoes._listas[nome] = (-1, [], '')
+            return carregadas
+
+        # Consultar de novo no template seria SynchronousOnlyOperation dentro do loop
+        with mock.patch('frota.opcoes.acarregar', outro_request_troca_a_versao):
+            response = await self.get_async('index')
+        regional = await Regional.objects.order_by('sigla').afirst()
+        self.assertContains(response, f'<option value="{regional.pk}">{regional.sigla}</option>')
+
+    async def test_json_e_csv_iguais_aos_sincronos(self):
+        params = {'fields': 'id,placa,data_entrada,motivo'}
+        sincrona = await sync_to_async(self.client.get)(reverse('api_veiculos'), params)
+        response = await self.get_async('api_veiculos', params)
+        self.assertEqual(b''.join([parte async for parte in response]), await sync_to_async(b''.join)(sincrona.streaming_content))
+
+        await self.async_client.aforce_login(self.usuario)
+        await sync_to_async(self.client.force_login)(self.usuario)
+        sincrona = await sync_to_async(self.client.get)(reverse('exportar_veiculos'))
+        response = await self.get_async('exportar_veiculos')
+        self.assertEqual(b''.join([parte async for parte in response]), await sync_to_async(b''.join)(sincrona.streaming_content))
+
+    async def test_catalogo_lista_no_loop_e_cadastra_na_view_sincrona(self):
+        await self.async_client.aforce_login(self.usuario)
+        response = await self.get_async('gerenciar_regionais', {'pesquisa': 'SR00'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['regionais']), await Regional.objects.filter(sigla__startswith='SR00').acount())
+
+        with override_settings(ROOT_URLCONF=UrlsAsgi):
+            response = await self.async_client.post(reverse('gerenciar_modelos'), {'nome': 'Hilux Async'})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(await ModeloVeiculo.objects.filter(nome='Hilux Async').aexists())
+
+
+class UrlsProjetoTests(SimpleTestCase):
+    def test_frota_asgi_troca_a_view_da_pagina_inicial(self):
+        for asgi, view in ((False, views.index), (True, assincrono.index)):
+            with self.subTest(asgi=asgi), override_settings(FROTA_ASGI=asgi, FROTA_PUBLICACAO=False):
+                self.assertIs(resolve('/', carregar_urls()).func, view)
+
+    def test_publicacao_so_importada_quando_ligada(self):
+        with override_settings(FROTA_PUBLICACAO=False):
+            self.assertFalse(hasattr(carregar_urls(), 'publicacao'))
+
+
+class CargaFrotaTests(LiveServerTestCase):
+    """O comando carga_frota contra um servidor de verdade, com telão e administrador ao mesmo tempo."""
+
+    def setUp(self):
+        User.objects.create_user('carga', password='senha-carga')
+        gerar_frota(20, semente=2)
+
+    def test_mede_cada_endpoint_sem_erros(self):
+        eventos = EventoStatus.objects.count()
+        with NamedTemporaryFile(suffix='.json') as saida:
+            call_command(
+                'carga_frota', url=self.live_server_url, usuario='carga', senha='senha-carga',
+                concorrencias=[2], admins=0.5, transicoes=0.5, duracao=1.5, saida=saida.name, stdout=StringIO(),
+            )
+            etapa = json.loads(Path(saida.name).read_text())['etapas'][0]
+
+        self.assertEqual((etapa['concorrencia'], etapa['administradores']), (2, 1))
+        self.assertTrue({'index', 'gerenciar_veiculos'} <= set(etapa['endpoints']))
+        self.assertEqual(etapa['total']['erros'], 0)
+        # As transições passaram pelo CSRF e chegaram ao banco
+        self.assertGreater(EventoStatus.objects.count(), eventos)
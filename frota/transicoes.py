@@ -0,0 +1,134 @@
+# frota/transicoes.py
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import registrar_atualizacao
+from .models import EventoStatus, Indisponibilidade, Manutencao, Veiculo
+from .painel import sincronizar_veiculos
+
+CAMPOS_MANUTENCAO = ('servicos', 'nome_oficina', 'cidade_oficina', 'data_entrada',
+                     'data_previsao_saida', 'numero_os', 'status_os')
+
+
+class ResultadoTransicao:
+    def __init__(self, alterados, ignorados):
+        self.alterados = alterados  # placas dos veículos alterados
+        self.ignorados = ignorados  # placas dos veículos que não puderam ser alterados
+
+
+def _separar(veiculos, pode_alterar):
+    alterados, ignorados = [], []
+    for veiculo in veiculos:
+        (alterados if pode_alterar(veiculo) else ignorados).append(veiculo)
+    return alterados, ignorados
+
+
+def _evento(veiculo, tipo, status_novo, usuario, agora, **dados):
+    return EventoStatus(
+        veiculo=veiculo, placa=veiculo.placa, tipo=tipo, status_anterior=veiculo.status,
+        status_novo=status_novo, data_hora=agora, usuario=usuario, **dados,
+    )
+
+
+def _dados_manutencao(manutencao):
+    dados = {campo: getattr(manutencao, campo) for campo in CAMPOS_MANUTENCAO}
+    dados['nome_oficina'] = dados['nome_oficina'] or ''
+    dados['cidade_oficina'] = dados['cidade_oficina'] or ''
+    return dados
+
+
+def _concluir(alterados, ignorados, eventos):
+    if alterados:
+        EventoStatus.objects.bulk_create(eventos)
+        sincronizar_veiculos([v.pk for v in alterados])
+        registrar_atualizacao(painel=True)
+    return ResultadoTransicao([v.placa for v in alterados], [v.placa for v in ignorados])
+
+
+def _usuario(usuario):
+    return usuario if usuario is not None and usuario.is_authenticated else None
+
+
+@transaction.atomic
+def enviar_para_manutencao(ids, dados, usuario=None):
+    """
+    Coloca os veículos em manutenção com os mesmos dados (cleaned_data de um
+    ManutencaoForm). Veículos indisponíveis são ignorados, como na tela individual.
+    """
+    veiculos = Veiculo.objects.filter(pk__in=ids).select_for_update(of=('self',))
+    alterados, ignorados = _separar(veiculos, lambda v: v.status != 'Indisponível')
+    ids_alterados = [v.pk for v in alterados]
+
+    # Quem já está em manutenção tem o registro atualizado; os demais ganham um novo
+    existentes = set(Manutencao.objects.filter(veiculo_id__in=ids_alterados).values_list('veiculo_id', flat=True))
+    Manutencao.objects.filter(veiculo_id__in=existentes).update(**dados)
+    Manutencao.objects.bulk_create([
+        Manutencao(veiculo_id=pk, **dados) for pk in ids_alterados if pk not in existentes
+    ])
+    Veiculo.objects.filter(pk__in=ids_alterados).update(status='Em Manutenção')
+
+    agora, usuario = timezone.now(), _usuario(usuario)
+    dados_evento = _dados_manutencao(Manutencao(**dados))
+    eventos = [
+        _evento(v, EventoStatus.ATUALIZACAO_MANUTENCAO if v.pk in existentes else EventoStatus.ENTRADA_MANUTENCAO,
+                'Em Manutenção', usuario, agora, **dados_evento)
+        for v in alterados
+    ]
+    return _concluir(alterados, ignorados, eventos)
+
+
+@transaction.atomic
+def concluir_manutencoes(ids, usuario=None):
+    veiculos = Veiculo.objects.filter(pk__in=ids).select_related('manutencao').select_for_update(of=('self',))
+    alterados, ignorados = _separar(veiculos, lambda v: hasattr(v, 'manutencao'))
+    ids_alterados = [v.pk for v in alterados]
+
+    # O evento de saída leva os dados da manutenção que está sendo encerrada
+    agora, usuario = timezone.now(), _usuario(usuario)
+    eventos = [
+        _evento(v, EventoStatus.SAIDA_MANUTENCAO, 'Disponível', usuario, agora, **_dados_manutencao(v.manutencao))
+        for v in alterados
+    ]
+    Manutencao.objects.filter(veiculo_id__in=ids_alterados).delete()
+    Veiculo.objects.filter(pk__in=ids_alterados).update(status='Disponível')
+    return _concluir(alterados, ignorados, eventos)
+
+
+@transaction.atomic
+def marcar_indisponiveis(ids, dados, usuario=None):
+    """Marca os veículos como indisponíveis. Veículos em manutenção são ignorados."""
+    veiculos = Veiculo.objects.filter(pk__in=ids).select_for_update(of=('self',))
+    alterados, ignorados = _separar(veiculos, lambda v: v.status != 'Em Manutenção')
+    ids_alterados = [v.pk for v in alterados]
+
+    existentes = set(Indisponibilidade.objects.filter(veiculo_id__in=ids_alterados).values_list('veiculo_id', flat=True))
+    Indisponibilidade.objects.filter(veiculo_id__in=existentes).update(**dados)
+    Indisponibilidade.objects.bulk_create([
+        Indisponibilidade(veiculo_id=pk, **dados) for pk in ids_alterados if pk not in existentes
+    ])
+    Veiculo.objects.filter(pk__in=ids_alterados).update(status='Indisponível')
+
+    agora, usuario = timezone.now(), _usuario(usuario)
+    eventos = [
+        _evento(v, EventoStatus.ATUALIZACAO_INDISPONIBILIDADE if v.pk in existentes else EventoStatus.ENTRADA_INDISPONIBILIDADE,
+                'Indisponível', usuario, agora, motivo=dados['motivo'])
+        for v in alterados
+    ]
+    return _concluir(alterados, ignorados, eventos)
+
+
+@transaction.atomic
+def tornar_disponiveis(ids, usuario=None):
+    veiculos = Veiculo.objects.filter(pk__in=ids).select_related('indisponibilidade').select_for_update(of=('self',))
+    alterados, ignorados = _separar(veiculos, lambda v: hasattr(v, 'indisponibilidade'))
+    ids_alterados = [v.pk for v in alterados]
+
+    agora, usuario = timezone.now(), _usuario(usuario)
+    eventos = [
+        _evento(v, EventoStatus.SAIDA_INDISPONIBILIDADE, 'Disponível', usuario, agora, motivo=v.indisponibilidade.motivo)
+        for v in alterados
+    ]
+    Indisponibilidade.objects.filter(veiculo_id__in=ids_alterados).delete()
+    Veiculo.objects.filter(pk__in=ids_alterados).update(status='Disponível')
+    return _concluir(alterados, ignorados, eventos)
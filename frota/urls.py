@@ -1,12 +1,20 @@
 # frota/urls.py
 
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import ao_vivo, api, assincrono, views
 
 urlpatterns = [
     # Rotas Públicas
     path('', views.index, name='index'),
+
+    # API de leitura (JSON)
+    path('api/veiculos/', api.veiculos, name='api_veiculos'),
+    path('api/painel/mudancas/', ao_vivo.mudancas_painel, name='mudancas_painel'),
+    path('api/painel/eventos/', ao_vivo.eventos_painel, name='eventos_painel'),
+    path('api/painel/frota/', api.frota_compacta, name='frota_compacta'),
+    path('api/painel/frota/v<int:versao>/', api.frota_compacta, name='frota_compacta_versao'),
     
     # Autenticação
     path('login/', auth_views.LoginView.as_view(template_name='frota/login.html'), name='login'),
@@ -14,6 +22,8 @@ urlpatterns = [
     
     # Painel Admin
     path('painel/', views.admin_panel, name='admin_panel'),
+    path('painel/indicadores/', views.painel_indicadores, name='painel_indicadores'),
+    path('painel/busca/', views.buscar, name='buscar'),
     
     # Gerenciamento de Departamentos
     path('painel/departamentos/', views.gerenciar_departamentos, name='gerenciar_departamentos'),
@@ -22,14 +32,18 @@ urlpatterns = [
 
     # Gerenciamento de Veículos
     path('painel/veiculos/', views.gerenciar_veiculos, name='gerenciar_veiculos'),
+    path('painel/veiculos/exportar/', views.exportar_veiculos, name='exportar_veiculos'),
+    path('painel/veiculos/importar/', views.importar_veiculos, name='importar_veiculos'),
     path('painel/veiculos/editar/<int:id>/', views.editar_veiculo, name='editar_veiculo'),
     path('painel/veiculos/excluir/<int:id>/', views.excluir_veiculo, name='excluir_veiculo'),
+    path('painel/veiculos/formulario/<str:tipo>/<int:id>/', views.formulario_veiculo, name='formulario_veiculo'),
 
     # Ações de Status do Veículo
     path('painel/veiculos/manutencao/<int:id>/', views.gerenciar_manutencao, name='gerenciar_manutencao'),
     path('painel/veiculos/manutencao/concluir/<int:id>/', views.concluir_manutencao, name='concluir_manutencao'),
     path('painel/veiculos/indisponivel/<int:id>/', views.gerenciar_indisponibilidade, name='gerenciar_indisponibilidade'),
     path('painel/veiculos/indisponivel/concluir/<int:id>/', views.tornar_disponivel, name='tornar_disponivel'),
+    path('painel/veiculos/acao-em-massa/', views.acao_em_massa, name='acao_em_massa'),
 
     path('painel/modelos/', views.gerenciar_modelos, name='gerenciar_modelos'),
     path('painel/modelos/editar/<int:id>/', views.editar_modelo, name='editar_modelo'),
@@ -38,4 +52,21 @@ urlpatterns = [
     path('painel/regionais/', views.gerenciar_regionais, name='gerenciar_regionais'),
     path('painel/regionais/editar/<int:id>/', views.editar_regional, name='editar_regional'),
     path('painel/regionais/excluir/<int:id>/', views.excluir_regional, name='excluir_regional'),
-]
\ No newline at end of file
+]
+
+# Sob ASGI (pweb/asgi.py liga FROTA_ASGI) estas leituras usam as views de
+# frota.assincrono: mesmas URLs e nomes, resolvidas antes das síncronas acima.
+rotas_assincronas = [
+    path('', assincrono.index, name='index'),
+    path('api/veiculos/', assincrono.veiculos, name='api_veiculos'),
+    path('api/painel/mudancas/', assincrono.mudancas_painel, name='mudancas_painel'),
+    path('api/painel/frota/', assincrono.frota_compacta, name='frota_compacta'),
+    path('api/painel/frota/v<int:versao>/', assincrono.frota_compacta, name='frota_compacta_versao'),
+    path('painel/departamentos/', assincrono.gerenciar_departamentos, name='gerenciar_departamentos'),
+    path('painel/veiculos/exportar/', assincrono.exportar_veiculos, name='exportar_veiculos'),
+    path('painel/modelos/', assincrono.gerenciar_modelos, name='gerenciar_modelos'),
+    path('painel/regionais/', assincrono.gerenciar_regionais, name='gerenciar_regionais'),
+]
+
+if settings.FROTA_ASGI:
+    urlpatterns = rotas_assincronas + urlpatterns
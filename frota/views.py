@@ -1,94 +1,154 @@
 # frota/views.py
 
+import io
+from datetime import timedelta
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q
-from .models import Veiculo, Departamento, Manutencao, Indisponibilidade, UltimaAtualizacao
+from django.utils import timezone
+from .models import Veiculo, Departamento, Manutencao, Indisponibilidade
 from .forms import DepartamentoForm, VeiculoForm, ManutencaoForm, IndisponibilidadeForm
-from .forms import ModeloVeiculoForm, RegionalForm
-from .models import ModeloVeiculo, Regional
-
-# --- Funções Auxiliares ---
-def registrar_atualizacao():
-    """Cria ou atualiza o registro de última atualização."""
-    obj, created = UltimaAtualizacao.objects.get_or_create(pk=1)
-    if not created:
-        obj.save() # Força a atualização do campo auto_now
+from .forms import ModeloVeiculoForm, RegionalForm, ImportacaoVeiculosForm, FiltroIndicadoresForm
+from .models import ModeloVeiculo, PainelVeiculo, Regional
+from . import busca, importacao, indicadores, painel, transicoes
+from .exportacao import gerar_csv, gerar_xlsx
+from .cache import chave_pagina, obter_pagina, guardar_pagina, pagina_condicional, registrar_atualizacao
+from .cache import ultima_atualizacao, versao_dados
+from .filtros import CAMPOS_FILTRO_INDEX, filtrar_veiculos, filtros_invalidos
+from .paginacao import CAMPOS_PAGINACAO, paginar
+
+# Quantos erros de importação mostrar no painel (o restante só pelo manage.py)
+MAX_ERROS_IMPORTACAO = 20
 
 # --- Views Públicas ---
+@pagina_condicional
 def index(request):
     """
     Exibe a página inicial com a lista de veículos e os filtros de pesquisa.
+    Para visitantes anônimos a página renderizada fica em cache, com chave
+    baseada na versão dos dados e nos filtros da URL.
     """
-    # Pega todos os parâmetros de filtro da URL (GET request)
-    placa = request.GET.get('placa')
+    usar_cache = not request.user.is_authenticated
+    if usar_cache:
+        chave = chave_pagina('index', request, CAMPOS_FILTRO_INDEX + CAMPOS_PAGINACAO)
+        conteudo = obter_pagina(chave)
+        if conteudo is not None:
+            return HttpResponse(conteudo)
+
+    context = contexto_index(request)
+    response = render(request, 'frota/index.html', context)
+    if usar_cache:
+        guardar_pagina(chave, response.content)
+    return response
+
+def consulta_index(request):
+    """Veículos da página inicial com os filtros da URL, os parâmetros e a chave do total, para paginar()."""
+    # Lê a cópia desnormalizada da frota (PainelVeiculo): uma tabela, sem JOINs
+    veiculos = filtrar_veiculos(PainelVeiculo.objects.all(), request.GET)
+    return veiculos, request.GET, chave_pagina('total-index', request, CAMPOS_FILTRO_INDEX)
+
+def contexto_index(request, pagina=None):
+    """
+    Contexto da página inicial. A publicação estática (frota.publicacao) renderiza com ele também;
+    a view assíncrona (frota.assincrono) passa a `pagina` já consultada.
+    """
+    # Pega os parâmetros de filtro da URL (GET request) usados para marcar os selects
     depto_id = request.GET.get('departamento')
     status_selecionado = request.GET.get('status')
     regional_id = request.GET.get('regional')
     tipo_veiculo_selecionado = request.GET.get('tipo_veiculo')
     segmento_selecionado = request.GET.get('segmento')
 
-    # Inicia a busca por todos os veículos, já otimizando a consulta ao banco de dados
-    veiculos = Veiculo.objects.select_related('departamento', 'modelo', 'regional', 'manutencao', 'indisponibilidade').all().order_by('prefixo')
-
-    # Aplica os filtros um a um, se eles existirem
-    if placa:
-        veiculos = veiculos.filter(placa__icontains=placa)
-    
-    if depto_id:
-        veiculos = veiculos.filter(departamento_id=depto_id)
-    
-    if status_selecionado:
-        veiculos = veiculos.filter(status=status_selecionado)
-
-    if regional_id:
-        veiculos = veiculos.filter(regional_id=regional_id)
+    # Ids que não são número são ignorados, como em filtrar_veiculos()
+    invalidos = filtros_invalidos(request.GET)
 
-    if tipo_veiculo_selecionado:
-        veiculos = veiculos.filter(tipo_veiculo=tipo_veiculo_selecionado)
+    # Aplica os filtros que existirem e pagina o resultado
+    if pagina is None:
+        pagina = paginar(*consulta_index(request))
 
-    if segmento_selecionado:
-        veiculos = veiculos.filter(segmento=segmento_selecionado)       
-
-    # Busca os dados necessários para preencher os filtros na página
-    departamentos = Departamento.objects.all().order_by('sigla')
-    regionais = Regional.objects.all().order_by('sigla')
+    # Regionais e departamentos dos filtros vêm prontos do frota.opcoes (template tag opcoes_catalogo)
     status_choices = Veiculo.STATUS_CHOICES
     tipo_veiculo_choices = Veiculo.TIPO_VEICULO_CHOICES
     segmento_choices = Veiculo.SEGMENTO_CHOICES
-    ultima_atualizacao = UltimaAtualizacao.objects.first()
-
 
     # Monta o contexto que será enviado para o template HTML
-    context = {
-        'veiculos': veiculos,
-        'departamentos': departamentos,
-        'regionais': regionais,
+    return {
+        'veiculos': pagina.itens,
+        'pagina': pagina,
         'status_choices': status_choices,
         'tipo_veiculo_choices': tipo_veiculo_choices,
         'segmento_choices': segmento_choices,
-        'ultima_atualizacao': ultima_atualizacao,
-        'depto_id_selecionado': int(depto_id) if depto_id else None,
+        'ultima_atualizacao': ultima_atualizacao(request),
+        'depto_id_selecionado': int(depto_id) if depto_id and 'departamento' not in invalidos else None,
         'status_selecionado': status_selecionado,
-        'regional_id_selecionado': int(regional_id) if regional_id else None,
+        'regional_id_selecionado': int(regional_id) if regional_id and 'regional' not in invalidos else None,
         'tipo_veiculo_selecionado': tipo_veiculo_selecionado, 
         'segmento_selecionado': segmento_selecionado,       
+        # Versão exibida, ponto de partida das atualizações ao vivo
+        'versao': versao_dados(request),
+        'tempo_real': settings.FROTA_TEMPO_REAL,
+        'polling_intervalo': settings.FROTA_POLLING_INTERVALO,
     }
-    return render(request, 'frota/index.html', context)
 
 # --- Views do Painel Admin ---
 @login_required
 def admin_panel(request):
-    ultima_atualizacao = UltimaAtualizacao.objects.first()
-    return render(request, 'frota/admin_panel.html', {'ultima_atualizacao': ultima_atualizacao})
+    return render(request, 'frota/admin_panel.html', {'ultima_atualizacao': ultima_atualizacao(request)})
 
 @login_required
+def painel_indicadores(request):
+    """
+    Indicadores de disponibilidade e de manutenção por período. Lê apenas as
+    tabelas consolidadas pelo comando consolidar_indicadores.
+    """
+    hoje = timezone.localdate()
+    iniciais = {'inicio': hoje - timedelta(days=30), 'fim': hoje, 'dimensao': 'regional'}
+    form = FiltroIndicadoresForm(request.GET or None, initial=iniciais)
+    filtro = form.cleaned_data if form.is_valid() else iniciais
+    inicio, fim = filtro['inicio'], filtro['fim']
+
+    context = {
+        'form': form,
+        'inicio': inicio,
+        'fim': fim,
+        'rotulo_dimensao': indicadores.DIMENSOES[filtro['dimensao']][1],
+        'por_grupo': indicadores.disponibilidade_por(filtro['dimensao'], inicio, fim),
+        'serie': indicadores.serie_disponibilidade(inicio, fim),
+        'serie_mensal': (fim - inicio).days > indicadores.MAX_DIAS_SERIE_DIARIA,
+        'oficinas': indicadores.desempenho_oficinas(inicio, fim),
+        'ultima_atualizacao': ultima_atualizacao(request),
+    }
+    return render(request, 'frota/indicadores.html', context)
+
+@login_required
+def buscar(request):
+    """
+    Busca textual por placa, prefixo, modelo, oficina, cidade, OS, serviços e
+    motivos, na situação atual da frota e no histórico de status.
+    """
+    texto = request.GET.get('q', '').strip()
+    context = {
+        'q': texto,
+        'veiculos': busca.buscar_frota(texto),
+        'eventos': busca.buscar_historico(texto),
+        'limite': busca.LIMITE,
+        'ultima_atualizacao': ultima_atualizacao(request),
+    }
+    return render(request, 'frota/busca.html', context)
+
+@login_required
+@pagina_condicional
 def gerenciar_departamentos(request):
     if request.method == 'POST':
         form = DepartamentoForm(request.POST)
         if form.is_valid():
             form.save()
+            registrar_atualizacao(catalogo=True)
             messages.success(request, 'Departamento cadastrado com sucesso!')
             return redirect('gerenciar_departamentos')
         else:
@@ -101,11 +161,10 @@ def gerenciar_departamentos(request):
     if pesquisa:
         departamentos = departamentos.filter(Q(nome__icontains=pesquisa) | Q(sigla__icontains=pesquisa))
 
-    ultima_atualizacao = UltimaAtualizacao.objects.first()
     context = {
         'form': form,
         'departamentos': departamentos,
-        'ultima_atualizacao': ultima_atualizacao
+        'ultima_atualizacao': ultima_atualizacao(request)
     }
     return render(request, 'frota/departamentos.html', context)
 
@@ -115,7 +174,9 @@ def editar_departamento(request, id):
     if request.method == 'POST':
         form = DepartamentoForm(request.POST, instance=depto)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                painel.sincronizar_catalogo(form.save())
+                registrar_atualizacao(painel=True, catalogo=True)
             messages.success(request, 'Departamento atualizado com sucesso!')
             return redirect('gerenciar_departamentos')
     # Não precisa de um GET, a edição será feita via modal na página principal.
@@ -128,17 +189,21 @@ def excluir_departamento(request, id):
         messages.error(request, 'Não é possível excluir um departamento que possui veículos associados.')
     else:
         depto.delete()
+        registrar_atualizacao(catalogo=True)
         messages.success(request, 'Departamento excluído com sucesso!')
     return redirect('gerenciar_departamentos')
 
 
 @login_required
+@pagina_condicional
 def gerenciar_veiculos(request):
     if request.method == 'POST':
         form = VeiculoForm(request.POST)
         if form.is_valid():
-            form.save()
-            registrar_atualizacao()
+            with transaction.atomic():
+                veiculo = form.save()
+                painel.sincronizar_veiculos([veiculo.pk])
+                registrar_atualizacao(painel=True)
             messages.success(request, 'Veículo cadastrado com sucesso!')
             return redirect('gerenciar_veiculos')
         else:
@@ -149,7 +214,8 @@ def gerenciar_veiculos(request):
     status_selecionado = request.GET.get('status')
 
     placa = request.GET.get('placa')
-    veiculos = Veiculo.objects.select_related('departamento', 'modelo', 'regional').all().order_by('prefixo') # Adicione 'modelo' aqui
+    # Manutenção e indisponibilidade vêm no mesmo JOIN para os formulários de cada linha
+    veiculos = Veiculo.objects.select_related('departamento', 'modelo', 'regional', 'manutencao', 'indisponibilidade').all()
 
     if placa:
         veiculos = veiculos.filter(placa__icontains=placa)
@@ -157,35 +223,100 @@ def gerenciar_veiculos(request):
     if status_selecionado:
         veiculos = veiculos.filter(status=status_selecionado)
 
-    departamentos = Departamento.objects.all() # ADICIONE ESTA LINHA
-    modelos = ModeloVeiculo.objects.all() # ADICIONE ESTA LINHA
-    regionais = Regional.objects.all()
+    pagina = paginar(veiculos, request.GET, chave_pagina('total-veiculos', request, ('placa', 'status')))
+
     tipo_veiculo_choices = Veiculo.TIPO_VEICULO_CHOICES
     status_choices = Veiculo.STATUS_CHOICES
     segmento_choices = Veiculo.SEGMENTO_CHOICES
-    ultima_atualizacao = UltimaAtualizacao.objects.first()
 
     context = {
         'form': form,
-        'veiculos': veiculos,
-        'departamentos': departamentos,
-        'modelos': modelos, # ADICIONE ESTA LINHA
-        'regionais': regionais,
+        'veiculos': pagina.itens,
+        'pagina': pagina,
         'status_choices': status_choices,
         'tipo_veiculo_choices': tipo_veiculo_choices,
         'segmento_choices': segmento_choices,
-        'ultima_atualizacao': ultima_atualizacao
+        'ultima_atualizacao': ultima_atualizacao(request),
+        'modais_sob_demanda': settings.FROTA_MODAIS_SOB_DEMANDA,
+        'form_importacao': ImportacaoVeiculosForm(),
+        'form_manutencao_massa': ManutencaoForm(auto_id='massa_%s'),
+        'form_indisponibilidade_massa': IndisponibilidadeForm(auto_id='massa_%s'),
+        'colunas_importacao': importacao.COLUNAS_IMPORTACAO,
     }
     return render(request, 'frota/lista_veiculos.html', context)
 
+@login_required
+@pagina_condicional
+def formulario_veiculo(request, tipo, id):
+    """
+    Devolve o conteúdo do modal de manutenção ou de indisponibilidade de um veículo.
+    Usado pela lista de veículos para carregar os formulários sob demanda.
+    """
+    if tipo == 'manutencao':
+        form_class, template = ManutencaoForm, 'frota/modais/manutencao.html'
+    elif tipo == 'indisponibilidade':
+        form_class, template = IndisponibilidadeForm, 'frota/modais/indisponibilidade.html'
+    else:
+        raise Http404('Formulário inexistente.')
+
+    veiculo = get_object_or_404(Veiculo.objects.select_related('modelo', tipo), id=id)
+    form = form_class(instance=getattr(veiculo, tipo, None))
+    return render(request, template, {'veiculo': veiculo, 'form': form})
+
+@login_required
+def importar_veiculos(request):
+    """Importa veículos em lote a partir de um CSV enviado pelo painel."""
+    if request.method != 'POST':
+        return redirect('gerenciar_veiculos')
+
+    form = ImportacaoVeiculosForm(request.POST, request.FILES)
+    if not form.is_valid():
+        messages.error(request, 'Selecione um arquivo CSV para importar.')
+        return redirect('gerenciar_veiculos')
+
+    # Arquivo fora do UTF-8 ou CSV malformado voltam como erros de linha no resultado
+    arquivo = io.TextIOWrapper(form.cleaned_data['arquivo'].file, encoding='utf-8-sig', newline='')
+    resultado = importacao.importar_veiculos(arquivo)
+
+    if resultado.ok:
+        messages.success(request, f'{resultado.criados} veículo(s) importados com sucesso!')
+    else:
+        messages.error(request, f'{len(resultado.erros)} linha(s) com erro. Nenhum veículo foi importado.')
+        for linha, mensagem in resultado.erros[:MAX_ERROS_IMPORTACAO]:
+            messages.warning(request, f'Linha {linha}: {mensagem}')
+    return redirect('gerenciar_veiculos')
+
+@login_required
+def exportar_veiculos(request):
+    """
+    Exporta os veículos (com manutenção e indisponibilidade) em CSV ou XLSX,
+    aplicando os mesmos filtros da página inicial.
+    """
+    formato = request.GET.get('formato', 'csv')
+    nome_arquivo = f"frota_{timezone.localtime():%Y%m%d_%H%M}"
+
+    if formato == 'xlsx':
+        return FileResponse(
+            gerar_xlsx(request.GET),
+            as_attachment=True,
+            filename=f'{nome_arquivo}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    response = StreamingHttpResponse(gerar_csv(request.GET), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.csv"'
+    return response
+
 @login_required
 def editar_veiculo(request, id):
     veiculo = get_object_or_404(Veiculo, id=id)
     if request.method == 'POST':
         form = VeiculoForm(request.POST, instance=veiculo)
         if form.is_valid():
-            form.save()
-            registrar_atualizacao()
+            with transaction.atomic():
+                form.save()
+                painel.sincronizar_veiculos([veiculo.pk])
+                registrar_atualizacao(painel=True)
             messages.success(request, 'Veículo atualizado com sucesso!')
             return redirect('gerenciar_veiculos')
     return redirect('gerenciar_veiculos')
@@ -193,8 +324,10 @@ def editar_veiculo(request, id):
 @login_required
 def excluir_veiculo(request, id):
     veiculo = get_object_or_404(Veiculo, id=id)
-    veiculo.delete()
-    registrar_atualizacao()
+    with transaction.atomic():
+        painel.registrar_remocao(veiculo)
+        veiculo.delete()
+        registrar_atualizacao(painel=True)
     messages.success(request, 'Veículo excluído com sucesso!')
     return redirect('gerenciar_veiculos')
 
@@ -211,25 +344,21 @@ def gerenciar_manutencao(request, id):
     if request.method == 'POST':
         form = ManutencaoForm(request.POST, instance=manutencao_instance)
         if form.is_valid():
-            manutencao = form.save(commit=False)
-            manutencao.veiculo = veiculo
-            manutencao.save()
-            veiculo.status = 'Em Manutenção'
-            veiculo.save()
-            registrar_atualizacao()
-            messages.success(request, 'Informações de manutenção salvas com sucesso!')
+            # O status é conferido de novo com a linha travada: pode ter mudado desde a leitura acima
+            if transicoes.enviar_para_manutencao([veiculo.pk], form.cleaned_data, request.user).alterados:
+                messages.success(request, 'Informações de manutenção salvas com sucesso!')
+            else:
+                messages.error(request, 'O veículo está indisponível. Finalize a indisponibilidade primeiro.')
             return redirect('gerenciar_veiculos')
     return redirect('gerenciar_veiculos')
 
 @login_required
 def concluir_manutencao(request, id):
     veiculo = get_object_or_404(Veiculo, id=id)
-    if hasattr(veiculo, 'manutencao'):
-        veiculo.manutencao.delete()
-        veiculo.status = 'Disponível'
-        veiculo.save()
-        registrar_atualizacao()
+    if transicoes.concluir_manutencoes([veiculo.pk], request.user).alterados:
         messages.success(request, f'Manutenção do veículo {veiculo.placa} concluída.')
+    else:
+        messages.error(request, f'O veículo {veiculo.placa} não está em manutenção.')
     return redirect('gerenciar_veiculos')
 
 @login_required
@@ -245,33 +374,71 @@ def gerenciar_indisponibilidade(request, id):
     if request.method == 'POST':
         form = IndisponibilidadeForm(request.POST, instance=indisponibilidade_instance)
         if form.is_valid():
-            indisponibilidade = form.save(commit=False)
-            indisponibilidade.veiculo = veiculo
-            indisponibilidade.save()
-            veiculo.status = 'Indisponível'
-            veiculo.save()
-            registrar_atualizacao()
-            messages.success(request, 'Status de indisponibilidade salvo com sucesso!')
+            if transicoes.marcar_indisponiveis([veiculo.pk], form.cleaned_data, request.user).alterados:
+                messages.success(request, 'Status de indisponibilidade salvo com sucesso!')
+            else:
+                messages.error(request, 'O veículo está em manutenção. Finalize a manutenção primeiro.')
             return redirect('gerenciar_veiculos')
     return redirect('gerenciar_veiculos')
 
 @login_required
 def tornar_disponivel(request, id):
     veiculo = get_object_or_404(Veiculo, id=id)
-    if hasattr(veiculo, 'indisponibilidade'):
-        veiculo.indisponibilidade.delete()
-        veiculo.status = 'Disponível'
-        veiculo.save()
-        registrar_atualizacao()
+    if transicoes.tornar_disponiveis([veiculo.pk], request.user).alterados:
         messages.success(request, f'Veículo {veiculo.placa} agora está disponível.')
+    else:
+        messages.error(request, f'O veículo {veiculo.placa} não está indisponível.')
     return redirect('gerenciar_veiculos')
 
 @login_required
+def acao_em_massa(request):
+    """
+    Aplica uma mudança de status a vários veículos de uma vez, numa única transação.
+    Recebe os ids marcados na lista ('ids') e a ação escolhida ('acao').
+    """
+    if request.method != 'POST':
+        return redirect('gerenciar_veiculos')
+
+    ids = [int(pk) for pk in request.POST.getlist('ids') if pk.isdigit()]
+    acao = request.POST.get('acao')
+    if not ids:
+        messages.error(request, 'Selecione ao menos um veículo.')
+        return redirect('gerenciar_veiculos')
+
+    if acao == 'manutencao':
+        form = ManutencaoForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, 'Dados da manutenção inválidos. Verifique os campos obrigatórios.')
+            return redirect('gerenciar_veiculos')
+        resultado = transicoes.enviar_para_manutencao(ids, form.cleaned_data, request.user)
+    elif acao == 'concluir_manutencao':
+        resultado = transicoes.concluir_manutencoes(ids, request.user)
+    elif acao == 'indisponivel':
+        form = IndisponibilidadeForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, 'Informe o motivo da indisponibilidade.')
+            return redirect('gerenciar_veiculos')
+        resultado = transicoes.marcar_indisponiveis(ids, form.cleaned_data, request.user)
+    elif acao == 'tornar_disponivel':
+        resultado = transicoes.tornar_disponiveis(ids, request.user)
+    else:
+        messages.error(request, 'Ação inválida.')
+        return redirect('gerenciar_veiculos')
+
+    if resultado.alterados:
+        messages.success(request, f'{len(resultado.alterados)} veículo(s) atualizados com sucesso!')
+    if resultado.ignorados:
+        messages.warning(request, f"Status não permite a ação para: {', '.join(resultado.ignorados)}.")
+    return redirect('gerenciar_veiculos')
+
+@login_required
+@pagina_condicional
 def gerenciar_modelos(request):
     if request.method == 'POST':
         form = ModeloVeiculoForm(request.POST)
         if form.is_valid():
             form.save()
+            registrar_atualizacao(catalogo=True)
             messages.success(request, 'Modelo cadastrado com sucesso!')
             return redirect('gerenciar_modelos')
         else:
@@ -287,7 +454,7 @@ def gerenciar_modelos(request):
     context = {
         'form': form,
         'modelos': modelos,
-        'ultima_atualizacao': UltimaAtualizacao.objects.first()
+        'ultima_atualizacao': ultima_atualizacao(request)
     }
     return render(request, 'frota/modelos.html', context)
 
@@ -297,7 +464,9 @@ def editar_modelo(request, id):
     if request.method == 'POST':
         form = ModeloVeiculoForm(request.POST, instance=modelo)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                painel.sincronizar_catalogo(form.save())
+                registrar_atualizacao(painel=True, catalogo=True)
             messages.success(request, 'Modelo atualizado com sucesso!')
             return redirect('gerenciar_modelos')
     return redirect('gerenciar_modelos')
@@ -309,10 +478,12 @@ def excluir_modelo(request, id):
         messages.error(request, 'Não é possível excluir um modelo que possui veículos associados.')
     else:
         modelo.delete()
+        registrar_atualizacao(catalogo=True)
         messages.success(request, 'Modelo excluído com sucesso!')
     return redirect('gerenciar_modelos')
 
 @login_required
+@pagina_condicional
 def gerenciar_regionais(request):
     """
     Gerencia o cadastro, listagem e pesquisa de Regionais.
@@ -321,6 +492,7 @@ def gerenciar_regionais(request):
         form = RegionalForm(request.POST)
         if form.is_valid():
             form.save()
+            registrar_atualizacao(catalogo=True)
             messages.success(request, 'Regional cadastrada com sucesso!')
             return redirect('gerenciar_regionais')
         else:
@@ -333,11 +505,10 @@ def gerenciar_regionais(request):
     if pesquisa:
         regionais = regionais.filter(Q(nome__icontains=pesquisa) | Q(sigla__icontains=pesquisa))
 
-    ultima_atualizacao = UltimaAtualizacao.objects.first()
     context = {
         'form': form,
         'regionais': regionais,
-        'ultima_atualizacao': ultima_atualizacao
+        'ultima_atualizacao': ultima_atualizacao(request)
     }
     return render(request, 'frota/regionais.html', context)
 
@@ -350,7 +521,9 @@ def editar_regional(request, id):
     if request.method == 'POST':
         form = RegionalForm(request.POST, instance=regional)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                painel.sincronizar_catalogo(form.save())
+                registrar_atualizacao(painel=True, catalogo=True)
             messages.success(request, 'Regional atualizada com sucesso!')
             return redirect('gerenciar_regionais')
     # Se o método não for POST, apenas redireciona de volta, pois a edição é via modal.
@@ -366,5 +539,6 @@ def excluir_regional(request, id):
         messages.error(request, f'Não é possível excluir a regional "{regional.sigla}" pois ela possui veículos associados.')
     else:
         regional.delete()
+        registrar_atualizacao(catalogo=True)
         messages.success(request, 'Regional excluída com sucesso!')
     return redirect('gerenciar_regionais')
\ No newline at end of file
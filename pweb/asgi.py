@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pweb.settings')
+# Páginas e endpoints de leitura com as views assíncronas (frota/assincrono.py)
+os.environ.setdefault('FROTA_ASGI', 'True')
 
 application = get_asgi_application()
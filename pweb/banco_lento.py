@@ -0,0 +1,24 @@
+"""
+Banco lento simulado, só para testes de carga locais.
+
+Com FROTA_ATRASO_BANCO_MS acima de zero, cada consulta espera esse tempo a
+mais antes de executar, como se o banco estivesse em outra rede ou
+sobrecarregado. Serve para comparar a implantação síncrona (WSGI) com a
+assíncrona (ASGI) usando SQLite ou um PostgreSQL local, em que as consultas
+respondem rápido demais para a diferença aparecer.
+"""
+
+import time
+
+from django.conf import settings
+
+
+def _atrasar(execute, sql, params, many, context):
+    time.sleep(settings.FROTA_ATRASO_BANCO_MS / 1000)
+    return execute(sql, params, many, context)
+
+
+def instalar(sender, connection, **kwargs):
+    """Receptor de connection_created: põe o atraso em cada conexão nova."""
+    if _atrasar not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_atrasar)
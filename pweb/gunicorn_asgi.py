@@ -0,0 +1,19 @@
+"""
+Configuração do gunicorn para servir o projeto sob ASGI, com workers do uvicorn:
+
+    gunicorn -c pweb/gunicorn_asgi.py pweb.asgi:application
+
+Cada worker é um processo com um loop de eventos. Nas views de leitura
+(frota/assincrono.py) um request esperando o banco não ocupa o worker, então
+poucos processos atendem muitos telões, inclusive as conexões SSE abertas.
+"""
+
+import os
+
+# O gunicorn lê como configuração todo nome deste módulo; por isso os.environ, e não decouple.config
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'uvicorn.workers.UvicornWorker'
+# As conexões SSE ficam abertas por muito tempo; o timeout só derruba worker travado
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
@@ -0,0 +1,184 @@
+"""
+Perfil de requests (opcional).
+
+Com FROTA_PERFIL_AMOSTRAGEM acima de zero, essa fração dos requests é medida:
+número e tempo das consultas SQL, consultas repetidas (sinal de N+1), tempo
+de renderização dos templates, tamanho da resposta e tempo total. O resultado
+vai no cabeçalho Server-Timing (aba de rede do navegador) e numa linha JSON no
+logger 'pweb.perfil'. Desligado, o middleware nem entra na pilha.
+
+Funciona sob WSGI e ASGI. As consultas são contadas por um execute_wrapper
+posto em cada conexão ao abrir (sinal connection_created): sob ASGI as views
+assíncronas consultam o banco em threads do sync_to_async, cada uma com as
+suas conexões, e o wrapper acha a medição do request pela ContextVar, que o
+sync_to_async copia para a thread. Consultas feitas depois que a resposta sai
+do middleware (conteúdo de respostas em streaming) não entram na conta.
+
+O tempo de renderização é medido pelo backend de templates TemplatesMedidos
+(TEMPLATES em pweb/settings.py): cada template renderizado por render(),
+render_to_string() ou TemplateResponse conta, com os que ele inclui, só nos
+requests amostrados; nos outros o custo é ler uma ContextVar.
+"""
+
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+logger = logging.getLogger('pweb.perfil')
+
+# Consultas repetidas listadas no log, e quantos caracteres de cada uma
+MAX_REPETIDAS = 5
+TAMANHO_SQL = 300
+
+_medicao = ContextVar('frota_medicao', default=None)
+
+
+class Medicao:
+    """Acumula o que acontece durante um request."""
+
+    def __init__(self):
+        self.consultas = Counter()  # SQL com os %s -> execuções
+        self.identicas = Counter()  # (SQL, parâmetros) -> execuções
+        self.tempo_sql = 0.0
+        self.tempo_render = 0.0
+        self.renderizando = False
+
+    def registrar(self, sql, params, duracao):
+        self.tempo_sql += duracao
+        self.consultas[sql] += 1
+        self.identicas[sql, repr(params)] += 1
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    medicao = _medicao.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.registrar(sql, params, time.perf_counter() - inicio)
+
+
+def _instalar_wrapper(connection, **kwargs):
+    if _medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_consulta)
+
+
+class TemplateMedido(Template):
+    def render(self, context=None, request=None):
+        medicao = _medicao.get()
+        # Templates renderizados dentro de outro (tags que chamam render_to_string) já contam no dele
+        if medicao is None or medicao.renderizando:
+            return super().render(context, request)
+        medicao.renderizando = True
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            medicao.tempo_render += time.perf_counter() - inicio
+            medicao.renderizando = False
+
+
+class TemplatesMedidos(DjangoTemplates):
+    """O backend de templates do Django, com os templates medidos nos requests amostrados."""
+
+    def from_string(self, template_code):
+        return TemplateMedido(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TemplateMedido(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def _resumo(request, response, medicao, inicio):
+    match = request.resolver_match
+    return {
+        'metodo': request.method,
+        'caminho': request.path,
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'total_ms': round((time.perf_counter() - inicio) * 1000, 1),
+        'sql_ms': round(medicao.tempo_sql * 1000, 1),
+        'consultas': sum(medicao.consultas.values()),
+        # Mesma consulta com os mesmos parâmetros: dava para reaproveitar o resultado
+        'duplicadas': sum(vezes - 1 for vezes in medicao.identicas.values()),
+        # Mesma consulta com parâmetros diferentes muitas vezes: o padrão do N+1
+        'repetidas': [
+            {'sql': sql[:TAMANHO_SQL], 'vezes': vezes}
+            for sql, vezes in medicao.consultas.most_common(MAX_REPETIDAS)
+            if vezes >= settings.FROTA_PERFIL_REPETICOES
+        ],
+        'render_ms': round(medicao.tempo_render * 1000, 1),
+        'bytes': None if response.streaming else len(response.content),
+    }
+
+
+class PerfilMiddleware:
+    """Fica no topo da pilha para o tempo total incluir os outros middlewares."""
+
+    # Sob ASGI roda no loop, na mesma ContextVar que as threads das views copiam
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.amostragem = settings.FROTA_PERFIL_AMOSTRAGEM
+        if self.amostragem <= 0:
+            raise MiddlewareNotUsed
+        connection_created.connect(_instalar_wrapper, dispatch_uid='pweb.perfil')
+        # Conexões que já estavam abertas nesta thread
+        for conexao in connections.all(initialized_only=True):
+            _instalar_wrapper(conexao)
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.amostragem:
+            return self.get_response(request)
+        medicao = Medicao()
+        token = _medicao.set(medicao)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicao.reset(token)
+        return self._registrar(request, response, medicao, inicio)
+
+    async def __acall__(self, request):
+        if random.random() >= self.amostragem:
+            return await self.get_response(request)
+        medicao = Medicao()
+        token = _medicao.set(medicao)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicao.reset(token)
+        return self._registrar(request, response, medicao, inicio)
+
+    def _registrar(self, request, response, medicao, inicio):
+        resumo = _resumo(request, response, medicao, inicio)
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={resumo["sql_ms"]};desc="{resumo["consultas"]} consultas"',
+            f'render;dur={resumo["render_ms"]}',
+            f'total;dur={resumo["total_ms"]}',
+        ])
+        nivel = logging.WARNING if resumo['repetidas'] else logging.INFO
+        logger.log(nivel, json.dumps(resumo, ensure_ascii=False), extra={'perfil': resumo})
+        return response
@@ -0,0 +1,121 @@
+"""
+Roteamento de leituras para a réplica do banco (opcional).
+
+Com DATABASE_REPLICA_URL configurada, os GETs de visitantes anônimos leem da
+réplica; o painel, os logins e toda escrita usam o banco principal. Depois de
+um POST o navegador recebe um cookie curto que o mantém no principal, para a
+pessoa ver o que acabou de gravar mesmo com atraso na replicação.
+"""
+
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+REPLICA = 'replica'
+COOKIE_PRINCIPAL = 'frota_principal'
+METODOS_LEITURA = ('GET', 'HEAD', 'OPTIONS')
+
+_usar_replica = ContextVar('frota_usar_replica', default=False)
+
+
+def usando_replica():
+    return _usar_replica.get()
+
+
+def deve_usar_replica(request):
+    # Sem cookie de sessão não há usuário logado nem mensagens pendentes, e não
+    # é preciso consultar a tabela de sessões para saber disso.
+    return (
+        request.method in METODOS_LEITURA
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and COOKIE_PRINCIPAL not in request.COOKIES
+    )
+
+
+class RoteadorReplica:
+    """Leituras vão para a réplica só quando o middleware marcou o request."""
+
+    def db_for_read(self, model, **hints):
+        return REPLICA if usando_replica() else 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # A réplica recebe o esquema pela própria replicação
+        return db != REPLICA
+
+
+def _na_replica(conteudo):
+    _usar_replica.set(True)
+    try:
+        yield from conteudo
+    finally:
+        _usar_replica.set(False)
+
+
+async def _na_replica_async(conteudo):
+    _usar_replica.set(True)
+    try:
+        async for parte in conteudo:
+            yield parte
+    finally:
+        _usar_replica.set(False)
+
+
+class ReplicaMiddleware:
+    """
+    Decide no começo de cada request se as leituras vão para a réplica e volta
+    ao principal no fim, para nada fora do request (sessões do cliente de
+    teste, comandos) herdar a escolha. Respostas em streaming são geradas
+    depois do middleware, então o conteúdo delas reaplica a escolha.
+    """
+
+    # Sob ASGI (views de frota.assincrono) roda no loop, sem passar por uma thread
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if REPLICA not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        usar = deve_usar_replica(request)
+        _usar_replica.set(usar)
+        try:
+            response = self.get_response(request)
+        finally:
+            _usar_replica.set(False)
+        return self._finalizar(request, response, usar)
+
+    async def __acall__(self, request):
+        usar = deve_usar_replica(request)
+        _usar_replica.set(usar)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _usar_replica.set(False)
+        return self._finalizar(request, response, usar)
+
+    def _finalizar(self, request, response, usar):
+        if usar and response.streaming:
+            if response.is_async:
+                response.streaming_content = _na_replica_async(response.streaming_content)
+            else:
+                response.streaming_content = _na_replica(response.streaming_content)
+        if request.method not in METODOS_LEITURA:
+            response.set_cookie(
+                COOKIE_PRINCIPAL, '1', max_age=settings.FROTA_REPLICA_FIXACAO,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
@@ -10,9 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import json
 from pathlib import Path
 import dj_database_url
-from decouple import config
+from decouple import Choices, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,7 +36,6 @@ ALLOWED_HOSTS = ['127.0.0.1', '.vercel.app']
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -46,13 +46,22 @@ INSTALLED_APPS = [
     'frota',
 ]
 
+# Admin do Django em /admin/. O frota não registra modelos nele; serve para
+# gerenciar usuários. Desligado, o admin e seus formulários deixam de ser
+# importados na partida de cada processo (ver `manage.py perfil_inicializacao`).
+FROTA_ADMIN_DJANGO = config('FROTA_ADMIN_DJANGO', default=True, cast=bool)
+if FROTA_ADMIN_DJANGO:
+    INSTALLED_APPS.insert(0, 'django.contrib.admin')
+
 MIDDLEWARE = [
+    'pweb.perfil.PerfilMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'pweb.roteador.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -61,7 +70,9 @@ ROOT_URLCONF = 'pweb.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que mede a renderização para o perfil de requests (pweb/perfil.py)
+        'BACKEND': 'pweb.perfil.TemplatesMedidos',
+        'NAME': 'django',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -80,8 +91,142 @@ WSGI_APPLICATION = 'pweb.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Estratégia de conexão (DB_CONEXOES):
+# - 'persistente' (padrão): cada processo reaproveita a conexão por até
+#   DB_CONN_MAX_AGE segundos e confere se ela ainda está viva antes de usar.
+#   Numa função serverless aquecida, só o primeiro request paga a conexão.
+# - 'pool': pool de conexões do psycopg 3 (só PostgreSQL). Exige trocar o
+#   psycopg2-binary por "psycopg[binary,pool]" no requirements.txt.
+# - 'por_request': abre e fecha uma conexão a cada request.
+DB_CONEXOES = config('DB_CONEXOES', default='persistente', cast=Choices(['persistente', 'pool', 'por_request']))
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+DB_POOL_MIN = config('DB_POOL_MIN', default=1, cast=int)
+DB_POOL_MAX = config('DB_POOL_MAX', default=4, cast=int)
+
+
+def _banco(url):
+    banco = dj_database_url.parse(url)
+    if DB_CONEXOES == 'persistente':
+        banco['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+        banco['CONN_HEALTH_CHECKS'] = True
+    elif DB_CONEXOES == 'pool' and banco['ENGINE'] == 'django.db.backends.postgresql':
+        banco.setdefault('OPTIONS', {})['pool'] = {'min_size': DB_POOL_MIN, 'max_size': DB_POOL_MAX}
+    return banco
+
+
 DATABASES = {
-    'default': dj_database_url.parse(config('DATABASE_URL')) # <-- ALTERE AQUI
+    'default': _banco(config('DATABASE_URL')) # <-- ALTERE AQUI
+}
+
+# Réplica de leitura opcional para o tráfego público (ver pweb/roteador.py).
+# Para testar localmente use dois arquivos SQLite, por exemplo
+# DATABASE_REPLICA_URL=sqlite:////tmp/replica.sqlite3, e copie o principal
+# para a réplica com `manage.py atualizar_replica_sqlite`.
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = _banco(DATABASE_REPLICA_URL)
+    # Nos testes a réplica aponta para o mesmo banco de teste do principal
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['pweb.roteador.RoteadorReplica']
+
+# Segundos que um navegador fica lendo do banco principal depois de um POST
+FROTA_REPLICA_FIXACAO = config('FROTA_REPLICA_FIXACAO', default=15, cast=int)
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND aceita 'locmem', 'file' ou 'db'. No deploy serverless use 'db'
+# (rodar `manage.py createcachetable` antes) ou 'file' apontando para /tmp.
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+}
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_LOCATIONS = {
+    'locmem': 'painelfrota',
+    'file': '/tmp/painelfrota_cache',
+    'db': 'frota_cache',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_LOCATIONS[CACHE_BACKEND]),
+    }
+}
+
+# Tempo (segundos) que uma página renderizada fica no cache. A chave inclui a
+# versão dos dados, então qualquer atualização já invalida as páginas antigas.
+FROTA_CACHE_TIMEOUT = config('FROTA_CACHE_TIMEOUT', default=300, cast=int)
+
+# Segundos que cada processo reaproveita a versão dos dados lida do banco.
+# Alterações feitas no próprio processo aparecem na hora; as dos outros, em até esse tempo.
+FROTA_VERSAO_TTL = config('FROTA_VERSAO_TTL', default=2, cast=float)
+
+# Frota
+# Na lista de veículos do painel, carrega os modais de cada veículo sob demanda
+# em vez de renderizar todos os formulários na página.
+FROTA_MODAIS_SOB_DEMANDA = config('FROTA_MODAIS_SOB_DEMANDA', default=True, cast=bool)
+
+# Paginação das listas de veículos (pode ser alterada na URL com ?por_pagina=)
+FROTA_ITENS_POR_PAGINA = config('FROTA_ITENS_POR_PAGINA', default=100, cast=int)
+FROTA_MAX_ITENS_POR_PAGINA = config('FROTA_MAX_ITENS_POR_PAGINA', default=1000, cast=int)
+
+# Views assíncronas nas páginas e endpoints de leitura (frota/assincrono.py). Ligado
+# por pweb/asgi.py; sob WSGI as views síncronas são mais baratas. Para servir com
+# vários workers: gunicorn -c pweb/gunicorn_asgi.py pweb.asgi:application
+FROTA_ASGI = config('FROTA_ASGI', default=False, cast=bool)
+
+# Atualização ao vivo da página inicial: 'sse' (servidor ASGI, pweb/asgi.py),
+# 'polling' (WSGI/serverless) ou 'desligado'.
+FROTA_TEMPO_REAL = config('FROTA_TEMPO_REAL', default='polling')
+# Segundos entre leituras da versão dos dados (SSE) e entre consultas do navegador (polling)
+FROTA_TEMPO_REAL_INTERVALO = config('FROTA_TEMPO_REAL_INTERVALO', default=2, cast=int)
+FROTA_POLLING_INTERVALO = config('FROTA_POLLING_INTERVALO', default=30, cast=int)
+# Acima deste número de linhas alteradas a página recarrega inteira
+FROTA_MAX_MUDANCAS = config('FROTA_MAX_MUDANCAS', default=200, cast=int)
+# Por quantas versões os veículos excluídos ficam registrados para as páginas abertas
+# (RemocaoPainel, apagados pelo comando limpar_remocoes); páginas mais velhas recarregam
+FROTA_RETENCAO_REMOCOES = config('FROTA_RETENCAO_REMOCOES', default=1000, cast=int)
+
+# Painel público estático (frota/publicacao.py): o comando publicar_painel --acompanhar
+# grava a página inicial sem filtros e um JSON com a frota inteira a cada versão dos
+# dados, e visitantes anônimos da página inicial vão para ela; filtros e paginação
+# rodam no navegador. Os arquivos vão para o armazenamento STORAGES['publicacao'] ou
+# FROTA_PUBLICACAO_BACKEND, se existirem, ou para FROTA_PUBLICACAO_DIR, e são servidos em
+# FROTA_PUBLICACAO_URL (relativa: pelo próprio Django, com cache no CDN). Na Vercel o
+# disco é somente leitura e separado por instância: configure FROTA_PUBLICACAO_BACKEND
+# (ex.: storages.backends.s3.S3Storage, do django-storages) com as opções em
+# FROTA_PUBLICACAO_OPCOES (JSON). Não use o
+# STATIC_ROOT: o WhiteNoise só indexa os arquivos na inicialização e o build estático
+# da Vercel é feito no deploy.
+FROTA_PUBLICACAO = config('FROTA_PUBLICACAO', default=False, cast=bool)
+FROTA_PUBLICACAO_DIR = config('FROTA_PUBLICACAO_DIR', default=str(BASE_DIR / 'publico'))
+FROTA_PUBLICACAO_URL = config('FROTA_PUBLICACAO_URL', default='/publico/')
+FROTA_PUBLICACAO_BACKEND = config('FROTA_PUBLICACAO_BACKEND', default='')
+FROTA_PUBLICACAO_OPCOES = config('FROTA_PUBLICACAO_OPCOES', default='{}', cast=json.loads)
+
+# Perfil de requests (pweb/perfil.py): fração dos requests medidos, de 0
+# (desligado, sem custo) a 1 (todos). Cada request medido ganha um cabeçalho
+# Server-Timing e uma linha JSON no log; não ligue em produção sem amostragem.
+FROTA_PERFIL_AMOSTRAGEM = config('FROTA_PERFIL_AMOSTRAGEM', default=0.0, cast=float)
+# A partir de quantas execuções da mesma consulta num request ela é apontada como N+1
+FROTA_PERFIL_REPETICOES = config('FROTA_PERFIL_REPETICOES', default=5, cast=int)
+
+# Só para testes de carga locais (pweb/banco_lento.py): milissegundos somados a
+# cada consulta, simulando um banco remoto ou sobrecarregado. Nunca em produção.
+FROTA_ATRASO_BANCO_MS = config('FROTA_ATRASO_BANCO_MS', default=0, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'pweb.perfil': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 # Password validation
@@ -123,6 +268,9 @@ STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 STATICFILES_DIRS = [BASE_DIR / 'frota' / 'static']
+# Os scripts de frota/js/ são referenciados com o hash do conteúdo na URL
+# (tag static_versionado), então podem ficar no cache por tempo indeterminado
+WHITENOISE_IMMUTABLE_FILE_TEST = r'^/static/frota/js/'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
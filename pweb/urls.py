@@ -14,13 +14,28 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.conf import settings
 from django.urls import include, path
 
-from frota import views
+from frota import assincrono, views
+
+index = assincrono.index if settings.FROTA_ASGI else views.index
+if settings.FROTA_PUBLICACAO:
+    from frota import publicacao
+
+    # Visitantes anônimos ficam com a página publicada (frota/publicacao.py)
+    index = publicacao.anonimos_na_publicacao(index)
 
 urlpatterns = [
-    path('', views.index, name="index"),
+    path('', index, name="index"),
     path('frota/', include('frota.urls')),
-    path('admin/', admin.site.urls),
 ]
+
+if settings.FROTA_PUBLICACAO and settings.FROTA_PUBLICACAO_URL.startswith('/'):
+    # Publicação no próprio site: o Django lê do armazenamento e o CDN guarda
+    urlpatterns.append(path(f'{settings.FROTA_PUBLICACAO_URL[1:]}<str:nome>', publicacao.servir, name='publicacao'))
+
+if settings.FROTA_ADMIN_DJANGO:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))